@@ -1,68 +1,58 @@
-import csv
 import datetime
 import os
 import sys
 from typing import List, Dict, Optional
-from collections import defaultdict
+
+from models.database import Database
+from models.paiement import Paiement, STATUTS, montant_fcfa, periode, periode_mois
+from models.repository import PaiementRepository
+from utils.backup import BackupManager
+from utils.search_index import SearchIndex
+from utils.roster import RosterMatrix, annee_scolaire, libelle_periode
+from utils.importer import BulkImporter
+from utils.exporter import StreamingExporter
+from utils.receipts import RENDU, SORTIES, nom_recu
 
 # Configuration
-FICHIER_DONNEES = "paiements_eleves.csv"
-FICHIER_SAUVEGARDE = "sauvegarde_paiements_{}.csv"
+FICHIER_DONNEES = "paiements_eleves.csv"  # Ancien stockage CSV, migré vers SQLite au démarrage
 CHAMPS = ["id", "nom", "prenom", "classe", "montant", "mois", "date_paiement", 
           "heure_paiement", "methode_paiement", "statut", "notes"]
-STATUTS = ["payé", "impayé", "partiel", "remboursé"]
 
 class GestionPaiements:
     def __init__(self):
+        self.repository = PaiementRepository(Database())
         self.paiements = []
-        self.initialiser_fichier()
+        self.sauvegardes = BackupManager(self.repository.db)
+        self.migrer_fichier_csv()
+        self.repository.abonner(self.sauvegardes.journaliser)
+        self.sauvegardes.verifier_planification()
         self.charger_donnees()
         
-    def initialiser_fichier(self) -> None:
-        """Initialise le fichier CSV avec les en-têtes si nécessaire"""
-        if not os.path.exists(FICHIER_DONNEES):
-            with open(FICHIER_DONNEES, mode='w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=CHAMPS)
-                writer.writeheader()
+    def fermer(self) -> None:
+        """Ferme le journal des modifications"""
+        self.sauvegardes.fermer()
+
+    def migrer_fichier_csv(self) -> None:
+        """Importe une seule fois l'ancien fichier CSV dans la base SQLite"""
+        # Migration hors journal : instantané juste après, sinon une restauration la perdrait
+        if os.path.exists(FICHIER_DONNEES) and self.repository.migrer_csv(FICHIER_DONNEES):
+            self.sauvegardes.snapshot()
     
     def charger_donnees(self) -> None:
-        """Charge les données depuis le fichier CSV"""
-        try:
-            with open(FICHIER_DONNEES, mode='r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                self.paiements = [row for row in reader]
-        except FileNotFoundError:
-            self.paiements = []
-    
-    def sauvegarder_donnees(self) -> None:
-        """Sauvegarde les données dans le fichier CSV"""
-        with open(FICHIER_DONNEES, mode='w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=CHAMPS)
-            writer.writeheader()
-            writer.writerows(self.paiements)
-        
-        # Créer une sauvegarde datée
-        date_str = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        with open(FICHIER_SAUVEGARDE.format(date_str), mode='w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=CHAMPS)
-            writer.writeheader()
-            writer.writerows(self.paiements)
-    
-    def generer_id(self) -> str:
-        """Génère un ID unique pour un nouveau paiement"""
-        ids = [int(p['id']) for p in self.paiements if 'id' in p and p['id'].isdigit()]
-        return str(max(ids) + 1) if ids else "1"
+        """Charge les données depuis la base SQLite"""
+        self.paiements = self.repository.lister()
+        self.index_recherche = SearchIndex(self.paiements)
+        self.roster = RosterMatrix(self.paiements)
     
     def enregistrer_paiement(self) -> None:
         """Enregistre un nouveau paiement"""
         print("\n--- NOUVEAU PAIEMENT ---")
         
         paiement = {
-            'id': self.generer_id(),
             'nom': input("Nom de l'élève: ").strip().upper(),
             'prenom': input("Prénom de l'élève: ").strip().capitalize(),
             'classe': input("Classe: ").strip().upper(),
-            'montant': input("Montant payé: ").strip(),
+            'montant': self.saisir_montant("Montant payé: "),
             'mois': input("Mois concerné (ex: Septembre 2023): ").strip(),
             'methode_paiement': self.choisir_methode_paiement(),
             'statut': "payé",
@@ -73,12 +63,27 @@ class GestionPaiements:
         paiement['date_paiement'] = maintenant.strftime("%d/%m/%Y")
         paiement['heure_paiement'] = maintenant.strftime("%H:%M:%S")
         
-        self.paiements.append(paiement)
-        self.sauvegarder_donnees()
+        paiement['id'] = self.repository.ajouter(paiement)
+        self.paiements.append(Paiement.from_dict(paiement))
+        self.index_recherche.ajouter(self.paiements[-1])
+        self.roster.ajouter(self.paiements[-1])
         
         print(f"\n✅ Paiement enregistré (ID: {paiement['id']})")
         self.generer_recu(paiement)
     
+    def saisir_montant(self, invite: str, actuel: Optional[str] = None) -> str:
+        """Demande un montant en FCFA jusqu'à obtenir une valeur valide"""
+        while True:
+            saisie = input(invite).strip()
+            if not saisie and actuel is not None:
+                return actuel
+            try:
+                if montant_fcfa(saisie) > 0:
+                    return saisie
+            except ValueError:
+                pass
+            print("Montant invalide. Veuillez entrer un nombre positif.")
+    
     def choisir_methode_paiement(self) -> str:
         """Affiche un menu pour choisir la méthode de paiement"""
         methodes = ["Espèces", "Chèque", "Virement", "Carte bancaire", "Mobile Money"]
@@ -107,7 +112,7 @@ class GestionPaiements:
                     'nom': input(f"Nom ({paiement['nom']}): ").strip() or paiement['nom'],
                     'prenom': input(f"Prénom ({paiement['prenom']}): ").strip() or paiement['prenom'],
                     'classe': input(f"Classe ({paiement['classe']}): ").strip() or paiement['classe'],
-                    'montant': input(f"Montant ({paiement['montant']}): ").strip() or paiement['montant'],
+                    'montant': self.saisir_montant(f"Montant ({paiement['montant']}): ", paiement['montant']),
                     'mois': input(f"Mois ({paiement['mois']}): ").strip() or paiement['mois'],
                     'methode_paiement': input(f"Méthode ({paiement['methode_paiement']}): ").strip() or paiement['methode_paiement'],
                     'statut': self.choisir_statut(paiement['statut']),
@@ -119,8 +124,10 @@ class GestionPaiements:
                 nouvelles_valeurs['date_paiement'] = maintenant.strftime("%d/%m/%Y")
                 nouvelles_valeurs['heure_paiement'] = maintenant.strftime("%H:%M:%S")
                 
-                self.paiements[i] = {**paiement, **nouvelles_valeurs}
-                self.sauvegarder_donnees()
+                self.repository.modifier(id_paiement, nouvelles_valeurs)
+                self.paiements[i] = Paiement.from_dict({**paiement, **nouvelles_valeurs})
+                self.index_recherche.remplacer(paiement, self.paiements[i])
+                self.roster.remplacer(paiement, self.paiements[i])
                 print("\n✅ Paiement modifié avec succès")
                 return
         
@@ -153,24 +160,25 @@ class GestionPaiements:
         
         if choix == '1':
             id_paiement = input("ID du paiement: ").strip()
-            resultats = [p for p in self.paiements if p['id'] == id_paiement]
+            resultats = self.repository.rechercher(id=id_paiement)
         elif choix == '2':
-            nom = input("Nom: ").strip().upper()
-            prenom = input("Prénom: ").strip().capitalize()
-            resultats = [p for p in self.paiements if p['nom'] == nom and p['prenom'] == prenom]
+            # Recherche approchée : accents et fautes de frappe tolérés, nom et/ou prénom
+            texte = input("Nom et/ou prénom: ").strip()
+            resultats = self.index_recherche.rechercher(texte)
         elif choix == '3':
             classe = input("Classe: ").strip().upper()
-            resultats = [p for p in self.paiements if p['classe'] == classe]
+            resultats = self.repository.rechercher(classe=classe)
         elif choix == '4':
-            mois = input("Mois (ex: Septembre 2023): ").strip()
-            resultats = [p for p in self.paiements if p['mois'] == mois]
+            # Un mois, une plage ("Septembre 2023 - Juin 2024") ou une année scolaire ("2023-2024")
+            mois = input("Mois (ex: Septembre 2023, Septembre 2023 - Juin 2024, 2023-2024): ").strip()
+            resultats = self.repository.rechercher(mois=mois)
         elif choix == '5':
             print("\nStatuts disponibles:")
             for i, statut in enumerate(STATUTS, 1):
                 print(f"{i}. {statut}")
             choix_statut = input("Choix (1-4): ").strip()
             if choix_statut.isdigit() and 1 <= int(choix_statut) <= 4:
-                resultats = [p for p in self.paiements if p['statut'] == STATUTS[int(choix_statut)-1]]
+                resultats = self.repository.rechercher(statut=STATUTS[int(choix_statut)-1])
             else:
                 print("Choix invalide")
                 return
@@ -206,23 +214,11 @@ class GestionPaiements:
         
         choix = input("\nVoulez-vous sauvegarder ce reçu? (O/N): ").strip().upper()
         if choix == 'O':
-            nom_fichier = f"recu_{paiement['id']}_{paiement['nom']}_{paiement['prenom']}.txt"
-            with open(nom_fichier, 'w', encoding='utf-8') as f:
-                f.write("ÉCOLE SECONDAIRE - REÇU DE PAIEMENT\n")
-                f.write("="*40 + "\n")
-                f.write(f"ID: {paiement['id']}\n")
-                f.write(f"Élève: {paiement['prenom']} {paiement['nom']}\n")
-                f.write(f"Classe: {paiement['classe']}\n")
-                f.write(f"Montant: {paiement['montant']} FCFA\n")
-                f.write(f"Mois: {paiement['mois']}\n")
-                f.write(f"Statut: {paiement['statut']}\n")
-                f.write(f"Méthode: {paiement['methode_paiement']}\n")
-                f.write(f"Date: {paiement['date_paiement']} à {paiement['heure_paiement']}\n")
-                if paiement['notes']:
-                    f.write(f"\nNotes: {paiement['notes']}\n")
-                f.write("\nMerci pour votre confiance!\n")
-                f.write("="*40 + "\n")
-            
+            format = input("Format (txt/html/pdf/escpos) [txt]: ").strip().lower() or "txt"
+            if format not in SORTIES:
+                print("Format invalide")
+                return
+            nom_fichier = RENDU.enregistrer(paiement, nom_recu(paiement, SORTIES[format][1]), format)
             print(f"Reçu sauvegardé sous: {nom_fichier}")
     
     def statistiques(self) -> None:
@@ -231,63 +227,84 @@ class GestionPaiements:
             print("\nAucun paiement enregistré")
             return
         
-        total_paiements = len(self.paiements)
-        total_montant = sum(float(p['montant']) for p in self.paiements if p['statut'] == 'payé')
-        
-        # Par classe
-        classes = defaultdict(list)
-        for p in self.paiements:
-            classes[p['classe']].append(float(p['montant']))
-        
-        # Par statut
-        statuts = defaultdict(int)
-        for p in self.paiements:
-            statuts[p['statut']] += 1
+        # Agrégats pré-calculés en base (mis à jour à chaque écriture)
+        agregats = self.repository.statistiques()
+        total = agregats.get("total", {}).get("", {"nombre": 0, "montant_paye": 0})
         
         print("\n--- STATISTIQUES ---")
-        print(f"Total paiements: {total_paiements}")
-        print(f"Montant total perçu: {total_montant:.2f} FCFA")
+        print(f"Total paiements: {total['nombre']}")
+        print(f"Montant total perçu: {total['montant_paye']:.2f} FCFA")
         
         print("\nPar classe:")
-        for classe, montants in sorted(classes.items()):
-            print(f"- {classe}: {len(montants)} paiements, Total: {sum(montants):.2f} FCFA")
+        for classe, valeurs in sorted(agregats.get("classe", {}).items()):
+            print(f"- {classe}: {valeurs['nombre']} paiements, Total: {valeurs['montant']:.2f} FCFA")
         
         print("\nPar statut:")
-        for statut, count in statuts.items():
-            print(f"- {statut}: {count}")
+        for statut, valeurs in agregats.get("statut", {}).items():
+            print(f"- {statut}: {valeurs['nombre']}")
+        
+        aujourd_hui = datetime.date.today()
+        debut, fin = annee_scolaire(periode(aujourd_hui.year, aujourd_hui.month))
+        print(f"\nPar mois ({libelle_periode(debut)} - {libelle_periode(fin)}):")
+        for periode_, nombre, montant, montant_paye in self.repository.serie_mois(debut, fin):
+            print(f"- {libelle_periode(periode_)}: {nombre} paiements, Perçu: {montant_paye:.2f} / {montant:.2f} FCFA")
         
         print("\nDerniers paiements:")
-        derniers = sorted(self.paiements, key=lambda x: (
-            datetime.datetime.strptime(x['date_paiement'], "%d/%m/%Y"),
-            datetime.datetime.strptime(x['heure_paiement'], "%H:%M:%S")
-        ), reverse=True)[:5]
+        derniers = sorted(self.paiements, key=lambda x: (x.date_ordinal, x.heure), reverse=True)[:5]
         
         for p in derniers:
             print(f"{p['date_paiement']} - {p['prenom']} {p['nom']}: {p['montant']} FCFA ({p['statut']})")
     
     def exporter_donnees(self) -> None:
-        """Exporte les données dans un format externe"""
+        """Exporte les paiements (filtrés) en flux, lot par lot"""
         print("\n--- EXPORT DONNÉES ---")
         print("1. Format CSV (Excel)")
         print("2. Format Texte")
-        choix = input("Choix (1-2): ").strip()
-        
-        date_str = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        print("3. Format Excel (XLSX)")
+        print("4. Format JSON Lines")
+        print("5. Format Parquet")
+        choix = input("Choix (1-5): ").strip()
+        formats = {'1': "csv", '2': "txt", '3': "xlsx", '4': "jsonl", '5': "parquet"}
+        if choix not in formats:
+            print("Choix invalide")
+            return
+        format = formats[choix]
         
-        if choix == '1':
-            nom_fichier = f"export_paiements_{date_str}.csv"
-            with open(nom_fichier, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=CHAMPS)
-                writer.writeheader()
-                writer.writerows(self.paiements)
-            print(f"Données exportées dans {nom_fichier}")
+        print("Filtres (laissez vide pour tout exporter):")
+        criteres = {
+            'classe': input("Classe: ").strip().upper(),
+            'mois': input("Mois (ex: Septembre 2023): ").strip(),
+            'statut': input(f"Statut ({'/'.join(STATUTS)}): ").strip(),
+            'date_debut': input("Payé à partir du (JJ/MM/AAAA): ").strip(),
+            'date_fin': input("Payé jusqu'au (JJ/MM/AAAA): ").strip(),
+        }
+        criteres = {critere: valeur for critere, valeur in criteres.items() if valeur}
+        compression = format in ("csv", "jsonl", "parquet") and input("Compresser le fichier ? (o/n): ").strip().lower() == 'o'
         
-        elif choix == '2':
-            nom_fichier = f"export_paiements_{date_str}.txt"
-            with open(nom_fichier, 'w', encoding='utf-8') as f:
-                f.write("LISTE DES PAIEMENTS\n")
-                f.write("="*50 + "\n")
-                for p in self.paiements:
+        date_str = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        nom_fichier = f"export_paiements_{date_str}.{format}" + (".gz" if compression and format != "parquet" else "")
+        try:
+            if format == "txt":
+                exportes = self.exporter_texte(nom_fichier, criteres)
+            else:
+                exportes = StreamingExporter(self.repository).exporter(
+                    nom_fichier, format, compression,
+                    progression=lambda fraction: print(f"\r{fraction:.0%}", end="", flush=True),
+                    **criteres
+                )
+        except ValueError as e:
+            print(f"\n❌ {e}")
+            return
+        print(f"\n{exportes} paiement(s) exporté(s) dans {nom_fichier}")
+    
+    def exporter_texte(self, nom_fichier: str, criteres: Dict) -> int:
+        """Liste lisible des paiements, écrite lot par lot"""
+        exportes = 0
+        with open(nom_fichier, 'w', encoding='utf-8') as f:
+            f.write("LISTE DES PAIEMENTS\n")
+            f.write("="*50 + "\n")
+            for lot in self.repository.iterer(**criteres):
+                for p in lot:
                     f.write(f"ID: {p['id']}\n")
                     f.write(f"Élève: {p['prenom']} {p['nom']} ({p['classe']})\n")
                     f.write(f"Montant: {p['montant']} FCFA | Mois: {p['mois']}\n")
@@ -296,46 +313,83 @@ class GestionPaiements:
                     if p['notes']:
                         f.write(f"Notes: {p['notes']}\n")
                     f.write("-"*50 + "\n")
-            print(f"Données exportées dans {nom_fichier}")
-        
-        else:
-            print("Choix invalide")
+                exportes += len(lot)
+        return exportes
     
     def lister_eleves_par_classe(self) -> None:
-        """Liste les élèves d'une classe spécifiée et les sépare en deux groupes : payés et non payés"""
-        classe = input("Entrez la classe à rechercher : ").strip().upper()
-        
-        if not classe:
+        """Élèves des classes demandées, séparés en à jour / non payés sur une plage de mois"""
+        saisie = input("Classe(s) à rechercher (séparées par des virgules) : ").strip().upper()
+        classes = [c.strip() for c in saisie.split(",") if c.strip()]
+        if not classes:
             print("\n❌ Classe invalide.")
             return
         
-        # Filtrer les paiements par classe
-        paiements_classe = [p for p in self.paiements if p['classe'] == classe]
+        aujourd_hui = datetime.date.today()
+        courant = periode(aujourd_hui.year, aujourd_hui.month)
+        rentree = annee_scolaire(courant)[0]
+        debut_texte = input(f"Du mois ({libelle_periode(rentree)}) : ").strip()
+        fin_texte = input(f"Au mois ({libelle_periode(courant)}) : ").strip()
+        debut = periode_mois(debut_texte) if debut_texte else rentree
+        fin = periode_mois(fin_texte) if fin_texte else courant
+        if debut is None or fin is None or fin < debut:
+            print("\n❌ Mois invalides (ex: Octobre 2024, le premier avant le second).")
+            return
         
-        if not paiements_classe:
-            print(f"\n❌ Aucun élève trouvé pour la classe {classe}.")
+        inconnues = [c for c in classes if c not in self.roster.classes]
+        if inconnues:
+            print(f"\n❌ Aucun élève trouvé pour : {', '.join(inconnues)}.")
+        classes = [c for c in classes if c in self.roster.classes]
+        if not classes:
             return
         
-        # Séparer les élèves en deux groupes : payés et non payés
-        eleves_payes = [p for p in paiements_classe if p['statut'] == "payé"]
-        eleves_non_payes = [p for p in paiements_classe if p['statut'] != "payé"]
+        # Masque de la plage et un ET binaire par élève (matrice élèves x mois)
+        eleves_payes = self.roster.payes(debut, fin, classes)
+        eleves_non_payes = self.roster.impayes(debut, fin, classes)
         
-        print(f"\n=== Liste des élèves de la classe {classe} ===")
+        print(f"\n=== Élèves de {', '.join(classes)} : {libelle_periode(debut)} à {libelle_periode(fin)} ===")
         
-        print("\n✅ Élèves ayant payé :")
+        print("\n✅ Élèves à jour :")
         if eleves_payes:
-            for eleve in eleves_payes:
-                print(f"- {eleve['prenom']} {eleve['nom']} (Montant : {eleve['montant']} FCFA, Mois : {eleve['mois']})")
+            for classe, nom, prenom in eleves_payes:
+                print(f"- {prenom} {nom} ({classe})")
         else:
-            print("Aucun élève n'a payé.")
+            print("Aucun élève n'est à jour.")
         
         print("\n❌ Élèves n'ayant pas payé :")
         if eleves_non_payes:
-            for eleve in eleves_non_payes:
-                print(f"- {eleve['prenom']} {eleve['nom']} (Statut : {eleve['statut']}, Mois : {eleve['mois']})")
+            for classe, nom, prenom, manquants in eleves_non_payes:
+                print(f"- {prenom} {nom} ({classe}) : {', '.join(libelle_periode(p) for p in manquants)}")
         else:
             print("Tous les élèves ont payé.")
 
+    def importer_releve(self) -> None:
+        """Importe un relevé CSV/Excel (banque, Mobile Money) après une simulation"""
+        print("\n--- IMPORT D'UN RELEVÉ ---")
+        chemin = input("Chemin du fichier (.csv ou .xlsx): ").strip().strip('"')
+        if not os.path.exists(chemin):
+            print("\n❌ Fichier introuvable.")
+            return
+        print("Méthode de paiement à utiliser si le relevé n'en indique pas :")
+        methode = self.choisir_methode_paiement()
+        importeur = BulkImporter(self.repository)
+        progression = lambda rapport, fraction: print(f"\r{fraction:.0%} ({rapport['lus']} lignes)", end="", flush=True)
+        
+        try:
+            rapport = importeur.importer(chemin, simulation=True, methode_defaut=methode, progression=progression)
+        except ValueError as e:
+            print(f"\n❌ {e}")
+            return
+        print(f"\n\nLignes lues: {rapport['lus']} | À importer: {rapport['importes']} | "
+              f"Doublons: {rapport['doublons']} | Rejets: {len(rapport['rejets'])}")
+        for numero, motif in rapport['rejets'][:20]:
+            print(f"  Ligne {numero}: {motif}")
+        if not rapport['importes'] or input("\nImporter ces paiements ? (o/n): ").strip().lower() != 'o':
+            return
+        
+        rapport = importeur.importer(chemin, methode_defaut=methode, progression=progression)
+        self.charger_donnees()
+        print(f"\n\n✅ {rapport['importes']} paiement(s) importé(s)")
+
 def menu_principal():
     """Affiche le menu principal"""
     gestion = GestionPaiements()
@@ -348,9 +402,10 @@ def menu_principal():
         print("4. Statistiques")
         print("5. Exporter données")
         print("6. Lister élèves par classe")
-        print("7. Quitter")
+        print("7. Importer un relevé (CSV/Excel)")
+        print("8. Quitter")
         
-        choix = input("\nVotre choix (1-7): ").strip()
+        choix = input("\nVotre choix (1-8): ").strip()
         
         if choix == '1':
             gestion.enregistrer_paiement()
@@ -365,10 +420,13 @@ def menu_principal():
         elif choix == '6':
             gestion.lister_eleves_par_classe()
         elif choix == '7':
+            gestion.importer_releve()
+        elif choix == '8':
             print("\nMerci d'avoir utilisé le système de gestion des paiements. Au revoir!")
+            gestion.fermer()
             break
         else:
-            print("\nChoix invalide. Veuillez sélectionner une option entre 1 et 7.")
+            print("\nChoix invalide. Veuillez sélectionner une option entre 1 et 8.")
 
 if __name__ == "__main__":
     menu_principal()
\ No newline at end of file
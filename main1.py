@@ -38,6 +38,9 @@ class GestionPaiements:
                 self.paiements = [row for row in reader]
         except FileNotFoundError:
             self.paiements = []
+        # Dernier ID attribué, calculé une seule fois au chargement
+        ids = [int(p['id']) for p in self.paiements if 'id' in p and p['id'].isdigit()]
+        self.dernier_id = max(ids) if ids else 0
     
     def sauvegarder_donnees(self):
         with open(FICHIER_DONNEES, mode='w', newline='', encoding='utf-8') as f:
@@ -52,8 +55,8 @@ class GestionPaiements:
             writer.writerows(self.paiements)
     
     def generer_id(self):
-        ids = [int(p['id']) for p in self.paiements if 'id' in p and p['id'].isdigit()]
-        return str(max(ids) + 1) if ids else "1"
+        self.dernier_id += 1
+        return str(self.dernier_id)
     
     def ajouter_paiement(self, paiement):
         paiement['id'] = self.generer_id()
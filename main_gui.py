@@ -1,45 +1,63 @@
 import sys
 import os
 import json 
-import csv  
+from utils.startup import StartupProfiler
+
+# Chronométrage du démarrage : python main_gui.py --profile-startup
+PROFIL = StartupProfiler("--profile-startup" in sys.argv)
 # Remplacez les imports PyQt6 par PyQt5
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
     QLineEdit, QPushButton, QTableWidget, QTableWidgetItem, QComboBox,
     QDateEdit, QTabWidget, QMessageBox, QFormLayout, QGroupBox, QTextEdit,
-    QDialog, QInputDialog, QSpinBox, QCheckBox, QSystemTrayIcon
+    QDialog, QInputDialog, QSpinBox, QCheckBox, QSystemTrayIcon, QTableView, QAbstractItemView,
+    QFileDialog, QProgressDialog, QDialogButtonBox
 )
-from PyQt5.QtCore import Qt, QDate
+from PyQt5.QtCore import Qt, QDate, QTimer
 from PyQt5.QtGui import QFont, QIcon, QPixmap  # Ajoutez QPixmap ici
+from PyQt5 import sip
 
 # Le reste du code reste identique, mais remplacez tous les 'PyQt6' par 'PyQt5'
 import logging
 import logging.config
-from datetime import datetime, timedelta
-from functools import partial
+import multiprocessing
+import threading
+from datetime import date, datetime, timedelta
+from functools import partial, cached_property
 from collections import defaultdict  # Ajout nécessaire pour les statistiques
 
 # Nouveaux imports
 from models.database import Database
+from models.paiement import Paiement, STATUTS, METHODES_PAIEMENT, periode, periode_mois
+from models.repository import PaiementRepository
+from utils.backup import BackupManager
 from utils.cache import Cache
-from utils.pagination import Paginator
-from utils.pdf_generator import PDFGenerator
-from utils.charts import ChartGenerator
+from utils.pagination import KeysetPaginator
+from utils.table_model import PaiementTableModel
+from utils.prefix_index import ClassePrefixIndex, cle_liste
+from utils.search_index import SearchIndex
+from utils.overdue import OverdueIndex
+from utils.roster import RosterMatrix, annee_scolaire, libelle_periode
+from utils.persistence import PersistenceWorker
+from utils.importer import BulkImporter
+from utils.exporter import StreamingExporter, FORMATS
+from utils.background import BackgroundTask
+from utils.receipts import RENDU, nom_recu
 from utils.notifications import NotificationManager
-from utils.config import LOGGING, DATABASE, CACHE
+from utils.config import LOGGING, DATABASE, PAGINATION, RECUS, RETARDS
 
 # Configuration du logging
 logging.config.dictConfig(LOGGING)
 logger = logging.getLogger(__name__)
+PROFIL.marquer("imports")
 
 # Constantes
-STATUTS = ["payé", "impayé", "partiel", "remboursé"]
-METHODES_PAIEMENT = ["Espèces", "Chèque", "Virement", "Carte bancaire", "Mobile Money"]
 TEMPS_ACCES_DEFAUT = 24  # heures
 FICHIER_UTILISATEURS = "data/utilisateurs.json"  # Ajout de la constante
-FICHIER_DONNEES = "data/paiements.csv"  # Ajout de la constante
-FICHIER_SAUVEGARDE = "data/backups/paiements_{}.csv"  # Ajout pour les sauvegardes
-CHAMPS = ["id", "nom", "prenom", "classe", "montant", "mois", "methode_paiement", "statut", "date_paiement", "heure_paiement", "notes"]  # Ajout des champs
+FICHIER_DONNEES = "data/paiements.csv"  # Ancien stockage CSV, migré vers SQLite au démarrage
+COLONNES_TABLE = ["id", "nom", "prenom", "classe", "montant", "mois", "statut", "date_paiement"]  # Colonnes du tableau de résultats
+ENTETES_TABLE = ["ID", "Nom", "Prénom", "Classe", "Montant", "Mois", "Statut", "Date"]
+DIMENSIONS_VENTILATION = {"Classe": "classe", "Statut": "statut", "Méthode": "methode", "Mois": "mois"}  # Onglet Statistiques
 
 BUTTON_STYLE = """
 QPushButton {
@@ -155,108 +173,197 @@ class GestionUtilisateurs:
         return [u for u in self.utilisateurs if u.username != "admin"]
 
 class GestionPaiements:
-    def __init__(self):
+    def __init__(self, db=None):
+        self.repository = PaiementRepository(db or Database())
         self.paiements = []
-        self.initialiser_fichier()
+        self.sauvegardes = BackupManager(self.repository.db)
+        self.migrer_fichier_csv()
+        # Écritures et instantanés dans un thread dédié : l'interface ne bloque jamais
+        self.ecritures = PersistenceWorker(self.repository.db, [self.sauvegardes.journaliser])
+        self.ecritures.ecrit.connect(self.ecriture_validee)
+        self.ecritures.planifier(self.sauvegardes.verifier_planification)
+        # Registre vide jusqu'à la fin du chargement en arrière-plan
+        self.charge = False
+        self.observateurs_chargement = []
+        self.tache_chargement = None
+        self.ecritures_pendant_chargement = None
+        self.installer(self.indexer([]))
         self.charger_donnees()
     
-    def initialiser_fichier(self):
-        if not os.path.exists(FICHIER_DONNEES):
-            with open(FICHIER_DONNEES, mode='w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=CHAMPS)
-                writer.writeheader()
+    def fermer(self):
+        # Écritures en attente validées d'abord : elles sont encore journalisées
+        self.ecritures.arreter()
+        self.sauvegardes.fermer()
+
+    def migrer_fichier_csv(self):
+        # Migration unique de l'ancien stockage CSV vers SQLite. Elle ne passe pas par le
+        # journal : instantané juste après, sinon une restauration perdrait les lignes migrées
+        if os.path.exists(FICHIER_DONNEES) and self.repository.migrer_csv(FICHIER_DONNEES):
+            self.sauvegardes.snapshot()
     
     def charger_donnees(self):
-        try:
-            with open(FICHIER_DONNEES, mode='r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                self.paiements = [row for row in reader]
-        except FileNotFoundError:
-            self.paiements = []
-    
-    def sauvegarder_donnees(self):
-        with open(FICHIER_DONNEES, mode='w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=CHAMPS)
-            writer.writeheader()
-            writer.writerows(self.paiements)
-        
-        date_str = datetime.now().strftime("%Y%m%d_%H%M%S")
-        with open(FICHIER_SAUVEGARDE.format(date_str), mode='w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=CHAMPS)
-            writer.writeheader()
-            writer.writerows(self.paiements)
-    
-    def generer_id(self):
-        ids = [int(p['id']) for p in self.paiements if 'id' in p and p['id'].isdigit()]
-        return str(max(ids) + 1) if ids else "1"
+        # Lecture et indexation dans un thread de lecture, sur sa propre connexion (WAL) : les
+        # saisies ne patientent pas derrière. Les écritures validées pendant la lecture sont
+        # gardées pour être réappliquées au registre chargé (chargement_termine)
+        self.ecritures_pendant_chargement = []
+        db = self.repository.db
+        def charger(avancer, annule):
+            repository = PaiementRepository(db)
+            try:
+                return self.indexer(repository.lister())
+            finally:
+                repository.conn.close()
+        tache = BackgroundTask(charger)
+        tache.termine.connect(partial(self.chargement_termine, tache))
+        tache.echec.connect(partial(self.chargement_echoue, tache))
+        self.tache_chargement = tache.demarrer()
+
+    @staticmethod
+    def indexer(paiements):
+        # numpy : chargé après la connexion
+        from utils.analytics import AnalyticsEngine
+        from utils.bitmap_index import BitmapIndex
+        positions = {paiement.id: i for i, paiement in enumerate(paiements)}
+        return (paiements, positions, AnalyticsEngine(paiements), ClassePrefixIndex(paiements),
+                SearchIndex(paiements), OverdueIndex(paiements), RosterMatrix(paiements), BitmapIndex(paiements))
+
+    def installer(self, donnees):
+        # positions : ID du paiement -> rang dans self.paiements
+        (self.paiements, self.positions, self.analytics, self.index_classes, self.index_recherche,
+         self.index_retards, self.roster, self.index_bitmap) = donnees
+
+    def chargement_termine(self, tache, donnees):
+        if tache is not self.tache_chargement:
+            # Chargement dépassé par un plus récent
+            return
+        ancien = self.index_retards
+        self.installer(donnees)
+        # Rechargement (après un import) : les retards déjà signalés ne reviennent pas
+        self.index_retards.reprendre(ancien)
+        # Écritures validées pendant la lecture, réappliquées : même résultat si la lecture
+        # les contenait déjà (une insertion d'un ID connu remplace le paiement)
+        ecritures, self.ecritures_pendant_chargement = self.ecritures_pendant_chargement, None
+        for operation, id_paiement, valeurs in ecritures:
+            self.ecriture_validee(operation, id_paiement, valeurs)
+        self.charge = True
+        for callback in self.observateurs_chargement:
+            callback()
+
+    def chargement_echoue(self, tache, message):
+        if tache is self.tache_chargement:
+            self.ecritures_pendant_chargement = None
+            logger.error(f"Échec du chargement du registre : {message}")
     
-    def ajouter_paiement(self, paiement):
-        paiement['id'] = self.generer_id()
+    def ajouter_paiement(self, paiement, jeton=None):
+        # Dépôt dans la file d'écriture ; l'ID arrive avec le signal ecritures.ecrit
         maintenant = datetime.now()
         paiement['date_paiement'] = maintenant.strftime("%d/%m/%Y")
         paiement['heure_paiement'] = maintenant.strftime("%H:%M:%S")
-        self.paiements.append(paiement)
-        self.sauvegarder_donnees()
-        return paiement['id']
+        self.ecritures.ajouter(paiement, jeton)
     
-    def modifier_paiement(self, id_paiement, nouvelles_valeurs):
-        for i, paiement in enumerate(self.paiements):
-            if paiement['id'] == id_paiement:
-                maintenant = datetime.datetime.now()
-                nouvelles_valeurs['date_paiement'] = maintenant.strftime("%d/%m/%Y")
-                nouvelles_valeurs['heure_paiement'] = maintenant.strftime("%H:%M:%S")
-                self.paiements[i] = {**paiement, **nouvelles_valeurs}
-                self.sauvegarder_donnees()
-                return True
-        return False
+    def modifier_paiement(self, id_paiement, nouvelles_valeurs, jeton=None):
+        maintenant = datetime.now()
+        nouvelles_valeurs['date_paiement'] = maintenant.strftime("%d/%m/%Y")
+        nouvelles_valeurs['heure_paiement'] = maintenant.strftime("%H:%M:%S")
+        self.ecritures.modifier(id_paiement, nouvelles_valeurs, jeton)
     
-    def rechercher_paiements(self, critere, valeur):
-        valeur = valeur.strip().lower()
-        if critere == "id":
-            return [p for p in self.paiements if p['id'] == valeur]
-        elif critere == "nom":
-            return [p for p in self.paiements if p['nom'].lower() == valeur]
-        elif critere == "classe":
-            return [p for p in self.paiements if p['classe'].lower() == valeur]
-        elif critere == "mois":
-            return [p for p in self.paiements if p['mois'].lower() == valeur]
-        elif critere == "statut":
-            return [p for p in self.paiements if p['statut'].lower() == valeur]
-        return []
+    def ecriture_validee(self, operation, id_paiement, valeurs, jeton=None):
+        # Écriture validée en base : mise à jour du registre en mémoire et des index
+        if self.ecritures_pendant_chargement is not None:
+            self.ecritures_pendant_chargement.append((operation, id_paiement, valeurs))
+        i = self.positions.get(int(id_paiement))
+        if operation == "insert" and i is None:
+            self.positions[int(id_paiement)] = len(self.paiements)
+            self.paiements.append(Paiement.from_dict({**valeurs, 'id': id_paiement}))
+            self.analytics.ajouter(self.paiements[-1])
+            self.index_classes.ajouter(self.paiements[-1])
+            self.index_recherche.ajouter(self.paiements[-1])
+            self.index_retards.ajouter(self.paiements[-1])
+            self.roster.ajouter(self.paiements[-1])
+            self.index_bitmap.ajouter(self.paiements[-1])
+            return
+        if i is None:
+            return
+        paiement = self.paiements[i]
+        self.paiements[i] = Paiement.from_dict({**paiement, 'periode': paiement.periode, **valeurs})
+        self.analytics.modifier(self.paiements[i])
+        self.index_classes.remplacer(paiement, self.paiements[i])
+        self.index_recherche.remplacer(paiement, self.paiements[i])
+        self.index_retards.remplacer(paiement, self.paiements[i])
+        self.roster.remplacer(paiement, self.paiements[i])
+        self.index_bitmap.remplacer(paiement, self.paiements[i])
     
+    def rechercher_paiements(self, critere, valeur=None, **criteres):
+        # Un seul critère (onglet Recherche) ou plusieurs combinés : classe=..., mois=..., statut=...
+        if valeur is not None:
+            criteres[critere] = valeur
+        try:
+            return self.repository.rechercher(**criteres)
+        except ValueError:
+            return []
+    
+    def rechercher_eleves(self, texte):
+        # Recherche approchée (accents, fautes de frappe) sur nom, prénom, classe et notes
+        return self.index_recherche.rechercher(texte)
+
     def get_statistiques(self):
+        # Lecture des agrégats tenus à jour en base : coût constant quelle que soit la taille du registre
+        agregats = self.repository.statistiques()
+        total = agregats.get("total", {}).get("", {"nombre": 0, "montant_paye": 0})
         stats = {
-            "total": len(self.paiements),
-            "montant_total": sum(float(p['montant']) for p in self.paiements if p['statut'] == 'payé'),
-            "par_classe": defaultdict(list),
+            "total": total["nombre"],
+            "montant_total": total["montant_paye"],
+            "par_classe": defaultdict(int),
             "par_statut": defaultdict(int)
         }
-        for p in self.paiements:
-            stats["par_classe"][p['classe']].append(float(p['montant']))
-            stats["par_statut"][p['statut']] += 1
+        for classe, valeurs in agregats.get("classe", {}).items():
+            stats["par_classe"][classe] = valeurs["montant"]
+        for statut, valeurs in agregats.get("statut", {}).items():
+            stats["par_statut"][statut] = valeurs["nombre"]
         return stats
 
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         
+        # Connexion d'abord : base, données et icône de notification seulement une fois authentifié
+        self.gestion_utilisateurs = GestionUtilisateurs()
+        PROFIL.marquer("affichage de la connexion")
+        if not self.authentifier_utilisateur():
+            sys.exit()
+        PROFIL.marquer("connexion (saisie comprise)")
+        
         # Initialisation des nouvelles fonctionnalités
         self.db = Database()
         self.cache = Cache()
         self.notification_manager = NotificationManager()
-        self.chart_generator = ChartGenerator()
-        self.pdf_generator = PDFGenerator()
-        self.paginator = None
-        self.current_page = 1
-        self.items_per_page = CACHE['max_size']
+        self.items_per_page = PAGINATION['page_size']
         
         # Initialisation existante
-        self.gestion_utilisateurs = GestionUtilisateurs()
-        self.gestion = GestionPaiements()
-        
-        # Configuration de l'interface
-        if not self.authentifier_utilisateur():
-            sys.exit()
+        self.gestion = GestionPaiements(self.db)
+        PROFIL.marquer("chargement des données")
+        self.paginator = KeysetPaginator(self.gestion.repository, self.items_per_page)
+        self.gestion.ecritures.ecrit.connect(self.cache.invalider)
+        self.gestion.ecritures.ecrit.connect(self.paginator.invalider)
+        self.gestion.ecritures.ecrit.connect(self.rafraichir_registre)
+        self.gestion.ecritures.ecrit.connect(self.ecriture_terminee)
+        self.gestion.ecritures.echec.connect(self.ecriture_echouee)
+        self.gestion.ecritures.avancement.connect(self.import_avancement)
+        self.gestion.ecritures.termine.connect(self.import_termine)
+        # Pas de connexion à `termine` : le chargement peut finir avant qu'elle soit établie
+        self.gestion.observateurs_chargement.append(self.donnees_chargees)
+        QApplication.instance().aboutToQuit.connect(self.gestion.fermer)
+        # Instantané de sauvegarde vérifié périodiquement, dans le thread d'écriture
+        self.sauvegarde_timer = QTimer(self)
+        self.sauvegarde_timer.timeout.connect(
+            lambda: self.gestion.ecritures.planifier(self.gestion.sauvegardes.verifier_planification)
+        )
+        self.sauvegarde_timer.start(10 * 60 * 1000)
+        # Retards vérifiés périodiquement (et à la fin du chargement) : seuls les nouveaux sont calculés
+        self.retards_timer = QTimer(self)
+        self.retards_timer.timeout.connect(self.verifier_retards)
+        self.retards_timer.start(RETARDS['intervalle'] * 1000)
+        self.notification_manager.tray.messageClicked.connect(self.afficher_retards)
             
         # Configuration de la fenêtre
         self.setWindowTitle("Gestion des Paiements Scolaires")
@@ -264,45 +371,236 @@ class MainWindow(QMainWindow):
         
         # Initialisation de l'interface
         self.init_ui()
+        PROFIL.marquer("interface")
         logger.info("Application démarrée avec succès")
 
-    def update_table(self, data):
-        # Utilisation du cache et de la pagination
-        cache_key = f"table_data_page_{self.current_page}"
+    # matplotlib et reportlab : importés à la première utilisation des graphiques / PDF
+    @cached_property
+    def chart_generator(self):
+        from utils.charts import ChartGenerator
+        return ChartGenerator()
+
+    @cached_property
+    def pdf_generator(self):
+        from utils.pdf_generator import PDFGenerator
+        return PDFGenerator()
+
+    def update_table(self):
+        # Page courante de l'onglet Registre : cache par curseur de départ (vidé à chaque écriture)
+        cache_key = ("registre", self.paginator.depart)
         cached_data = self.cache.get(cache_key)
         
-        if cached_data:
-            logger.debug("Utilisation des données en cache")
-            paginated_data = cached_data
+        if cached_data is not None:
+            logger.debug(f"Utilisation des données en cache ({self.cache.stats()})")
+            paginated_data, self.paginator.suivant = cached_data
         else:
-            logger.debug("Génération de nouvelles données paginées")
-            self.paginator = Paginator(data, self.items_per_page)
-            paginated_data = self.paginator.get_page(self.current_page)
-            self.cache.set(cache_key, paginated_data)
+            logger.debug("Lecture de la page en base")
+            paginated_data = self.paginator.lire()
+            self.cache.set(cache_key, (paginated_data, self.paginator.suivant))
         
         # Mise à jour du tableau
-        self.result_table.setRowCount(0)
-        for row, item in enumerate(paginated_data):
-            self.result_table.insertRow(row)
-            for col, value in enumerate(item.values()):
-                self.result_table.setItem(row, col, QTableWidgetItem(str(value)))
+        self.page_model.set_paiements(paginated_data)
         
         # Mise à jour des contrôles de pagination
         self.update_pagination_controls()
-        
-        # Vérification des paiements en retard
-        self.notification_manager.check_paiements_retard(data)
+
+    def ecriture_terminee(self, operation, id_paiement, valeurs, jeton):
+        if jeton == "enregistrement":
+            self.statusBar().showMessage(f"Paiement enregistré avec succès (ID: {id_paiement}).", 5000)
+        elif jeton == "modification":
+            self.statusBar().showMessage(f"Paiement {id_paiement} modifié avec succès.", 5000)
+            if self.search_value_input.text().strip():
+                self.rechercher_paiements()
+
+    def donnees_chargees(self):
+        # Registre chargé en arrière-plan : onglets déjà construits à jour
+        if hasattr(self, "eleves_model"):  # onglet Liste par Classe déjà construit
+            self.remplir_liste_eleves_table()
+        self.statusBar().showMessage(f"{len(self.gestion.paiements)} paiements chargés.", 3000)
+        self.verifier_retards()
+
+    def verifier_retards(self):
+        if not self.gestion.charge:
+            return
+        index = self.gestion.index_retards
+        nouveaux = index.verifier()
+        if nouveaux:
+            logger.info(f"{len(nouveaux)} nouvel(s) élève(s) en retard de paiement ({len(index.en_retard)} au total)")
+            self.notification_manager.notifier_retards(nouveaux, len(index.en_retard))
+
+    def afficher_retards(self):
+        retards = self.gestion.index_retards.liste()
+        self.afficher_tableau(
+            "Élèves en retard de paiement",
+            f"{len(retards)} élève(s) sans paiement depuis plus de {self.gestion.index_retards.delai} jours",
+            ["Nom", "Prénom", "Classe", "Dernier paiement", "Jours"],
+            [(nom, prenom, classe, dernier.strftime("%d/%m/%Y"), jours) for nom, prenom, classe, dernier, jours in retards]
+        )
+
+    def afficher_arrieres(self):
+        # Comptes élèves tenus en base : pas de parcours des paiements
+        arrieres = self.gestion.repository.arrieres()
+        self.afficher_tableau(
+            "Arriérés de paiement",
+            f"{len(arrieres)} élève(s) avec un solde impayé, total : {sum(c['solde'] for c in arrieres):,.0f} FCFA",
+            ["ID", "Nom", "Prénom", "Classe", "Reste dû (FCFA)", "Versé (FCFA)"],
+            [(c['id'], c['nom'], c['prenom'], c['classe'], f"{c['solde']:,.0f}", f"{c['net_verse']:,.0f}") for c in arrieres]
+        )
+
+    def afficher_compte_eleve(self):
+        paiement = self.paiement_selectionne()
+        if not paiement:
+            QMessageBox.warning(self, "Attention", "Veuillez sélectionner un paiement")
+            return
+        compte = self.gestion.repository.compte_eleve(paiement['nom'], paiement['prenom'], paiement['classe'])
+        if not compte:
+            QMessageBox.information(self, "Compte élève", "Aucun compte pour cet élève")
+            return
+        self.afficher_tableau(
+            f"Compte de {compte['prenom']} {compte['nom']}",
+            f"Élève n° {compte['id']} ({compte['classe']}) : {compte['versements']} versement(s), "
+            f"{compte['net_verse']:,.0f} FCFA versés, reste dû {compte['solde']:,.0f} FCFA",
+            ["Mois", "Paiements", "Versé (FCFA)", "Remboursé (FCFA)", "Impayé (FCFA)", "Reste dû (FCFA)"],
+            [(libelle_periode(e['periode']), e['nombre'], f"{e['verse']:,.0f}", f"{e['rembourse']:,.0f}",
+              f"{e['impaye']:,.0f}", f"{e['reste']:,.0f}")
+             for e in self.gestion.repository.echeances(compte['id'])]
+        )
+
+    def afficher_solde_eleve(self):
+        # Onglet Nouveau Paiement : solde de l'élève saisi, lu par clé unique dans les comptes élèves
+        nom = self.nom_input.text().strip().upper()
+        prenom = self.prenom_input.text().strip().capitalize()
+        classe = self.classe_input.text().strip().upper()
+        compte = self.gestion.repository.compte_eleve(nom, prenom, classe) if nom and prenom and classe else None
+        if compte is None:
+            self.solde_label.clear()
+            return
+        self.solde_label.setText(
+            f"Élève n° {compte['id']} : {compte['versements']} versement(s), "
+            f"{compte['net_verse']:,.0f} FCFA versés, reste dû {compte['solde']:,.0f} FCFA"
+        )
+
+    def afficher_tableau(self, titre, resume, entetes, lignes):
+        dialog = QDialog(self)
+        dialog.setWindowTitle(titre)
+        dialog.setMinimumSize(700, 500)
+        layout = QVBoxLayout(dialog)
+        layout.addWidget(QLabel(resume))
+        table = QTableWidget(len(lignes), len(entetes))
+        table.setHorizontalHeaderLabels(entetes)
+        table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        table.horizontalHeader().setStretchLastSection(True)
+        for ligne, valeurs in enumerate(lignes):
+            for colonne, valeur in enumerate(valeurs):
+                table.setItem(ligne, colonne, QTableWidgetItem(str(valeur)))
+        layout.addWidget(table)
+        fermer = QPushButton("Fermer")
+        fermer.clicked.connect(dialog.accept)
+        layout.addWidget(fermer)
+        dialog.exec()
+
+    def ecriture_echouee(self, operation, jeton, message):
+        if isinstance(jeton, tuple) and jeton[0] == "import":
+            self.import_progress.close()
+            QMessageBox.critical(self, "Erreur", f"Échec de l'import du relevé : {message}")
+            return
+        QMessageBox.critical(self, "Erreur", f"Échec de l'enregistrement en base : {message}")
+
+    def importer_releve(self):
+        chemin, _ = QFileDialog.getOpenFileName(
+            self, "Importer un relevé", "", "Relevés (*.csv *.xlsx);;Tous les fichiers (*)"
+        )
+        if not chemin:
+            return
+        methode, ok = QInputDialog.getItem(
+            self, "Importer un relevé", "Méthode de paiement si absente du relevé :",
+            METHODES_PAIEMENT, METHODES_PAIEMENT.index("Mobile Money"), False
+        )
+        if ok:
+            # Simulation d'abord : le rapport est montré avant toute écriture
+            self.lancer_import(chemin, methode, simulation=True)
+
+    def lancer_import(self, chemin, methode, simulation):
+        annulation = threading.Event()
+        self.import_progress = QProgressDialog(
+            "Analyse du relevé..." if simulation else "Import du relevé...", "Annuler", 0, 100, self
+        )
+        self.import_progress.setWindowModality(Qt.WindowModal)
+        self.import_progress.canceled.connect(annulation.set)
+        self.import_progress.show()
+        jeton = ("import", chemin, methode, simulation)
+        importer = lambda repository, avancer: BulkImporter(repository).importer(
+            chemin, simulation=simulation, methode_defaut=methode,
+            progression=lambda rapport, fraction: avancer(fraction), annule=annulation.is_set
+        )
+        if not simulation:
+            # Import réel dans le thread d'écriture, à la suite des paiements déjà en file
+            self.gestion.ecritures.executer(importer, jeton)
+            return
+        # Simulation en lecture seule : thread et connexion propres, les saisies n'attendent pas
+        db = self.gestion.repository.db
+        def simuler(avancer, annule):
+            repository = PaiementRepository(db)
+            try:
+                return importer(repository, avancer)
+            finally:
+                repository.conn.close()
+        self.import_task = BackgroundTask(simuler, self)
+        self.import_task.avancement.connect(partial(self.import_avancement, jeton))
+        self.import_task.termine.connect(partial(self.import_termine, jeton))
+        self.import_task.echec.connect(partial(self.ecriture_echouee, "tache", jeton))
+        self.import_task.demarrer()
+
+    def import_avancement(self, jeton, fraction):
+        if isinstance(jeton, tuple) and jeton[0] == "import":
+            self.import_progress.setValue(int(fraction * 100))
+
+    def import_termine(self, jeton, rapport):
+        if not (isinstance(jeton, tuple) and jeton[0] == "import"):
+            return
+        _, chemin, methode, simulation = jeton
+        self.import_progress.close()
+        resume = (
+            f"Lignes lues : {rapport['lus']}\n"
+            f"Paiements {'à importer' if simulation else 'importés'} : {rapport['importes']}\n"
+            f"Doublons ignorés : {rapport['doublons']}\n"
+            f"Lignes rejetées : {len(rapport['rejets'])}"
+        )
+        if rapport['rejets']:
+            resume += "\n\n" + "\n".join(f"Ligne {n} : {motif}" for n, motif in rapport['rejets'][:10])
+            if len(rapport['rejets']) > 10:
+                resume += f"\n... et {len(rapport['rejets']) - 10} autres"
+        if simulation:
+            if rapport['annule'] or not rapport['importes']:
+                QMessageBox.information(self, "Import du relevé", resume)
+                return
+            reponse = QMessageBox.question(
+                self, "Import du relevé", resume + "\n\nImporter ces paiements ?",
+                QMessageBox.Yes | QMessageBox.No
+            )
+            if reponse == QMessageBox.Yes:
+                self.lancer_import(chemin, methode, simulation=False)
+            return
+        # Import écrit hors de la file des saisies : on recharge le registre et les index
+        self.gestion.charger_donnees()
+        self.cache.invalider()
+        self.paginator.invalider()
+        self.rafraichir_registre()
+        if rapport['annule']:
+            resume = "Import interrompu (les lots déjà importés sont conservés).\n\n" + resume
+        QMessageBox.information(self, "Import du relevé", resume)
+
+    def paiement_selectionne(self):
+        lignes = self.result_table.selectionModel().selectedRows()
+        return self.result_model.paiement(lignes[0].row()) if lignes else None
 
     def export_pdf(self):
         try:
-            selected_items = self.result_table.selectedItems()
-            if not selected_items:
+            paiement = self.paiement_selectionne()
+            if not paiement:
                 QMessageBox.warning(self, "Attention", "Veuillez sélectionner un paiement")
                 return
             
-            row = selected_items[0].row()
-            paiement = self.get_row_data(row)
-            
             output_path = f"recu_{paiement['id']}.pdf"
             self.pdf_generator.generate_receipt(paiement, output_path)
             
@@ -312,24 +610,87 @@ class MainWindow(QMainWindow):
             logger.error(f"Erreur lors de la génération du PDF: {e}")
             QMessageBox.critical(self, "Erreur", "Impossible de générer le PDF")
 
+    def generer_recus_lot(self):
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Reçus en lot")
+        layout = QFormLayout(dialog)
+        mois_input = QLineEdit()
+        mois_input.setPlaceholderText("Ex : Octobre 2024")
+        classe_input = QLineEdit()
+        classe_input.setPlaceholderText("Toutes")
+        statut_combo = QComboBox()
+        statut_combo.addItems(STATUTS)
+        statut_combo.setCurrentText("payé")
+        fusion_check = QCheckBox("Un seul PDF (une page par reçu)")
+        layout.addRow("Mois :", mois_input)
+        layout.addRow("Classe :", classe_input)
+        layout.addRow("Statut :", statut_combo)
+        layout.addRow(fusion_check)
+        boutons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        boutons.accepted.connect(dialog.accept)
+        boutons.rejected.connect(dialog.reject)
+        layout.addRow(boutons)
+        if dialog.exec() != QDialog.Accepted:
+            return
+        dossier = QFileDialog.getExistingDirectory(self, "Dossier des reçus")
+        if not dossier:
+            return
+
+        criteres = {
+            "mois": mois_input.text().strip(),
+            "classe": classe_input.text().strip().upper(),
+            "statut": statut_combo.currentText(),
+        }
+        fusion = fusion_check.isChecked()
+        db = self.gestion.repository.db
+        def generer(avancer, annule):
+            repository = PaiementRepository(db)
+            try:
+                return self.pdf_generator.generate_batch(
+                    repository, dossier, merge=fusion, progression=avancer, annule=annule, **criteres
+                )
+            finally:
+                repository.conn.close()
+
+        self.recus_progress = QProgressDialog("Génération des reçus...", "Annuler", 0, 100, self)
+        self.recus_progress.setWindowModality(Qt.WindowModal)
+        self.recus_task = BackgroundTask(generer, self)
+        self.recus_progress.canceled.connect(self.recus_task.annuler)
+        self.recus_task.avancement.connect(lambda fraction: self.recus_progress.setValue(int(fraction * 100)))
+        self.recus_task.termine.connect(partial(self.recus_termines, dossier))
+        self.recus_task.echec.connect(self.recus_echoues)
+        self.recus_progress.show()
+        self.recus_task.demarrer()
+
+    def recus_termines(self, dossier, chemins):
+        self.recus_progress.close()
+        if not chemins:
+            QMessageBox.information(self, "Reçus en lot", "Aucun reçu généré")
+        elif len(chemins) == 1:
+            QMessageBox.information(self, "Reçus en lot", f"Reçus générés : {chemins[0]}")
+        else:
+            QMessageBox.information(self, "Reçus en lot", f"{len(chemins)} reçus générés dans :\n{dossier}")
+        logger.info(f"{len(chemins)} fichier(s) de reçus générés dans {dossier}")
+
+    def recus_echoues(self, message):
+        self.recus_progress.close()
+        QMessageBox.critical(self, "Erreur", f"Échec de la génération des reçus : {message}")
+
     def show_statistics_chart(self):
         try:
             stats = self.gestion.get_statistiques()
             
             # Génération du graphique circulaire
             data = [stats['par_statut'][status] for status in STATUTS]
-            chart_data = self.chart_generator.generate_pie_chart(
-                data=data,
-                labels=STATUTS,
-                title="Répartition des Paiements par Statut"
-            )
-            
-            # Affichage du graphique dans une nouvelle fenêtre
+
+            # Affichage du graphique dans une nouvelle fenêtre, rendu en arrière-plan
             chart_dialog = QDialog(self)
             chart_dialog.setWindowTitle("Statistiques")
             layout = QVBoxLayout()
-            chart_label = QLabel()
-            chart_label.setPixmap(QPixmap.fromImage(chart_data))
+            chart_label = QLabel("Génération du graphique...")
+            chart_label.setAlignment(Qt.AlignCenter)
+            chart_label.setMinimumSize(600, 600)
+            self.charger_graphique(chart_label, data, STATUTS, "Répartition des Paiements par Statut")
             layout.addWidget(chart_label)
             chart_dialog.setLayout(layout)
             chart_dialog.exec()
@@ -339,6 +700,22 @@ class MainWindow(QMainWindow):
             logger.error(f"Erreur lors de la génération du graphique: {e}")
             QMessageBox.critical(self, "Erreur", "Impossible de générer le graphique")
 
+    def charger_graphique(self, label, data, labels, title, taille=None):
+        """Affiche dans `label` le camembert rendu hors du thread de l'interface (ou en cache)"""
+        def afficher(image):
+            if sip.isdeleted(label):
+                return  # fenêtre fermée avant la fin du rendu
+            pixmap = QPixmap.fromImage(image)
+            if taille:
+                pixmap = pixmap.scaled(taille, taille, Qt.AspectRatioMode.KeepAspectRatio,
+                                       Qt.TransformationMode.SmoothTransformation)
+            label.setPixmap(pixmap)
+        def signaler(message):
+            logger.error(f"Erreur lors de la génération du graphique: {message}")
+            if not sip.isdeleted(label):
+                label.setText(f"Impossible de générer le graphique : {message}")
+        self.chart_generator.pie_chart_async(data, labels, title, afficher, self, en_echec=signaler)
+
     def authentifier_utilisateur(self):
         while True:
             username, ok1 = QInputDialog.getText(
@@ -385,29 +762,32 @@ class MainWindow(QMainWindow):
         self.tabs = QTabWidget()
         self.main_layout.addWidget(self.tabs)
 
-        # Onglet 1 : Nouveau Paiement
-        tab1 = QWidget()
-        self.tabs.addTab(tab1, "Nouveau Paiement")
-        self.setup_enregistrement_tab(tab1)
+        # Onglets construits à leur première activation (onglet -> fonction de construction)
+        self.onglets_differes = {}
+        self.ajouter_onglet("Nouveau Paiement", self.setup_enregistrement_tab)
+        self.ajouter_onglet("Recherche/Modification", self.setup_recherche_tab)
+        self.ajouter_onglet("Statistiques", self.setup_statistiques_tab)
+        self.ajouter_onglet("Liste par Classe", self.setup_liste_classe_tab)
+        self.ajouter_onglet("Registre", self.setup_registre_tab)
 
-        # Onglet 2 : Recherche/Modification
-        tab2 = QWidget()
-        self.tabs.addTab(tab2, "Recherche/Modification")
-        self.setup_recherche_tab(tab2)
+        # Onglet admin si admin connecté
+        if self.gestion_utilisateurs.utilisateur_actuel and self.gestion_utilisateurs.utilisateur_actuel.is_admin:
+            self.ajouter_onglet("Administration", self.setup_admin_tab)
 
-        # Onglet 3 : Statistiques
-        tab3 = QWidget()
-        self.tabs.addTab(tab3, "Statistiques")
-        self.setup_statistiques_tab(tab3)
+        self.tabs.currentChanged.connect(self.construire_onglet)
+        self.construire_onglet(self.tabs.currentIndex())
 
-        # Onglet 4 : Liste par Classe
-        tab4 = QWidget()
-        self.tabs.addTab(tab4, "Liste par Classe")
-        self.setup_liste_classe_tab(tab4)
+    def ajouter_onglet(self, titre, construire):
+        tab = QWidget()
+        self.tabs.addTab(tab, titre)
+        self.onglets_differes[tab] = construire
 
-        # Onglet admin si admin connecté
-        if self.gestion_utilisateurs.utilisateur_actuel and self.gestion_utilisateurs.utilisateur_actuel.is_admin:
-            self.setup_admin_tab()
+    def construire_onglet(self, index):
+        tab = self.tabs.widget(index)
+        construire = self.onglets_differes.pop(tab, None)
+        if construire:
+            construire(tab)
+            logger.debug(f"Onglet « {self.tabs.tabText(index)} » construit")
 
     def setup_enregistrement_tab(self, tab):
         layout = QVBoxLayout(tab)
@@ -504,6 +884,14 @@ class MainWindow(QMainWindow):
             lbl.setStyleSheet(label_style)
             form_layout.addRow(lbl, widget)
 
+        # Solde de l'élève saisi (compte élève), mis à jour à la sortie des champs d'identité
+        self.solde_label = QLabel()
+        self.solde_label.setWordWrap(True)
+        self.solde_label.setStyleSheet("QLabel { color: #2E7D32; font-weight: bold; font-size: 14px; }")
+        form_layout.addRow(self.solde_label)
+        for champ in (self.nom_input, self.prenom_input, self.classe_input):
+            champ.editingFinished.connect(self.afficher_solde_eleve)
+
         form_group.setLayout(form_layout)
         left_column.addWidget(form_group)
         main_container.addLayout(left_column)
@@ -627,9 +1015,16 @@ class MainWindow(QMainWindow):
         receipt_btn.setCursor(Qt.PointingHandCursor)
         receipt_btn.clicked.connect(self.generer_recu)
 
+        import_btn = QPushButton(QIcon("icons/add.png"), "Importer un relevé")
+        import_btn.setStyleSheet(receipt_btn.styleSheet())
+        import_btn.setCursor(Qt.PointingHandCursor)
+        import_btn.clicked.connect(self.importer_releve)
+
         buttons_container.addWidget(save_btn)
         buttons_container.addSpacing(20)
         buttons_container.addWidget(receipt_btn)
+        buttons_container.addSpacing(20)
+        buttons_container.addWidget(import_btn)
         buttons_container.addStretch()
 
         layout.addSpacing(20)
@@ -655,10 +1050,16 @@ class MainWindow(QMainWindow):
         search_layout.setVerticalSpacing(14)
         
         self.search_critere_combo = QComboBox()
-        self.search_critere_combo.addItems(["ID", "Nom", "Classe", "Mois", "Statut"])
+        self.search_critere_combo.addItems(["ID", "Élève", "Classe", "Mois", "Statut"])
         self.search_critere_combo.setStyleSheet("font-size: 16px; padding: 6px;")
         self.search_value_input = QLineEdit()
         self.search_value_input.setStyleSheet("font-size: 16px; padding: 6px;")
+        # Mois : un mois, une plage ou une année scolaire (recherche par période)
+        self.search_critere_combo.currentTextChanged.connect(
+            lambda critere: self.search_value_input.setPlaceholderText(
+                "Octobre 2024, Septembre 2023 - Juin 2024 ou 2023-2024" if critere == "Mois" else ""
+            )
+        )
         search_btn = QPushButton(QIcon("icons/search.png"), "Rechercher")
         search_btn.setStyleSheet(BUTTON_STYLE)
         search_btn.setMinimumWidth(100)  # Agrandi
@@ -674,15 +1075,17 @@ class MainWindow(QMainWindow):
         layout.addWidget(search_group)
         
         # Tableau des résultats
-        self.result_table = QTableWidget()
-        self.result_table.setColumnCount(8)
-        self.result_table.setHorizontalHeaderLabels(
-            ["ID", "Nom", "Prénom", "Classe", "Montant", "Mois", "Statut", "Date"]
-        )
-        self.result_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.result_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        # Vue virtualisée : seules les lignes visibles sont rendues
+        self.result_model = PaiementTableModel(COLONNES_TABLE, ENTETES_TABLE, parent=self)
+        self.result_table = QTableView()
+        self.result_table.setModel(self.result_model)
+        self.result_table.horizontalHeader().setSortIndicator(COLONNES_TABLE.index("date_paiement"), Qt.DescendingOrder)
+        self.result_table.setSortingEnabled(True)
+        self.result_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.result_table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.result_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self.result_table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 font-size: 16px;
                 selection-background-color: #BBDEFB;
             }
@@ -716,12 +1119,24 @@ class MainWindow(QMainWindow):
                 background-color: #455A64;
             }
         """)
+        recu_btn = QPushButton(QIcon("icons/print.png"), "Reçu PDF")
+        recu_btn.setStyleSheet(BUTTON_STYLE)
+        recu_btn.setMinimumHeight(44)
+        recu_btn.clicked.connect(self.export_pdf)
+        recus_lot_btn = QPushButton(QIcon("icons/print.png"), "Reçus en lot")
+        recus_lot_btn.setStyleSheet(BUTTON_STYLE)
+        recus_lot_btn.setMinimumHeight(44)
+        recus_lot_btn.clicked.connect(self.generer_recus_lot)
+        compte_btn = QPushButton(QIcon("icons/search.png"), "Compte élève")
+        compte_btn.setStyleSheet(BUTTON_STYLE)
+        compte_btn.setMinimumHeight(44)
+        compte_btn.clicked.connect(self.afficher_compte_eleve)
         btn_layout.addWidget(modifier_btn)
+        btn_layout.addWidget(compte_btn)
+        btn_layout.addWidget(recu_btn)
+        btn_layout.addWidget(recus_lot_btn)
         btn_layout.addWidget(exporter_btn)
         layout.addLayout(btn_layout)
-        
-        # Pagination
-        self.setup_pagination_controls()
     
     def setup_statistiques_tab(self, tab):
         layout = QVBoxLayout(tab)
@@ -907,6 +1322,33 @@ class MainWindow(QMainWindow):
         # Ajouter les containers au layout principal
         stats_container.addLayout(tables_container)
         layout.addLayout(stats_container)
+
+        # Ventilation à la demande : filtres combinés (index bitmap), répartition selon une dimension
+        ventilation_group = QGroupBox("Ventilation")
+        ventilation_layout = QHBoxLayout()
+        self.ventilation_statut_combo = QComboBox()
+        self.ventilation_statut_combo.addItems(["Tous statuts"] + STATUTS)
+        self.ventilation_methode_combo = QComboBox()
+        self.ventilation_methode_combo.addItems(["Toutes méthodes"] + METHODES_PAIEMENT)
+        self.ventilation_classe_input = QLineEdit()
+        self.ventilation_classe_input.setPlaceholderText("Classes (préfixe, ex: T)")
+        self.ventilation_debut_input = QLineEdit()
+        self.ventilation_debut_input.setPlaceholderText("Du mois")
+        self.ventilation_fin_input = QLineEdit()
+        self.ventilation_fin_input.setPlaceholderText("Au mois")
+        self.ventilation_dimension_combo = QComboBox()
+        self.ventilation_dimension_combo.addItems(list(DIMENSIONS_VENTILATION))
+        ventiler_btn = QPushButton("Ventiler")
+        ventiler_btn.setCursor(Qt.PointingHandCursor)
+        ventiler_btn.clicked.connect(self.afficher_ventilation)
+        for widget in (self.ventilation_statut_combo, self.ventilation_methode_combo, self.ventilation_classe_input,
+                       self.ventilation_debut_input, self.ventilation_fin_input):
+            ventilation_layout.addWidget(widget)
+        ventilation_layout.addWidget(QLabel("par"))
+        ventilation_layout.addWidget(self.ventilation_dimension_combo)
+        ventilation_layout.addWidget(ventiler_btn)
+        ventilation_group.setLayout(ventilation_layout)
+        layout.addWidget(ventilation_group)
         
         # Créer un conteneur horizontal pour les boutons
         buttons_layout = QHBoxLayout()
@@ -955,9 +1397,26 @@ class MainWindow(QMainWindow):
         buttons_layout.addWidget(btn_refresh, alignment=Qt.AlignmentFlag.AlignCenter)
         buttons_layout.addWidget(btn_stats, alignment=Qt.AlignmentFlag.AlignCenter)
 
+        # Bouton Retards : même liste que la notification récapitulative
+        btn_retards = QPushButton(QIcon("icons/search.png"), "Élèves en retard")
+        btn_retards.setStyleSheet(btn_stats.styleSheet())
+        btn_retards.setCursor(Qt.PointingHandCursor)
+        btn_retards.clicked.connect(self.afficher_retards)
+        buttons_layout.addWidget(btn_retards, alignment=Qt.AlignmentFlag.AlignCenter)
+
+        # Bouton Arriérés : soldes impayés des comptes élèves
+        btn_arrieres = QPushButton(QIcon("icons/search.png"), "Arriérés")
+        btn_arrieres.setStyleSheet(btn_stats.styleSheet())
+        btn_arrieres.setCursor(Qt.PointingHandCursor)
+        btn_arrieres.clicked.connect(self.afficher_arrieres)
+        buttons_layout.addWidget(btn_arrieres, alignment=Qt.AlignmentFlag.AlignCenter)
+
         # Ajouter le layout des boutons au layout principal
         layout.addLayout(buttons_layout)
 
+        # Agrégats tenus en base : lecture à coût constant à la première ouverture
+        self.afficher_statistiques()
+
     def setup_liste_classe_tab(self, tab):
         layout = QVBoxLayout(tab)
 
@@ -979,7 +1438,12 @@ class MainWindow(QMainWindow):
         self.classe_filter_input = QLineEdit()
         self.classe_filter_input.setPlaceholderText("Ex : T, 2ND, 6E, etc.")
         self.classe_filter_input.setStyleSheet("font-size: 16px; padding: 6px; min-width: 120px;")
-        self.classe_filter_input.textChanged.connect(self.remplir_liste_eleves_table)
+        # Filtrage différé : on attend une courte pause dans la frappe avant de filtrer
+        self.classe_filter_timer = QTimer(self)
+        self.classe_filter_timer.setSingleShot(True)
+        self.classe_filter_timer.setInterval(250)
+        self.classe_filter_timer.timeout.connect(self.remplir_liste_eleves_table)
+        self.classe_filter_input.textChanged.connect(self.classe_filter_timer.start)
         search_btn = QPushButton("Rechercher")
         search_btn.setStyleSheet(BUTTON_STYLE)
         search_btn.setMinimumHeight(36)
@@ -990,34 +1454,51 @@ class MainWindow(QMainWindow):
         search_layout.addWidget(search_btn)
         layout.addLayout(search_layout)
 
+        # Élèves n'ayant pas payé sur une plage de mois (classes du filtre, toutes si vide)
+        impayes_layout = QHBoxLayout()
+        impayes_label = QLabel("Mois non payés de :")
+        impayes_label.setStyleSheet("font-size: 16px; font-weight: bold; color: #1976D2;")
+        self.impayes_debut_input = QLineEdit()
+        self.impayes_debut_input.setPlaceholderText("Septembre 2024 (rentrée)")
+        self.impayes_fin_input = QLineEdit()
+        self.impayes_fin_input.setPlaceholderText("Décembre 2024 (ce mois)")
+        for champ in (self.impayes_debut_input, self.impayes_fin_input):
+            champ.setStyleSheet("font-size: 16px; padding: 6px; min-width: 120px;")
+        impayes_btn = QPushButton("Non payés")
+        impayes_btn.setStyleSheet(BUTTON_STYLE)
+        impayes_btn.setMinimumHeight(36)
+        impayes_btn.setCursor(Qt.PointingHandCursor)
+        impayes_btn.clicked.connect(self.lister_eleves_par_classe)
+        impayes_layout.addWidget(impayes_label)
+        impayes_layout.addWidget(self.impayes_debut_input)
+        impayes_layout.addWidget(QLabel("à"))
+        impayes_layout.addWidget(self.impayes_fin_input)
+        impayes_layout.addWidget(impayes_btn)
+        layout.addLayout(impayes_layout)
+
         # Tableau des résultats
-        self.eleves_table = QTableWidget()
-        self.eleves_table.setColumnCount(4)
-        self.eleves_table.setHorizontalHeaderLabels(["Classe", "Nom", "Prénom", "Statut"])
+        self.eleves_model = PaiementTableModel(
+            ["classe", "nom", "prenom", "statut"], ["Classe", "Nom", "Prénom", "Statut"], parent=self
+        )
+        self.eleves_table = QTableView()
+        self.eleves_table.setModel(self.eleves_model)
+        self.eleves_table.setSortingEnabled(True)
+        self.eleves_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self.eleves_table.horizontalHeader().setStretchLastSection(True)
         self.eleves_table.setStyleSheet("font-size: 15px;")
         layout.addWidget(self.eleves_table)
 
-        # Remplir la table au chargement
+        # Remplie depuis l'index en mémoire ; à nouveau à la fin du chargement du registre
         self.remplir_liste_eleves_table()
 
     def remplir_liste_eleves_table(self):
-        filtre = self.classe_filter_input.text().strip().upper()
-        paiements = self.gestion.paiements
-        if filtre:
-            paiements = [p for p in paiements if p['classe'].upper().startswith(filtre)]
-        # Tri par classe puis nom
-        paiements = sorted(paiements, key=lambda p: (p['classe'], p['nom'], p['prenom']))
-        self.eleves_table.setRowCount(len(paiements))
-        for row, eleve in enumerate(paiements):
-            self.eleves_table.setItem(row, 0, QTableWidgetItem(eleve['classe']))
-            self.eleves_table.setItem(row, 1, QTableWidgetItem(eleve['nom']))
-            self.eleves_table.setItem(row, 2, QTableWidgetItem(eleve['prenom']))
-            self.eleves_table.setItem(row, 3, QTableWidgetItem(eleve['statut']))
-
-    def setup_admin_tab(self):
-        tab_admin = QWidget()
-        self.tabs.addTab(tab_admin, "Administration")
+        self.classe_filter_timer.stop()
+        filtre = self.classe_filter_input.text().strip()
+        # Index trié par classe : résultat déjà ordonné (classe, nom, prénom), mise à jour par différence
+        paiements = self.gestion.index_classes.rechercher(filtre)
+        self.eleves_model.synchroniser(paiements, cle_liste)
+
+    def setup_admin_tab(self, tab_admin):
         layout = QVBoxLayout(tab_admin)
 
         # Conteneur principal avec deux colonnes
@@ -1286,14 +1767,16 @@ class MainWindow(QMainWindow):
             'statut': self.statut_combo.currentText(),
             'notes': self.notes_input.toPlainText().strip()
         }
-        id_paiement = self.gestion.ajouter_paiement(paiement)
-        QMessageBox.information(self, "Succès", f"Paiement enregistré avec succès (ID: {id_paiement}).")
+        # Écriture en arrière-plan : le formulaire est libéré tout de suite pour la saisie suivante
+        self.gestion.ajouter_paiement(paiement, "enregistrement")
+        self.statusBar().showMessage("Enregistrement du paiement en cours...")
         self.nom_input.clear()
         self.prenom_input.clear()
         self.classe_input.clear()
         self.montant_input.clear()
         self.mois_input.clear()
         self.notes_input.clear()
+        self.solde_label.clear()
         self.statut_combo.setCurrentText("payé")
 
     def generer_recu(self):
@@ -1304,21 +1787,24 @@ class MainWindow(QMainWindow):
         ]):
             QMessageBox.warning(self, "Impossible", "Veuillez d'abord remplir les informations du paiement")
             return
-        contenu = f"""
-        REÇU DE PAIEMENT SCOLAIRE
-        {'='*40}
-        Élève: {self.prenom_input.text()} {self.nom_input.text()}
-        Classe: {self.classe_input.text()}
-        Montant: {self.montant_input.text()} FCFA
-        Mois: {self.mois_input.text()}
-        Méthode: {self.methode_combo.currentText()}
-        Date: {datetime.now().strftime("%d/%m/%Y %H:%M")}
-        {'='*40}
-        """
-        nom_fichier = f"recu_{self.nom_input.text()}_{self.prenom_input.text()}.txt"
+        maintenant = datetime.now()
+        paiement = {
+            'nom': self.nom_input.text().strip().upper(),
+            'prenom': self.prenom_input.text().strip().capitalize(),
+            'classe': self.classe_input.text().strip().upper(),
+            'montant': self.montant_input.text().strip(),
+            'mois': self.mois_input.text().strip(),
+            'methode_paiement': self.methode_combo.currentText(),
+            'statut': self.statut_combo.currentText(),
+            'date_paiement': maintenant.strftime("%d/%m/%Y"),
+            'heure_paiement': maintenant.strftime("%H:%M"),
+            'notes': self.notes_input.toPlainText().strip()
+        }
+        nom_fichier = nom_recu(paiement, ".txt")
         try:
-            with open(nom_fichier, 'w', encoding='utf-8') as f:
-                f.write(contenu)
+            RENDU.enregistrer(paiement, nom_fichier)
+            if RECUS['imprimante']:
+                RENDU.imprimer(paiement)
             QMessageBox.information(self, "Succès", f"Reçu enregistré sous : {nom_fichier}")
         except Exception as e:
             QMessageBox.critical(self, "Erreur", f"Impossible d'enregistrer le reçu : {e}")
@@ -1330,37 +1816,31 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Valeur manquante", "Veuillez entrer une valeur de recherche")
             return
         
-        resultats = self.gestion.rechercher_paiements(critere, valeur)
-        self.result_table.setRowCount(len(resultats))
-        for row, paiement in enumerate(resultats):
-            self.result_table.setItem(row, 0, QTableWidgetItem(paiement['id']))
-            self.result_table.setItem(row, 1, QTableWidgetItem(paiement['nom']))
-            self.result_table.setItem(row, 2, QTableWidgetItem(paiement['prenom']))
-            self.result_table.setItem(row, 3, QTableWidgetItem(paiement['classe']))
-            self.result_table.setItem(row, 4, QTableWidgetItem(paiement['montant']))
-            self.result_table.setItem(row, 5, QTableWidgetItem(paiement['mois']))
-            self.result_table.setItem(row, 6, QTableWidgetItem(paiement['statut']))
-            self.result_table.setItem(row, 7, QTableWidgetItem(paiement['date_paiement']))
+        if critere == "élève":
+            # Résultats classés par pertinence : pas d'indicateur de tri
+            self.result_table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+            self.result_model.set_paiements(self.gestion.rechercher_eleves(valeur))
+            return
+
+        # Résultats chargés par lots à mesure du défilement, triés par SQLite
+        self.result_table.horizontalHeader().setSortIndicator(COLONNES_TABLE.index("date_paiement"), Qt.DescendingOrder)
+        self.result_model.set_requete(self.gestion.repository, **{critere: valeur})
 
     def modifier_paiement(self):
-        selected = self.result_table.selectedItems()
-        if not selected:
+        selection = self.paiement_selectionne()
+        if not selection:
             QMessageBox.warning(self, "Aucune sélection", "Veuillez sélectionner un paiement à modifier")
             return
             
-        id_paiement = self.result_table.item(selected[0].row(), 0).text()
+        id_paiement = selection['id']
         # Créer une boîte de dialogue de modification
         dialog = QDialog(self)
         dialog.setWindowTitle("Modifier Paiement")
         dialog.setModal(True)
         layout = QFormLayout(dialog)
         
-        # Trouver le paiement
-        paiement = None
-        for p in self.gestion.paiements:
-            if p['id'] == id_paiement:
-                paiement = p
-                break
+        # Relire le paiement en base (version à jour)
+        paiement = self.gestion.repository.get(id_paiement)
         
         if not paiement:
             QMessageBox.warning(self, "Erreur", "Paiement introuvable")
@@ -1410,12 +1890,9 @@ class MainWindow(QMainWindow):
                 'notes': notes_input.toPlainText().strip()
             }
             
-            if self.gestion.modifier_paiement(id_paiement, nouvelles_valeurs):
-                QMessageBox.information(self, "Succès", "Paiement modifié avec succès")
-                dialog.close()
-                self.rechercher_paiements()
-            else:
-                QMessageBox.warning(self, "Erreur", "Échec de la modification")
+            # Confirmation (ou erreur) signalée à la fin de l'écriture en arrière-plan
+            self.gestion.modifier_paiement(id_paiement, nouvelles_valeurs, "modification")
+            dialog.close()
         
         sauvegarder_btn.clicked.connect(sauvegarder)
         annuler_btn.clicked.connect(dialog.close)
@@ -1423,8 +1900,85 @@ class MainWindow(QMainWindow):
         dialog.exec()
     
     def exporter_donnees(self):
-        # Implémentez l'export ici
-        QMessageBox.information(self, "Export", "Fonctionnalité d'export à implémenter")
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Exporter les paiements")
+        layout = QFormLayout(dialog)
+        format_combo = QComboBox()
+        format_combo.addItems([f.upper() for f in FORMATS])
+        compression_check = QCheckBox("Compresser (gzip pour CSV/JSONL, zstd pour Parquet)")
+        classe_input = QLineEdit()
+        mois_input = QLineEdit()
+        statut_combo = QComboBox()
+        statut_combo.addItems(["Tous"] + STATUTS)
+        periode_check = QCheckBox("Filtrer par date de paiement")
+        debut_input = QDateEdit(QDate.currentDate().addMonths(-12))
+        fin_input = QDateEdit(QDate.currentDate())
+        for champ in (debut_input, fin_input):
+            champ.setCalendarPopup(True)
+            champ.setDisplayFormat("dd/MM/yyyy")
+        layout.addRow("Format :", format_combo)
+        layout.addRow(compression_check)
+        layout.addRow("Classe :", classe_input)
+        layout.addRow("Mois :", mois_input)
+        layout.addRow("Statut :", statut_combo)
+        layout.addRow(periode_check)
+        layout.addRow("Du :", debut_input)
+        layout.addRow("Au :", fin_input)
+        boutons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        boutons.accepted.connect(dialog.accept)
+        boutons.rejected.connect(dialog.reject)
+        layout.addRow(boutons)
+        if dialog.exec() != QDialog.Accepted:
+            return
+
+        format = format_combo.currentText().lower()
+        compression = compression_check.isChecked()
+        criteres = {"classe": classe_input.text().strip(), "mois": mois_input.text().strip()}
+        if statut_combo.currentIndex() > 0:
+            criteres["statut"] = statut_combo.currentText()
+        if periode_check.isChecked():
+            criteres["date_debut"] = debut_input.date().toString("dd/MM/yyyy")
+            criteres["date_fin"] = fin_input.date().toString("dd/MM/yyyy")
+        extension = format + (".gz" if compression and format in ("csv", "jsonl") else "")
+        chemin, _ = QFileDialog.getSaveFileName(
+            self, "Exporter les paiements",
+            f"export_paiements_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}",
+            f"{format.upper()} (*.{extension})"
+        )
+        if not chemin:
+            return
+
+        db = self.gestion.repository.db
+        def exporter(avancer, annule):
+            # Connexion propre au thread d'export : lecture seule, ne bloque pas les saisies (WAL)
+            repository = PaiementRepository(db)
+            try:
+                return StreamingExporter(repository).exporter(
+                    chemin, format, compression, progression=avancer, annule=annule, **criteres
+                )
+            finally:
+                repository.conn.close()
+
+        self.export_progress = QProgressDialog("Export des paiements...", "Annuler", 0, 100, self)
+        self.export_progress.setWindowModality(Qt.WindowModal)
+        self.export_task = BackgroundTask(exporter, self)
+        self.export_progress.canceled.connect(self.export_task.annuler)
+        self.export_task.avancement.connect(lambda fraction: self.export_progress.setValue(int(fraction * 100)))
+        self.export_task.termine.connect(partial(self.export_termine, chemin))
+        self.export_task.echec.connect(self.export_echoue)
+        self.export_progress.show()
+        self.export_task.demarrer()
+
+    def export_termine(self, chemin, exportes):
+        self.export_progress.close()
+        if exportes is None:
+            QMessageBox.information(self, "Export", "Export annulé")
+            return
+        QMessageBox.information(self, "Export", f"{exportes} paiement(s) exporté(s) dans :\n{chemin}")
+
+    def export_echoue(self, message):
+        self.export_progress.close()
+        QMessageBox.critical(self, "Erreur", f"Échec de l'export : {message}")
     
     def afficher_statistiques(self):
         stats = self.gestion.get_statistiques()
@@ -1433,10 +1987,10 @@ class MainWindow(QMainWindow):
         self.montant_total_label.setText(f"{stats['montant_total']} FCFA")
         # Par classe
         self.classe_table.setRowCount(0)
-        for i, (classe, montants) in enumerate(stats["par_classe"].items()):
+        for i, (classe, montant) in enumerate(stats["par_classe"].items()):
             self.classe_table.insertRow(i)
             self.classe_table.setItem(i, 0, QTableWidgetItem(str(classe)))
-            self.classe_table.setItem(i, 1, QTableWidgetItem(f"{sum(montants)} FCFA"))
+            self.classe_table.setItem(i, 1, QTableWidgetItem(f"{montant} FCFA"))
         # Par statut
         self.statut_table.setRowCount(0)
         for i, statut in enumerate(STATUTS):
@@ -1444,9 +1998,45 @@ class MainWindow(QMainWindow):
             self.statut_table.setItem(i, 0, QTableWidgetItem(statut.capitalize()))
             self.statut_table.setItem(i, 1, QTableWidgetItem(str(stats["par_statut"].get(statut, 0))))
 
+    def afficher_ventilation(self):
+        # Comptes multi-critères sur l'index bitmap : ET/OU de bitmaps, sans parcours des paiements
+        criteres = {}
+        if self.ventilation_statut_combo.currentIndex() > 0:
+            criteres["statut"] = self.ventilation_statut_combo.currentText()
+        if self.ventilation_methode_combo.currentIndex() > 0:
+            criteres["methode"] = self.ventilation_methode_combo.currentText()
+        prefixe = self.ventilation_classe_input.text().strip()
+        if prefixe:
+            criteres["classe"] = self.gestion.index_classes.classes_prefixe(prefixe)
+        debut_texte = self.ventilation_debut_input.text().strip()
+        fin_texte = self.ventilation_fin_input.text().strip()
+        if debut_texte or fin_texte:
+            debut = periode_mois(debut_texte or fin_texte)
+            fin = periode_mois(fin_texte or debut_texte)
+            if debut is None or fin is None or fin < debut:
+                QMessageBox.warning(self, "Mois invalides", "Indiquez les mois comme « Octobre 2024 » (le premier avant le second)")
+                return
+            criteres["mois"] = range(debut, fin + 1)
+        libelle = self.ventilation_dimension_combo.currentText()
+        dimension = DIMENSIONS_VENTILATION[libelle]
+        ventilation = self.gestion.index_bitmap.ventiler(dimension, **criteres)
+        total = sum(ventilation.values())
+        if dimension == "mois":
+            lignes = sorted(ventilation.items(), key=lambda e: (e[0] is None, e[0] or 0))
+            lignes = [(libelle_periode(v) if v is not None else "Mois illisible", n) for v, n in lignes]
+        else:
+            lignes = sorted(ventilation.items(), key=lambda e: -e[1])
+        self.afficher_tableau(
+            f"Ventilation par {libelle.lower()}",
+            f"{total} paiement(s) sur {self.gestion.index_bitmap.compter()}",
+            [libelle, "Nombre", "Part"],
+            [(valeur, nombre, f"{nombre / total:.1%}") for valeur, nombre in lignes]
+        )
+
     def afficher_graphique_statistiques(self):
         try:
             stats = self.gestion.get_statistiques()
+            analytics = self.gestion.analytics
             valeurs = [stats["par_statut"].get(s, 0) for s in STATUTS]
             
             dialog = QDialog(self)
@@ -1478,13 +2068,10 @@ class MainWindow(QMainWindow):
             # Graphique circulaire
             pie_group = QGroupBox("Répartition par Statut")
             pie_layout = QVBoxLayout()
-            image = self.chart_generator.generate_pie_chart(valeurs, STATUTS, "")
-            chart_label = QLabel()
-            chart_label.setPixmap(QPixmap.fromImage(image).scaled(
-                400, 400, 
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation
-            ))
+            chart_label = QLabel("Génération du graphique...")
+            chart_label.setAlignment(Qt.AlignCenter)
+            chart_label.setMinimumSize(400, 400)
+            self.charger_graphique(chart_label, valeurs, STATUTS, "", 400)
             pie_layout.addWidget(chart_label)
             pie_group.setLayout(pie_layout)
             charts_container.addWidget(pie_group)
@@ -1524,10 +2111,12 @@ class MainWindow(QMainWindow):
             # Moyenne des paiements
             moy_paiement = stats['montant_total'] / stats['total'] if stats['total'] > 0 else 0
             moyenne = QLabel(f"📈 Moyenne par paiement : {moy_paiement:,.0f} FCFA")
+            recouvrement = QLabel(f"🎯 Taux de recouvrement : {analytics.taux_recouvrement() * 100:.1f}%")
             
             overview_layout.addWidget(total_paiements)
             overview_layout.addWidget(montant_total)
             overview_layout.addWidget(moyenne)
+            overview_layout.addWidget(recouvrement)
             overview_group.setLayout(overview_layout)
             stats_container.addWidget(overview_group)
             
@@ -1598,16 +2187,12 @@ class MainWindow(QMainWindow):
             """)
             classes_layout = QVBoxLayout()
             
-            # Table des classes
-            sorted_classes = sorted(
-                stats["par_classe"].items(),
-                key=lambda x: sum(x[1]),
-                reverse=True
-            )[:5]
+            # Table des classes (regroupement vectorisé)
+            sorted_classes = analytics.top("classe", 5)
             
             class_table = QTableWidget()
-            class_table.setColumnCount(2)
-            class_table.setHorizontalHeaderLabels(["Classe", "Montant total"])
+            class_table.setColumnCount(3)
+            class_table.setHorizontalHeaderLabels(["Classe", "Montant total", "Recouvrement"])
             class_table.horizontalHeader().setStretchLastSection(True)
             class_table.setStyleSheet("""
                 QTableWidget {
@@ -1623,14 +2208,32 @@ class MainWindow(QMainWindow):
             """)
             
             class_table.setRowCount(len(sorted_classes))
-            for i, (classe, montants) in enumerate(sorted_classes):
+            for i, (classe, montant, taux) in enumerate(sorted_classes):
                 class_table.setItem(i, 0, QTableWidgetItem(classe))
-                class_table.setItem(i, 1, QTableWidgetItem(f"{sum(montants):,} FCFA"))
+                class_table.setItem(i, 1, QTableWidgetItem(f"{montant:,} FCFA"))
+                class_table.setItem(i, 2, QTableWidgetItem(f"{taux * 100:.1f}%"))
                 
             classes_layout.addWidget(class_table)
             classes_group.setLayout(classes_layout)
             stats_container.addWidget(classes_group)
             
+            # Évolution mensuelle des encaissements (12 derniers mois)
+            mensuel_group = QGroupBox("Évolution Mensuelle")
+            mensuel_layout = QVBoxLayout()
+            serie = analytics.serie_mensuelle()[-12:]
+            mensuel_table = QTableWidget()
+            mensuel_table.setColumnCount(3)
+            mensuel_table.setHorizontalHeaderLabels(["Mois", "Paiements", "Montant perçu"])
+            mensuel_table.horizontalHeader().setStretchLastSection(True)
+            mensuel_table.setRowCount(len(serie))
+            for i, ((annee, mois), nombre, montant) in enumerate(reversed(serie)):
+                mensuel_table.setItem(i, 0, QTableWidgetItem(f"{mois:02d}/{annee}"))
+                mensuel_table.setItem(i, 1, QTableWidgetItem(str(nombre)))
+                mensuel_table.setItem(i, 2, QTableWidgetItem(f"{montant:,} FCFA"))
+            mensuel_layout.addWidget(mensuel_table)
+            mensuel_group.setLayout(mensuel_layout)
+            stats_container.addWidget(mensuel_group)
+            
             main_content.addLayout(stats_container)
             layout.addLayout(main_content)
             
@@ -1661,34 +2264,55 @@ class MainWindow(QMainWindow):
             QMessageBox.critical(self, "Erreur", "Impossible de générer le graphique")
 
     def lister_eleves_par_classe(self):
-        classe = self.classe_search_input.text().strip().upper()
-        if not classe:
-            QMessageBox.warning(self, "Classe manquante", "Veuillez entrer une classe")
+        # Élèves des classes filtrées sans paiement pour au moins un mois de la plage (matrice élèves x mois)
+        # Par défaut : de la rentrée au mois en cours ; un seul mois saisi : ce mois-là
+        aujourd_hui = date.today()
+        courant = periode(aujourd_hui.year, aujourd_hui.month)
+        debut_texte = self.impayes_debut_input.text().strip()
+        fin_texte = self.impayes_fin_input.text().strip()
+        debut = periode_mois(debut_texte) if debut_texte else annee_scolaire(courant)[0]
+        fin = periode_mois(fin_texte) if fin_texte else (debut if debut_texte else courant)
+        if debut is None or fin is None or fin < debut:
+            QMessageBox.warning(self, "Mois invalides", "Indiquez les mois comme « Octobre 2024 » (le premier avant le second)")
             return
-        
-        paiements_classe = [p for p in self.gestion.paiements if p['classe'] == classe]
-        if not paiements_classe:
-            QMessageBox.information(self, "Aucun résultat", f"Aucun élève trouvé pour la classe {classe}")
-            self.eleves_payes_text.clear()
-            self.eleves_non_payes_text.clear()
-            return
-        
-        eleves_payes = [p for p in paiements_classe if p['statut'] == "payé"]
-        eleves_non_payes = [p for p in paiements_classe if p['statut'] != "payé"]
-        
-        # Afficher les élèves ayant payé
-        payes_text = ""
-        for eleve in eleves_payes:
-            payes_text += f"- {eleve['prenom']} {eleve['nom']} (Montant: {eleve['montant']} FCFA, Mois: {eleve['mois']})\n"
-        self.eleves_payes_text.setPlainText(payes_text if payes_text else "Aucun élève n'a payé.")
-        
-        # Afficher les élèves n'ayant pas payé
-        non_payes_text = ""
-        for eleve in eleves_non_payes:
-            non_payes_text += f"- {eleve['prenom']} {eleve['nom']} (Statut: {eleve['statut']}, Mois: {eleve['mois']})\n"
-        self.eleves_non_payes_text.setPlainText(non_payes_text if non_payes_text else "Tous les élèves ont payé.")
+        filtre = self.classe_filter_input.text().strip()
+        classes = self.gestion.index_classes.classes_prefixe(filtre) if filtre else None
+        roster = self.gestion.roster
+        impayes = roster.impayes(debut, fin, classes)
+        total = sum(len(roster.classes.get(c, {})) for c in (roster.classes if classes is None else classes))
+        plage = libelle_periode(debut) if debut == fin else f"{libelle_periode(debut)} à {libelle_periode(fin)}"
+        self.afficher_tableau(
+            "Élèves n'ayant pas payé",
+            f"{len(impayes)} élève(s) sur {total} sans paiement pour au moins un mois ({plage})",
+            ["Classe", "Nom", "Prénom", "Mois non payés"],
+            [(classe, nom, prenom, ", ".join(libelle_periode(p) for p in manquants))
+             for classe, nom, prenom, manquants in impayes]
+        )
 
-    def setup_pagination_controls(self):
+    def setup_registre_tab(self, tab):
+        # Registre complet, page par page (pagination par clé) : modèle et vue propres à l'onglet
+        layout = QVBoxLayout(tab)
+        self.page_model = PaiementTableModel(COLONNES_TABLE, ENTETES_TABLE, parent=self)
+        self.page_table = QTableView()
+        self.page_table.setModel(self.page_model)
+        self.page_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.page_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.page_table.setStyleSheet("""
+            QTableView {
+                font-size: 16px;
+                selection-background-color: #BBDEFB;
+            }
+            QHeaderView::section {
+                font-size: 16px;
+                background: #1976D2;
+                color: white;
+            }
+        """)
+        layout.addWidget(self.page_table)
+        self.setup_pagination_controls(layout)
+        self.update_table()
+
+    def setup_pagination_controls(self, layout_onglet):
         self.pagination_widget = QWidget()
         layout = QHBoxLayout()
         
@@ -1704,24 +2328,25 @@ class MainWindow(QMainWindow):
         layout.addWidget(self.next_button)
         
         self.pagination_widget.setLayout(layout)
-        self.main_layout.addWidget(self.pagination_widget)
+        layout_onglet.addWidget(self.pagination_widget)
 
     def update_pagination_controls(self):
-        if self.paginator:
-            total_pages = self.paginator.total_pages
-            self.page_label.setText(f"Page {self.current_page}/{total_pages}")
-            self.prev_button.setEnabled(self.current_page > 1)
-            self.next_button.setEnabled(self.current_page < total_pages)
+        self.page_label.setText(f"Page {self.paginator.numero}/{max(self.paginator.total_pages, self.paginator.numero)}")
+        self.prev_button.setEnabled(self.paginator.numero > 1)
+        self.next_button.setEnabled(self.paginator.suivant is not None)
 
     def previous_page(self):
-        if self.current_page > 1:
-            self.current_page -= 1
-            self.update_table(self.gestion.paiements)
+        if self.paginator.reculer():
+            self.update_table()
 
     def next_page(self):
-        if self.paginator and self.current_page < self.paginator.total_pages:
-            self.current_page += 1
-            self.update_table(self.gestion.paiements)
+        if self.paginator.avancer():
+            self.update_table()
+
+    def rafraichir_registre(self, *_):
+        # Après une écriture : page courante relue si l'onglet Registre est affiché
+        if hasattr(self, "page_model") and self.tabs.currentWidget() is self.page_table.parentWidget():
+            self.update_table()
 
     def show_success_message(self, title, message):
         msg = QMessageBox(self)
@@ -1743,7 +2368,10 @@ class MainWindow(QMainWindow):
         msg.exec_()
 
 if __name__ == "__main__":
+    # Reçus en lot rendus dans des processus (spawn) : nécessaire pour l'exécutable figé
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
+    PROFIL.marquer("QApplication")
     # Style global
     app.setStyle("Fusion")
     # Palette moderne
@@ -1800,14 +2428,14 @@ if __name__ == "__main__":
         background: white;
     }
     
-    QTableWidget {
+    QTableView {
         border: 1px solid #BDBDBD;
         border-radius: 4px;
         background: white;
         gridline-color: #E0E0E0;
     }
     
-    QTableWidget QHeaderView::section {
+    QTableView QHeaderView::section {
         background: #1976D2;
         color: white;
         font-weight: bold;
@@ -1816,7 +2444,7 @@ if __name__ == "__main__":
         font-size: 14px;
     }
     
-    QTableWidget::item {
+    QTableView::item {
         padding: 2px;          /* Réduit de 5px à 2px */
         height: 24px;          /* Hauteur fixe plus petite */
     }
@@ -1829,11 +2457,13 @@ if __name__ == "__main__":
         width: 30px;           /* Largeur de l'en-tête vertical */
     }
     
-    QTableWidget::item:selected {
+    QTableView::item:selected {
         background-color: #E3F2FD;
         color: black;
     }
 """)
     window = MainWindow()
     window.show()
+    PROFIL.marquer("fenêtre affichée")
+    PROFIL.rapport()
     sys.exit(app.exec())
\ No newline at end of file
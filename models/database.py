@@ -1,21 +1,98 @@
 import sqlite3
 import logging
+from contextlib import contextmanager
 from utils.config import DATABASE
 from datetime import datetime
+from models.paiement import periode_paiement
 
 logger = logging.getLogger(__name__)
 
+# Statuts comptés comme argent reçu de l'élève (compte élève, échéances)
+STATUTS_VERSES = ("payé", "partiel")
+
+# date_paiement est stockée en JJ/MM/AAAA : cette expression la rend triable (AAAAMMJJ)
+DATE_TRI = "(substr(date_paiement, 7, 4) || substr(date_paiement, 4, 2) || substr(date_paiement, 1, 2))"
+# Mois concerné dans l'ordre chronologique, mois illisibles (periode NULL) après toute période
+PERIODE_TRI = "IFNULL(periode, 999999)"
+
+# Version du schéma (PRAGMA user_version) : 1 = triggers de mise à jour limités à leurs colonnes,
+# 2 = échéances par période, classe des comptes élèves en majuscules, reste dû par échéance,
+# 3 = index de recherche en collation PLI, 4 = périodes des dates jj/mm/aaaa recalculées,
+# 5 = agrégats par mois clés sur la période, 6 = agrégats par classe en majuscules
+VERSION_SCHEMA = 6
+
+# Index secondaires pour la recherche, insensibles à la casse sur tout Unicode (collation PLI)
+INDEX_RECHERCHE = {
+    "idx_paiements_nom": "paiements (nom COLLATE PLI, prenom COLLATE PLI)",
+    "idx_paiements_classe_mois_statut": "paiements (classe COLLATE PLI, mois COLLATE PLI, statut COLLATE PLI)",
+    "idx_paiements_mois": "paiements (mois COLLATE PLI, statut COLLATE PLI)",
+    "idx_paiements_statut": "paiements (statut COLLATE PLI)",
+}
+
+# Colonnes lues par chaque famille de triggers : une mise à jour qui n'en touche aucune
+# (periode, notes, heure...) ne les déclenche pas
+COLONNES_STATISTIQUES = ("classe", "montant", "mois", "date_paiement", "statut", "methode_paiement")
+COLONNES_ELEVES = ("nom", "prenom", "classe", "montant", "mois", "date_paiement", "statut")
+
+# Reste dû d'une échéance : l'impayé enregistré pour le mois, diminué de ce qui a été versé
+RESTE_ECHEANCE = "MAX({e}.impaye - {e}.verse, 0)"
+
+ECHEANCES = '''
+    CREATE TABLE IF NOT EXISTS echeances (
+        eleve_id INTEGER NOT NULL REFERENCES eleves (id),
+        periode INTEGER NOT NULL,  -- mois de l'échéance (annee * 12 + mois - 1)
+        nombre INTEGER NOT NULL DEFAULT 0,
+        verse REAL NOT NULL DEFAULT 0,
+        rembourse REAL NOT NULL DEFAULT 0,
+        impaye REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (eleve_id, periode)
+    )
+'''
+
+def comparer_pli(a, b):
+    # Collation PLI : NOCASE ne replie que l'ASCII ("élodie" != "ÉLODIE"), casefold tout Unicode
+    a, b = a.casefold(), b.casefold()
+    return (a > b) - (a < b)
+
+def enregistrer_fonctions(conn):
+    # Fonctions et collation utilisées par les index, triggers et migrations : à déclarer sur
+    # toute connexion qui écrit dans paiements
+    conn.create_function("periode_mois", 2, periode_paiement)
+    conn.create_collation("PLI", comparer_pli)
+
 class Database:
     def __init__(self):
         self.db_path = DATABASE['name']
         self.init_db()
-    
+
+    def connexion(self):
+        # isolation_level=None : les transactions sont ouvertes explicitement
+        conn = sqlite3.connect(self.db_path, timeout=DATABASE['timeout'], isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        enregistrer_fonctions(conn)
+        return conn
+
+    @contextmanager
+    def transaction(self, conn):
+        # BEGIN IMMEDIATE prend le verrou d'écriture tout de suite
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+
     def init_db(self):
-        with sqlite3.connect(self.db_path) as conn:
+        conn = self.connexion()
+        try:
             cursor = conn.cursor()
-            
+
             # Création des tables
-            cursor.executescript('''
+            cursor.executescript(f'''
                 CREATE TABLE IF NOT EXISTS paiements (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     nom TEXT NOT NULL,
@@ -27,9 +104,40 @@ class Database:
                     heure_paiement TEXT NOT NULL,
                     methode_paiement TEXT NOT NULL,
                     statut TEXT NOT NULL,
-                    notes TEXT
+                    notes TEXT,
+                    periode INTEGER  -- mois saisi en période (annee * 12 + mois - 1), NULL si illisible
+                );
+
+                CREATE INDEX IF NOT EXISTS idx_paiements_date
+                    ON paiements ({DATE_TRI}, heure_paiement, id);
+
+                -- Agrégats tenus à jour par les triggers ci-dessous (une ligne par dimension/clé)
+                CREATE TABLE IF NOT EXISTS statistiques (
+                    dimension TEXT NOT NULL,
+                    cle TEXT NOT NULL,
+                    nombre INTEGER NOT NULL DEFAULT 0,
+                    montant REAL NOT NULL DEFAULT 0,
+                    montant_paye REAL NOT NULL DEFAULT 0,
+                    PRIMARY KEY (dimension, cle)
+                );
+
+                -- Comptes élèves (ID stable) et échéances par mois, tenus à jour par triggers
+                CREATE TABLE IF NOT EXISTS eleves (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    nom TEXT NOT NULL,
+                    prenom TEXT NOT NULL,
+                    classe TEXT NOT NULL,
+                    nombre INTEGER NOT NULL DEFAULT 0,
+                    versements INTEGER NOT NULL DEFAULT 0,
+                    total_verse REAL NOT NULL DEFAULT 0,
+                    total_rembourse REAL NOT NULL DEFAULT 0,
+                    total_impaye REAL NOT NULL DEFAULT 0,
+                    reste_du REAL NOT NULL DEFAULT 0,  -- somme des restes dus des échéances
+                    UNIQUE (nom, prenom, classe)  -- classe en majuscules, comme les index en mémoire
                 );
-                
+
+                {ECHEANCES};
+
                 CREATE TABLE IF NOT EXISTS users (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     username TEXT UNIQUE NOT NULL,
@@ -38,5 +146,239 @@ class Database:
                     expiration TEXT NOT NULL
                 );
             ''')
-            conn.commit()
-            logger.info("Base de données initialisée avec succès")
\ No newline at end of file
+            # Migrations, triggers et reconstructions dans une seule transaction :
+            # aucune écriture concurrente ne voit la base sans ses triggers
+            with self.transaction(conn):
+                version = cursor.execute("PRAGMA user_version").fetchone()[0]
+                if version < 1:
+                    # Anciens triggers AFTER UPDATE sans liste de colonnes : remplacés ci-dessous
+                    cursor.execute("DROP TRIGGER IF EXISTS trg_statistiques_update")
+                if version < 2:
+                    self._migrer_comptes_eleves(cursor)
+                if version < 6:
+                    # Agrégats par mois (texte saisi) et par classe (casse saisie) : triggers recréés ci-dessous
+                    for trigger in ("trg_statistiques_insert", "trg_statistiques_update", "trg_statistiques_delete"):
+                        cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+                if version < 3:
+                    # Index de recherche autrefois en COLLATE NOCASE : recréés ci-dessous
+                    for nom in INDEX_RECHERCHE:
+                        cursor.execute(f"DROP INDEX IF EXISTS {nom}")
+                for nom, definition in INDEX_RECHERCHE.items():
+                    cursor.execute(f"CREATE INDEX IF NOT EXISTS {nom} ON {definition}")
+                periodes_calculees = self._normaliser_periodes(cursor, recalculer=version < 4)
+                for trigger in self._triggers_statistiques() + self._triggers_eleves():
+                    cursor.execute(trigger)
+                self._reconstruire_statistiques_si_besoin(cursor, forcer=version < 6 or periodes_calculees)
+                # Périodes calculées sans déclencher les triggers : échéances à recalculer
+                self._reconstruire_eleves_si_besoin(cursor, forcer=version < 2 or periodes_calculees)
+                if version < VERSION_SCHEMA:
+                    cursor.execute(f"PRAGMA user_version = {VERSION_SCHEMA}")
+            logger.info("Base de données initialisée avec succès")
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _migrer_comptes_eleves(cursor):
+        # Échéances autrefois clées sur le mois saisi (« Octobre 2024 », « 10/2024 »... distincts) :
+        # table recréée par période, remplie par la reconstruction. Comptes élèves fusionnés par
+        # classe en majuscules (le plus ancien ID est conservé)
+        for trigger in ("trg_eleves_insert", "trg_eleves_update", "trg_eleves_delete"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        cursor.execute("DROP TABLE IF EXISTS echeances")
+        cursor.execute(ECHEANCES)
+        cursor.execute("DROP INDEX IF EXISTS idx_eleves_impaye")
+        if "reste_du" not in {row[1] for row in cursor.execute("PRAGMA table_info(eleves)")}:
+            cursor.execute("ALTER TABLE eleves ADD COLUMN reste_du REAL NOT NULL DEFAULT 0")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_eleves_reste_du ON eleves (reste_du)")
+        cursor.execute(
+            "DELETE FROM eleves WHERE id NOT IN (SELECT MIN(id) FROM eleves GROUP BY nom, prenom, UPPER(classe))"
+        )
+        cursor.execute("UPDATE eleves SET classe = UPPER(classe) WHERE classe <> UPPER(classe)")
+
+    @staticmethod
+    def _normaliser_periodes(cursor, recalculer=False):
+        # Base antérieure à la colonne periode : ajout, index des plages, puis calcul des
+        # périodes manquantes (lignes restaurées d'un ancien instantané comprises). Les
+        # triggers de mise à jour ne portent pas sur periode : le calcul ne les déclenche pas
+        colonnes = {row[1] for row in cursor.execute("PRAGMA table_info(paiements)")}
+        ajoutee = "periode" not in colonnes
+        if ajoutee:
+            cursor.execute("ALTER TABLE paiements ADD COLUMN periode INTEGER")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_paiements_periode ON paiements (periode, statut)")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_paiements_periode_tri ON paiements ({PERIODE_TRI})")
+        if recalculer and not ajoutee:
+            # Analyse du mois corrigée ("01/10/2024" : octobre, non janvier) : toutes les
+            # périodes sont recalculées, seules celles qui changent sont écrites
+            cursor.execute(
+                "UPDATE paiements SET periode = periode_mois(mois, date_paiement) "
+                "WHERE periode IS NOT periode_mois(mois, date_paiement)"
+            )
+            if cursor.rowcount > 0:
+                logger.info(f"Périodes recalculées pour {cursor.rowcount} paiements")
+            return cursor.rowcount > 0
+        # Ouvertures suivantes : une lecture de l'index suffit quand rien n'est à calculer
+        if not ajoutee and not cursor.execute("SELECT 1 FROM paiements WHERE periode IS NULL LIMIT 1").fetchone():
+            return False
+        cursor.execute(
+            "UPDATE paiements SET periode = periode_mois(mois, date_paiement) "
+            "WHERE periode IS NULL AND periode_mois(mois, date_paiement) IS NOT NULL"
+        )
+        if cursor.rowcount > 0:
+            logger.info(f"Périodes calculées pour {cursor.rowcount} paiements")
+        return cursor.rowcount > 0
+
+    @staticmethod
+    def _agregats(ligne, signe):
+        # Lignes VALUES ajoutant (signe=+1) ou retirant (signe=-1) un paiement des agrégats
+        paye = f"CASE WHEN {ligne}.statut = 'payé' THEN {ligne}.montant ELSE 0 END"
+        return ",\n".join(
+            f"({dimension}, 1 * {signe}, {ligne}.montant * {signe}, {paye} * {signe})"
+            for dimension in [
+                "'total', ''",
+                # En majuscules, comme les comptes élèves et les index en mémoire : "6e" compte dans "6E"
+                f"'classe', UPPER({ligne}.classe)",
+                f"'statut', {ligne}.statut",
+                # Période du mois concerné ('' si illisible) : "Octobre 2024" et "10/2024" agrégés ensemble
+                f"'mois', IFNULL({ligne}.periode, '')",
+                f"'methode_paiement', {ligne}.methode_paiement",
+            ]
+        )
+
+    def _triggers_statistiques(self):
+        upsert = '''
+            INSERT INTO statistiques (dimension, cle, nombre, montant, montant_paye) VALUES
+            {valeurs}
+            ON CONFLICT (dimension, cle) DO UPDATE SET
+                nombre = nombre + excluded.nombre,
+                montant = montant + excluded.montant,
+                montant_paye = montant_paye + excluded.montant_paye;
+        '''
+        # Une instruction par trigger : exécutées dans la transaction d'init_db
+        return [f'''
+            CREATE TRIGGER IF NOT EXISTS trg_statistiques_insert AFTER INSERT ON paiements BEGIN
+                {upsert.format(valeurs=self._agregats("NEW", 1))}
+            END
+        ''', f'''
+            CREATE TRIGGER IF NOT EXISTS trg_statistiques_update
+            AFTER UPDATE OF {', '.join(COLONNES_STATISTIQUES)} ON paiements BEGIN
+                {upsert.format(valeurs=self._agregats("OLD", -1))}
+                {upsert.format(valeurs=self._agregats("NEW", 1))}
+            END
+        ''', f'''
+            CREATE TRIGGER IF NOT EXISTS trg_statistiques_delete AFTER DELETE ON paiements BEGIN
+                {upsert.format(valeurs=self._agregats("OLD", -1))}
+            END
+        ''']
+
+    @staticmethod
+    def _montants_eleve(ligne):
+        # Colonnes du compte élève : (nombre, versements, versé, remboursé, impayé) d'un paiement
+        verse = "(" + ", ".join(f"'{s}'" for s in STATUTS_VERSES) + ")"
+        return [
+            "1",
+            f"CASE WHEN {ligne}.statut IN {verse} THEN 1 ELSE 0 END",
+            f"CASE WHEN {ligne}.statut IN {verse} THEN {ligne}.montant ELSE 0 END",
+            f"CASE WHEN {ligne}.statut = 'remboursé' THEN {ligne}.montant ELSE 0 END",
+            f"CASE WHEN {ligne}.statut = 'impayé' THEN {ligne}.montant ELSE 0 END",
+        ]
+
+    def _compte_eleve(self, ligne, signe):
+        # Ajoute (signe=+1) ou retire (signe=-1) un paiement du compte de l'élève et de l'échéance
+        # du mois (aucune si le mois est illisible). Le reste dû suit via trg_echeances_*
+        cle = f"nom = {ligne}.nom AND prenom = {ligne}.prenom AND classe = UPPER({ligne}.classe)"
+        nombre, versements, verse, rembourse, impaye = (f"({m}) * {signe}" for m in self._montants_eleve(ligne))
+        return f'''
+            -- WHERE NOT EXISTS plutôt que ON CONFLICT : pas de numéro AUTOINCREMENT consommé
+            INSERT INTO eleves (nom, prenom, classe) SELECT {ligne}.nom, {ligne}.prenom, UPPER({ligne}.classe)
+                WHERE NOT EXISTS (SELECT 1 FROM eleves WHERE {cle});
+            UPDATE eleves SET
+                nombre = nombre + {nombre},
+                versements = versements + {versements},
+                total_verse = total_verse + {verse},
+                total_rembourse = total_rembourse + {rembourse},
+                total_impaye = total_impaye + {impaye}
+            WHERE {cle};
+            INSERT INTO echeances (eleve_id, periode, nombre, verse, rembourse, impaye)
+                SELECT id, {ligne}.periode, {nombre}, {verse}, {rembourse}, {impaye} FROM eleves
+                WHERE {cle} AND {ligne}.periode IS NOT NULL
+                ON CONFLICT (eleve_id, periode) DO UPDATE SET
+                    nombre = nombre + excluded.nombre,
+                    verse = verse + excluded.verse,
+                    rembourse = rembourse + excluded.rembourse,
+                    impaye = impaye + excluded.impaye;
+        '''
+
+    def _triggers_eleves(self):
+        return [f'''
+            CREATE TRIGGER IF NOT EXISTS trg_eleves_insert AFTER INSERT ON paiements BEGIN
+                {self._compte_eleve("NEW", 1)}
+            END
+        ''', f'''
+            CREATE TRIGGER IF NOT EXISTS trg_eleves_update
+            AFTER UPDATE OF {', '.join(COLONNES_ELEVES)} ON paiements BEGIN
+                {self._compte_eleve("OLD", -1)}
+                {self._compte_eleve("NEW", 1)}
+            END
+        ''', f'''
+            CREATE TRIGGER IF NOT EXISTS trg_eleves_delete AFTER DELETE ON paiements BEGIN
+                {self._compte_eleve("OLD", -1)}
+            END
+        ''', f'''
+            CREATE TRIGGER IF NOT EXISTS trg_echeances_insert AFTER INSERT ON echeances BEGIN
+                UPDATE eleves SET reste_du = reste_du + {RESTE_ECHEANCE.format(e="NEW")} WHERE id = NEW.eleve_id;
+            END
+        ''', f'''
+            CREATE TRIGGER IF NOT EXISTS trg_echeances_update AFTER UPDATE ON echeances BEGIN
+                UPDATE eleves SET reste_du = reste_du - {RESTE_ECHEANCE.format(e="OLD")}
+                    + {RESTE_ECHEANCE.format(e="NEW")} WHERE id = NEW.eleve_id;
+            END
+        ''']
+
+    def _reconstruire_eleves_si_besoin(self, cursor, forcer=False):
+        # Base antérieure aux comptes élèves (ou restaurée) : recalcul unique, IDs existants conservés
+        total = cursor.execute("SELECT COUNT(*) FROM paiements").fetchone()[0]
+        compte = cursor.execute("SELECT TOTAL(nombre) FROM eleves").fetchone()[0]
+        if compte == total and not forcer:
+            return
+        nombre, versements, verse, rembourse, impaye = (f"TOTAL({m})" for m in self._montants_eleve("p"))
+        cursor.execute(
+            "UPDATE eleves SET nombre = 0, versements = 0, total_verse = 0, total_rembourse = 0, "
+            "total_impaye = 0, reste_du = 0"
+        )
+        cursor.execute("DELETE FROM echeances")
+        cursor.execute(f'''
+            INSERT INTO eleves (nom, prenom, classe, nombre, versements, total_verse, total_rembourse, total_impaye)
+            SELECT nom, prenom, UPPER(classe), {nombre}, {versements}, {verse}, {rembourse}, {impaye}
+            FROM paiements p WHERE true GROUP BY nom, prenom, UPPER(classe)
+            ON CONFLICT (nom, prenom, classe) DO UPDATE SET
+                nombre = excluded.nombre, versements = excluded.versements, total_verse = excluded.total_verse,
+                total_rembourse = excluded.total_rembourse, total_impaye = excluded.total_impaye
+        ''')
+        # Reste dû des comptes recalculé par trg_echeances_insert à chaque échéance insérée
+        cursor.execute(f'''
+            INSERT INTO echeances (eleve_id, periode, nombre, verse, rembourse, impaye)
+            SELECT e.id, p.periode, {nombre}, {verse}, {rembourse}, {impaye}
+            FROM paiements p JOIN eleves e ON e.nom = p.nom AND e.prenom = p.prenom AND e.classe = UPPER(p.classe)
+            WHERE p.periode IS NOT NULL
+            GROUP BY e.id, p.periode
+        ''')
+        logger.info(f"Comptes élèves reconstruits ({total} paiements)")
+
+    def _reconstruire_statistiques_si_besoin(self, cursor, forcer=False):
+        # Base créée avant les triggers (ou restaurée), ou périodes recalculées : on recalcule une seule fois
+        total = cursor.execute("SELECT COUNT(*) FROM paiements").fetchone()[0]
+        agrege = cursor.execute(
+            "SELECT nombre FROM statistiques WHERE dimension = 'total' AND cle = ''"
+        ).fetchone()
+        if (agrege[0] if agrege else 0) == total and not forcer:
+            return
+        cursor.execute("DELETE FROM statistiques")
+        for dimension, colonne in [("total", "''"), ("classe", "UPPER(classe)"), ("statut", "statut"),
+                                   ("mois", "IFNULL(periode, '')"), ("methode_paiement", "methode_paiement")]:
+            cursor.execute(f'''
+                INSERT INTO statistiques (dimension, cle, nombre, montant, montant_paye)
+                SELECT '{dimension}', {colonne}, COUNT(*), TOTAL(montant),
+                       TOTAL(CASE WHEN statut = 'payé' THEN montant ELSE 0 END)
+                FROM paiements GROUP BY {colonne}
+            ''')
+        logger.info(f"Statistiques agrégées reconstruites ({total} paiements)")
@@ -0,0 +1,247 @@
+import re
+import sys
+import threading
+import unicodedata
+from datetime import date
+from functools import lru_cache
+
+STATUTS = ["payé", "impayé", "partiel", "remboursé"]
+METHODES_PAIEMENT = ["Espèces", "Chèque", "Virement", "Carte bancaire", "Mobile Money"]
+CHAMPS = ["id", "nom", "prenom", "classe", "montant", "mois", "methode_paiement", "statut", "date_paiement", "heure_paiement", "notes"]
+
+class Codes:
+    """Table d'internement valeur <-> petit entier (classes, statuts, méthodes)"""
+
+    def __init__(self, valeurs=()):
+        self.valeurs = []
+        self.index = {}
+        # Le registre peut être chargé dans un thread pendant que l'interface crée des paiements
+        self._verrou = threading.Lock()
+        for valeur in valeurs:
+            self.code(valeur)
+
+    def code(self, valeur):
+        code = self.index.get(valeur)
+        if code is None:
+            with self._verrou:
+                code = self.index.get(valeur)
+                if code is None:
+                    code = len(self.valeurs)
+                    valeur = sys.intern(valeur)
+                    self.valeurs.append(valeur)
+                    self.index[valeur] = code
+        return code
+
+    def valeur(self, code):
+        return self.valeurs[code]
+
+    def __len__(self):
+        return len(self.valeurs)
+
+CLASSES = Codes()
+STATUTS_CODES = Codes(STATUTS)
+METHODES_CODES = Codes(METHODES_PAIEMENT)
+
+def montant_fcfa(valeur):
+    """"1000", "1000.0", 1000.0 -> 1000 (entier FCFA). Lève ValueError si invalide."""
+    return int(round(float(str(valeur).replace(" ", "").replace(",", "."))))
+
+def date_ordinal(texte):
+    # "14/07/2025" -> date(2025, 7, 14).toordinal(), 0 si illisible
+    try:
+        jour, mois, annee = texte.split("/")
+        return date(int(annee), int(mois), int(jour)).toordinal()
+    except (AttributeError, ValueError):
+        return 0
+
+NOMS_MOIS = ["janvier", "février", "mars", "avril", "mai", "juin", "juillet",
+             "août", "septembre", "octobre", "novembre", "décembre"]
+MOIS_RENTREE = 9  # l'année scolaire commence en septembre
+_NUMEROS_MOIS = {
+    unicodedata.normalize("NFKD", nom).encode("ascii", "ignore").decode(): i for i, nom in enumerate(NOMS_MOIS, 1)
+}
+_NUMEROS_MOIS.update({"jan": 1, "janv": 1, "fev": 2, "fevr": 2, "avr": 4, "juil": 7,
+                      "sep": 9, "sept": 9, "oct": 10, "nov": 11, "dec": 12})
+
+def periode(annee, mois):
+    # Période = nombre de mois depuis l'an 0 : consécutive d'un mois à l'autre, triable
+    return annee * 12 + mois - 1
+
+def annee_mois(periode_):
+    return divmod(periode_, 12)[0], periode_ % 12 + 1
+
+def periode_mois(texte, date_reference=0):
+    """Texte libre du champ mois -> période, None si illisible
+
+    "Octobre 2024", "octobre", "Oct. 2024", "10/2024", "2024-10", "01/10/2024" (jj/mm/aaaa).
+    Sans année, le mois est placé dans l'année scolaire de date_reference (ordinal,
+    aujourd'hui par défaut) : "Janvier" saisi en novembre 2024 -> janvier 2025.
+
+    >>> annee_mois(periode_mois("01/10/2024")), annee_mois(periode_mois("2024-10-01"))
+    ((2024, 10), (2024, 10))
+    >>> annee_mois(periode_mois("Janvier", date(2024, 11, 5).toordinal()))
+    (2025, 1)
+    """
+    mois, annee = _analyser_mois(str(texte or ""))
+    if mois is None:
+        return None
+    if annee is None:
+        reference = date.fromordinal(date_reference) if date_reference else date.today()
+        rentree = reference.year if reference.month >= MOIS_RENTREE else reference.year - 1
+        annee = rentree if mois >= MOIS_RENTREE else rentree + 1
+    return periode(annee, mois)
+
+def periode_paiement(mois, date_paiement):
+    # Période d'un paiement stocké (date "jj/mm/aaaa" comme référence) ; fonction SQL periode_mois()
+    return periode_mois(mois, date_ordinal(date_paiement))
+
+def mois_sans_annee(texte):
+    """Numéro du mois (1 à 12) d'un critère de recherche sans année ("Octobre"), sinon None
+
+    Un tel critère désigne ce mois de toutes les années : les paiements stockés tiennent
+    leur année de la date de paiement, pas de l'année scolaire courante.
+    """
+    texte = str(texte or "").strip()
+    if _BORNES.search(texte) or _ANNEE_SCOLAIRE.match(texte):
+        return None
+    mois, annee = _analyser_mois(texte)
+    return mois if annee is None else None
+
+_BORNES = re.compile(r"\s+(?:-|–|à|au)\s+", re.IGNORECASE)
+_ANNEE_SCOLAIRE = re.compile(r"^\s*(\d{4})\s*[-/–]\s*(\d{4})\s*$")
+
+def plage_mois(texte, date_reference=0):
+    """Texte de recherche -> (première, dernière période) incluses, None si illisible
+
+    Un mois ("Octobre 2024"), une plage ("Septembre 2023 - Juin 2024") ou une année
+    scolaire ("2023-2024" : septembre 2023 à août 2024).
+    """
+    texte = str(texte or "").strip()
+    annees = _ANNEE_SCOLAIRE.match(texte)
+    if annees and int(annees[2]) == int(annees[1]) + 1:
+        rentree = periode(int(annees[1]), MOIS_RENTREE)
+        return rentree, rentree + 11
+    bornes = [periode_mois(borne, date_reference) for borne in _BORNES.split(texte, maxsplit=1)]
+    if None in bornes or bornes[-1] < bornes[0]:
+        return None
+    return bornes[0], bornes[-1]
+
+@lru_cache(maxsize=4096)
+def _analyser_mois(texte):
+    # Peu de libellés distincts dans un registre : analysé une fois par libellé
+    texte = unicodedata.normalize("NFKD", texte).encode("ascii", "ignore").decode().lower()
+    nombres = [int(n) for n in re.findall(r"\d+", texte)]
+    mois = next((_NUMEROS_MOIS[m] for m in re.findall(r"[a-z]+", texte) if m in _NUMEROS_MOIS), None)
+    i_annee = next((i for i, n in enumerate(nombres) if n >= 1900), None)
+    if mois is None:
+        if i_annee:
+            # Mois juste avant l'année : "10/2024", "01/10/2024" (jj/mm/aaaa)
+            mois = nombres[i_annee - 1]
+        elif i_annee == 0 and len(nombres) > 1:
+            # Année en tête : "2024-10", "2024-10-01"
+            mois = nombres[1]
+        else:
+            mois = next((n for n in nombres if 1 <= n <= 12), None)
+        if mois is not None and not 1 <= mois <= 12:
+            mois = None
+    return mois, None if i_annee is None else nombres[i_annee]
+
+def heure_secondes(texte):
+    # "10:05:30" -> 36330, 0 si illisible
+    try:
+        parties = [int(x) for x in texte.split(":")]
+    except (AttributeError, ValueError):
+        return 0
+    parties += [0] * (3 - len(parties))
+    return parties[0] * 3600 + parties[1] * 60 + parties[2]
+
+_CLES = dict.fromkeys(CHAMPS)
+_A_CALCULER = object()  # période absente : calculée depuis le mois saisi (paiement pas encore stocké)
+
+class Paiement:
+    """Paiement typé et compact
+
+    Montant en FCFA entiers, date en ordinal, heure en secondes, classe/statut/méthode
+    en codes internés, mois saisi doublé de sa période (entier, None si illisible) : celle
+    de la colonne periode pour un paiement lu en base. L'accès paiement['champ'] renvoie
+    le texte affiché, comme les anciens dictionnaires issus du CSV.
+    """
+
+    __slots__ = ("id", "nom", "prenom", "classe_code", "montant", "mois", "periode",
+                 "methode_code", "statut_code", "date_ordinal", "heure", "notes")
+
+    def __init__(self, id, nom, prenom, classe, montant, mois, methode_paiement,
+                 statut, date_paiement, heure_paiement, notes="", periode=_A_CALCULER):
+        self.id = int(id)
+        self.nom = sys.intern(nom)
+        self.prenom = sys.intern(prenom)
+        self.classe_code = CLASSES.code(classe)
+        self.montant = montant_fcfa(montant)
+        self.mois = sys.intern(mois)
+        self.methode_code = METHODES_CODES.code(methode_paiement)
+        self.statut_code = STATUTS_CODES.code(statut)
+        self.date_ordinal = date_paiement if isinstance(date_paiement, int) else date_ordinal(date_paiement)
+        self.heure = heure_paiement if isinstance(heure_paiement, int) else heure_secondes(heure_paiement)
+        self.notes = notes or ""
+        self.periode = periode_mois(self.mois, self.date_ordinal) if periode is _A_CALCULER else periode
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{champ: data.get(champ, "") for champ in CHAMPS}, periode=data.get("periode", _A_CALCULER))
+
+    @classmethod
+    def from_row(cls, row):
+        # Ligne lue avec les colonnes LECTURE du dépôt (CHAMPS puis periode)
+        return cls(*(row[champ] for champ in CHAMPS), periode=row["periode"])
+
+    @property
+    def classe(self):
+        return CLASSES.valeur(self.classe_code)
+
+    @property
+    def statut(self):
+        return STATUTS_CODES.valeur(self.statut_code)
+
+    @property
+    def methode_paiement(self):
+        return METHODES_CODES.valeur(self.methode_code)
+
+    @property
+    def date(self):
+        return date.fromordinal(self.date_ordinal) if self.date_ordinal else None
+
+    @property
+    def date_paiement(self):
+        return self.date.strftime("%d/%m/%Y") if self.date_ordinal else ""
+
+    @property
+    def heure_paiement(self):
+        return "%02d:%02d:%02d" % (self.heure // 3600, self.heure // 60 % 60, self.heure % 60)
+
+    # Accès de type dictionnaire (texte), pour l'affichage et l'export
+    def __getitem__(self, champ):
+        if champ not in _CLES:
+            raise KeyError(champ)
+        valeur = getattr(self, champ)
+        return valeur if isinstance(valeur, str) else str(valeur)
+
+    def get(self, champ, defaut=None):
+        return self[champ] if champ in _CLES else defaut
+
+    def __contains__(self, champ):
+        return champ in _CLES
+
+    def keys(self):
+        return _CLES.keys()
+
+    def values(self):
+        return [self[champ] for champ in CHAMPS]
+
+    def items(self):
+        return [(champ, self[champ]) for champ in CHAMPS]
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def __repr__(self):
+        return f"Paiement({self.to_dict()!r})"
@@ -0,0 +1,367 @@
+import csv
+import os
+import logging
+from datetime import date
+from models.database import DATE_TRI, PERIODE_TRI, RESTE_ECHEANCE
+from models.paiement import (CHAMPS, Paiement, montant_fcfa, date_ordinal, mois_sans_annee, periode_mois,
+                             periode_paiement, plage_mois)
+
+logger = logging.getLogger(__name__)
+
+COLONNES = CHAMPS[1:]
+LECTURE = CHAMPS + ["periode"]  # colonnes lues : la période stockée n'est pas recalculée
+CRITERES_RECHERCHE = ["id", "nom", "prenom", "classe", "mois", "statut", "methode_paiement"]
+# Bornes incluses sur la date de paiement ("jj/mm/aaaa" ou date), via l'index idx_paiements_date
+CRITERES_PERIODE = {"date_debut": ">=", "date_fin": "<="}
+# Bornes incluses sur le mois concerné (période entière ou texte "Octobre 2024"), via idx_paiements_periode
+CRITERES_MOIS = {"mois_debut": ">=", "mois_fin": "<="}
+# Clés de tri disponibles pour la pagination (la première colonne est indexée, sauf montant)
+TRIS = {
+    "date": [DATE_TRI, "heure_paiement", "id"],
+    "id": ["id"],
+    "nom": ["nom COLLATE PLI", "prenom COLLATE PLI", "id"],
+    "classe": ["classe COLLATE PLI", "id"],
+    "mois": [PERIODE_TRI, "id"],  # chronologique, comme le tri en mémoire (table_model.CLES_TRI)
+    "statut": ["statut COLLATE PLI", "id"],
+    "montant": ["montant", "id"],
+}
+
+def periode_critere(valeur):
+    # Période (entier) ou texte du mois -> période, comparable à la colonne periode
+    if isinstance(valeur, int):
+        return valeur
+    periode_ = periode_mois(valeur)
+    if periode_ is None:
+        raise ValueError(f"Mois invalide : {valeur}")
+    return periode_
+
+def date_tri(valeur):
+    # date ou "jj/mm/aaaa" -> "aaaammjj", comparable à DATE_TRI
+    if isinstance(valeur, str):
+        ordinal = date_ordinal(valeur.strip())
+        if not ordinal:
+            raise ValueError(f"Date invalide : {valeur}")
+        valeur = date.fromordinal(ordinal)
+    return valeur.strftime("%Y%m%d")
+
+class PaiementRepository:
+    """Accès aux paiements stockés dans la table SQLite `paiements`"""
+
+    def __init__(self, db):
+        self.db = db
+        self.conn = db.connexion()
+        self.observateurs = []
+
+    def abonner(self, callback):
+        """Enregistre callback(operation, id_paiement, valeurs), appelé après chaque écriture validée
+
+        operation vaut "insert" (valeurs = toutes les colonnes) ou "update" (colonnes modifiées).
+        """
+        self.observateurs.append(callback)
+
+    def _notifier(self, operation, id_paiement, valeurs):
+        for callback in self.observateurs:
+            try:
+                callback(operation, id_paiement, valeurs)
+            except Exception as e:
+                logger.error(f"Erreur dans un observateur du dépôt ({operation} {id_paiement}): {e}")
+
+    def lister(self):
+        rows = self.conn.execute(f"SELECT {', '.join(LECTURE)} FROM paiements ORDER BY id")
+        return [Paiement.from_row(row) for row in rows]
+
+    def get(self, id_paiement):
+        row = self.conn.execute(
+            f"SELECT {', '.join(LECTURE)} FROM paiements WHERE id = ?", (id_paiement,)
+        ).fetchone()
+        return Paiement.from_row(row) if row else None
+
+    def _filtre(self, criteres):
+        """Clause WHERE (sans le mot-clé) et paramètres : égalités, période de paiement et mois
+
+        Le critère mois est comparé en période : "Octobre 2024", "oct. 2024" et "10/2024"
+        désignent le même mois ; une plage ("Septembre 2023 - Juin 2024") ou une année
+        scolaire ("2023-2024") devient un parcours d'intervalle de l'index. Un mois sans
+        année ("Octobre") désigne ce mois de toutes les années. Un texte illisible reste
+        comparé au texte saisi.
+        """
+        inconnus = set(criteres) - set(CRITERES_RECHERCHE) - set(CRITERES_PERIODE) - set(CRITERES_MOIS)
+        if inconnus:
+            raise ValueError(f"Critère(s) de recherche inconnu(s) : {', '.join(sorted(inconnus))}")
+        conditions, valeurs = [], []
+        for critere, valeur in criteres.items():
+            if valeur is None or str(valeur).strip() == "":
+                continue
+            if critere in CRITERES_PERIODE:
+                conditions.append(f"{DATE_TRI} {CRITERES_PERIODE[critere]} ?")
+                valeurs.append(date_tri(valeur))
+                continue
+            if critere in CRITERES_MOIS:
+                conditions.append(f"periode {CRITERES_MOIS[critere]} ?")
+                valeurs.append(periode_critere(valeur))
+                continue
+            if critere == 'mois':
+                numero = mois_sans_annee(valeur)
+                if numero is not None:
+                    conditions.append("periode % 12 = ?")
+                    valeurs.append(numero - 1)
+                    continue
+                plage = plage_mois(valeur)
+                if plage is not None:
+                    conditions.append("periode BETWEEN ? AND ?")
+                    valeurs.extend(plage)
+                    continue
+            if critere == 'id':
+                conditions.append("id = ?")
+            else:
+                # Collation PLI (models.database) : "élodie" retrouve "ÉLODIE"
+                conditions.append(f"{critere} = ? COLLATE PLI")
+            valeurs.append(str(valeur).strip())
+        return conditions, valeurs
+
+    def rechercher(self, **criteres):
+        """Recherche par égalité (insensible à la casse) sur une ou plusieurs colonnes indexées
+
+        Exemples : rechercher(classe="6E", mois="Octobre 2024", statut="impayé"),
+        rechercher(mois="2023-2024"), rechercher(mois_debut="Janvier 2025", mois_fin="Mars 2025").
+        Sans critère renseigné, aucun résultat (le registre complet se lit par page()).
+        """
+        conditions, valeurs = self._filtre(criteres)
+        if not conditions:
+            return []
+        rows = self.conn.execute(
+            f"SELECT {', '.join(LECTURE)} FROM paiements WHERE {' AND '.join(conditions)} ORDER BY id", valeurs
+        )
+        return [Paiement.from_row(row) for row in rows]
+
+    def page(self, apres=None, limite=50, tri="date", descendant=True, **criteres):
+        """Pagination par clé (keyset) : lit uniquement `limite` lignes via l'index de tri
+
+        `apres` est le curseur renvoyé pour la page précédente (None pour la première).
+        Retourne (paiements, curseur_suivant) ; curseur_suivant vaut None en fin de liste.
+        """
+        cles = TRIS[tri]
+        conditions, valeurs = self._filtre(criteres)
+        if apres is not None:
+            operateur = '<' if descendant else '>'
+            # La borne sur la première clé seule permet à SQLite de positionner l'index
+            conditions.append(f"{cles[0]} {operateur}= ?")
+            conditions.append(f"({', '.join(cles)}) {operateur} ({', '.join('?' * len(cles))})")
+            valeurs.extend([apres[0], *apres])
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        ordre = ", ".join(f"{cle} {'DESC' if descendant else 'ASC'}" for cle in cles)
+        rows = self.conn.execute(
+            f"SELECT {', '.join(LECTURE)}, {', '.join(f'{cle} AS cle_{i}' for i, cle in enumerate(cles))} "
+            f"FROM paiements{where} ORDER BY {ordre} LIMIT ?",
+            valeurs + [limite]
+        ).fetchall()
+        curseur = tuple(rows[-1][f"cle_{i}"] for i in range(len(cles))) if len(rows) == limite else None
+        return [Paiement.from_row(row) for row in rows], curseur
+
+    def iterer(self, taille_lot=1000, tri="id", descendant=False, **criteres):
+        """Parcourt les paiements par lots (listes de Paiement) en mémoire constante
+
+        Chaque lot est une page de la pagination par clé : aucune requête ne garde de
+        curseur SQLite ouvert entre deux lots.
+        """
+        curseur = None
+        while True:
+            lot, curseur = self.page(curseur, taille_lot, tri, descendant, **criteres)
+            if lot:
+                yield lot
+            if curseur is None:
+                return
+
+    def compter(self, **criteres):
+        conditions, valeurs = self._filtre(criteres)
+        if not conditions:
+            # Total tenu à jour par les triggers : pas de parcours de la table
+            row = self.conn.execute(
+                "SELECT nombre FROM statistiques WHERE dimension = 'total' AND cle = ''"
+            ).fetchone()
+            return row[0] if row else 0
+        return self.conn.execute(
+            f"SELECT COUNT(*) FROM paiements WHERE {' AND '.join(conditions)}", valeurs
+        ).fetchone()[0]
+
+    def statistiques(self):
+        """Agrégats pré-calculés : {dimension: {cle: {"nombre", "montant", "montant_paye"}}}
+
+        Dimensions : total (clé ""), classe, statut, mois (clé : période entière, None si
+        le mois est illisible), methode_paiement.
+        """
+        stats = {}
+        for row in self.conn.execute(
+            "SELECT dimension, cle, nombre, montant, montant_paye FROM statistiques WHERE nombre > 0"
+        ):
+            cle = row['cle']
+            if row['dimension'] == 'mois':
+                cle = int(cle) if cle != '' else None
+            stats.setdefault(row['dimension'], {})[cle] = {
+                "nombre": row['nombre'],
+                # Colonnes REAL : ramenées en FCFA entiers, comme Paiement.montant
+                "montant": int(row['montant']),
+                "montant_paye": int(row['montant_paye'])
+            }
+        return stats
+
+    def serie_mois(self, debut, fin, **criteres):
+        """Totaux par mois concerné de debut à fin inclus (périodes ou textes), dans l'ordre
+
+        Parcours d'intervalle sur idx_paiements_periode et regroupement sur l'entier :
+        [(période, nombre, montant, montant_paye)], mois sans paiement omis.
+        """
+        conditions, valeurs = self._filtre({**criteres, "mois_debut": debut, "mois_fin": fin})
+        rows = self.conn.execute(
+            "SELECT periode, COUNT(*), TOTAL(montant), TOTAL(CASE WHEN statut = 'payé' THEN montant ELSE 0 END) "
+            f"FROM paiements WHERE {' AND '.join(conditions)} GROUP BY periode ORDER BY periode",
+            valeurs
+        )
+        return [tuple(row) for row in rows]
+
+    # Comptes élèves : tenus à jour par triggers dans la transaction de chaque écriture
+    @staticmethod
+    def _compte(row):
+        compte = dict(row)
+        # Reste dû : par échéance, l'impayé enregistré moins ce qui a été versé depuis pour ce mois
+        compte["solde"] = compte["reste_du"]
+        compte["net_verse"] = compte["total_verse"] - compte["total_rembourse"]
+        return compte
+
+    def compte_eleve(self, nom, prenom, classe):
+        """Compte de l'élève (ID stable, versements, totaux, solde) ou None ; lecture par clé unique"""
+        row = self.conn.execute(
+            "SELECT * FROM eleves WHERE nom = ? AND prenom = ? AND classe = UPPER(?)", (nom, prenom, classe)
+        ).fetchone()
+        return self._compte(row) if row else None
+
+    def eleve(self, id_eleve):
+        row = self.conn.execute("SELECT * FROM eleves WHERE id = ?", (id_eleve,)).fetchone()
+        return self._compte(row) if row else None
+
+    def echeances(self, id_eleve):
+        """Échéances (une par période) de l'élève, dans l'ordre des mois"""
+        rows = self.conn.execute(
+            f"SELECT periode, nombre, verse, rembourse, impaye, {RESTE_ECHEANCE.format(e='echeances')} AS reste "
+            "FROM echeances WHERE eleve_id = ? AND nombre > 0 ORDER BY periode", (id_eleve,)
+        )
+        return [dict(row) for row in rows]
+
+    def arrieres(self, classe=None, limite=None):
+        """Élèves ayant un solde impayé, du plus endetté au moins endetté (index idx_eleves_reste_du)"""
+        requete = "SELECT * FROM eleves WHERE reste_du > 0"
+        valeurs = []
+        if classe:
+            requete += " AND classe = UPPER(?)"
+            valeurs.append(classe)
+        requete += " ORDER BY reste_du DESC"
+        if limite:
+            requete += " LIMIT ?"
+            valeurs.append(limite)
+        return [self._compte(row) for row in self.conn.execute(requete, valeurs)]
+
+    def ajouter(self, paiement):
+        """Insère un paiement et retourne son ID (chaîne)
+
+        L'ID vient de la séquence AUTOINCREMENT de SQLite : il est attribué dans la
+        transaction d'écriture, donc unique même avec plusieurs postes sur la même base,
+        et jamais réutilisé après une suppression.
+        """
+        return self.appliquer([("insert", paiement)])[0][1]
+
+    def modifier(self, id_paiement, nouvelles_valeurs):
+        """Met à jour les colonnes fournies d'un paiement, retourne False s'il n'existe pas"""
+        return self.appliquer([("update", id_paiement, nouvelles_valeurs)])[0][1] is not None
+
+    def appliquer(self, operations):
+        """Exécute un lot d'écritures dans l'ordre, en une seule transaction
+
+        operations : [("insert", paiement) | ("update", id_paiement, valeurs)].
+        Retourne [(operation, id_paiement, valeurs écrites)] ; id_paiement vaut None pour
+        une modification sans paiement correspondant. Les observateurs sont notifiés après
+        la validation ; si une écriture échoue, tout le lot est annulé.
+        """
+        resultats = []
+        with self.db.transaction(self.conn):
+            for operation in operations:
+                if operation[0] == "insert":
+                    resultats.append(self._inserer(operation[1]))
+                else:
+                    resultats.append(self._mettre_a_jour(operation[1], operation[2]))
+        for operation, id_paiement, valeurs in resultats:
+            if id_paiement is not None and valeurs:
+                self._notifier(operation, id_paiement, valeurs)
+        return resultats
+
+    def _inserer(self, paiement):
+        valeurs = [paiement.get(col, "") for col in COLONNES]
+        valeurs[COLONNES.index('montant')] = montant_fcfa(valeurs[COLONNES.index('montant')])
+        ecrites = dict(zip(COLONNES, valeurs))
+        ecrites['periode'] = periode_paiement(ecrites['mois'], ecrites['date_paiement'])
+        cursor = self.conn.execute(
+            f"INSERT INTO paiements ({', '.join(ecrites)}) VALUES ({', '.join('?' * len(ecrites))})",
+            list(ecrites.values())
+        )
+        return "insert", str(cursor.lastrowid), ecrites
+
+    def _mettre_a_jour(self, id_paiement, nouvelles_valeurs):
+        colonnes = [col for col in COLONNES if col in nouvelles_valeurs]
+        valeurs = {col: nouvelles_valeurs[col] for col in colonnes}
+        if 'montant' in valeurs:
+            valeurs['montant'] = montant_fcfa(valeurs['montant'])
+        if not colonnes:
+            existe = self.conn.execute("SELECT 1 FROM paiements WHERE id = ?", (id_paiement,)).fetchone()
+            return "update", str(id_paiement) if existe else None, valeurs
+        if 'mois' in valeurs or 'date_paiement' in valeurs:
+            # Période recalculée avec les nouvelles valeurs (ou les anciennes si inchangées)
+            actuel = self.conn.execute(
+                "SELECT mois, date_paiement FROM paiements WHERE id = ?", (id_paiement,)
+            ).fetchone()
+            if actuel is not None:
+                valeurs['periode'] = periode_paiement(
+                    valeurs.get('mois', actuel['mois']), valeurs.get('date_paiement', actuel['date_paiement'])
+                )
+        assignations = ", ".join(f"{col} = ?" for col in valeurs)
+        cursor = self.conn.execute(
+            f"UPDATE paiements SET {assignations} WHERE id = ?",
+            list(valeurs.values()) + [id_paiement]
+        )
+        return "update", str(id_paiement) if cursor.rowcount == 1 else None, valeurs
+
+    def migrer_csv(self, chemin):
+        """Importe un ancien fichier CSV de paiements puis le renomme en .migre
+
+        Les IDs existants sont conservés. L'import se fait en une seule transaction :
+        en cas d'erreur rien n'est écrit et le fichier reste en place.
+        """
+        if not os.path.exists(chemin):
+            return 0
+        with open(chemin, mode='r', newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        importes = 0
+        with self.db.transaction(self.conn):
+            for row in rows:
+                valeurs = [(row.get(col) or "").strip() for col in COLONNES]
+                try:
+                    valeurs[COLONNES.index('montant')] = montant_fcfa(valeurs[COLONNES.index('montant')])
+                except ValueError:
+                    logger.warning(f"Paiement ignoré (montant invalide) : {row}")
+                    continue
+                valeurs.append(periode_paiement(row.get('mois'), (row.get('date_paiement') or "").strip()))
+                id_paiement = (row.get('id') or "").strip()
+                if id_paiement.isdigit():
+                    cursor = self.conn.execute(
+                        f"INSERT OR IGNORE INTO paiements (id, {', '.join(COLONNES)}, periode) "
+                        f"VALUES (?, {', '.join('?' * len(COLONNES))}, ?)",
+                        [int(id_paiement)] + valeurs
+                    )
+                else:
+                    cursor = self.conn.execute(
+                        f"INSERT INTO paiements ({', '.join(COLONNES)}, periode) VALUES ({', '.join('?' * (len(COLONNES) + 1))})",
+                        valeurs
+                    )
+                # INSERT OR IGNORE : un ID déjà présent n'insère rien (rowcount 0)
+                importes += cursor.rowcount
+        os.replace(chemin, chemin + ".migre")
+        logger.info(f"{importes} paiements migrés depuis {chemin}")
+        return importes
@@ -0,0 +1,150 @@
+import numpy as np
+from datetime import date
+from models.paiement import CLASSES, STATUTS_CODES, METHODES_CODES
+from utils.roster import PERIODE_BASE, libelle_periode
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+CODE_PAYE = STATUTS_CODES.code("payé")
+
+def code_periode(p):
+    # Colonne mois : période décalée (1 = janvier 2000), 0 si le mois saisi est illisible
+    return p.periode - PERIODE_BASE + 1 if p.periode is not None and p.periode >= PERIODE_BASE else 0
+
+def libelle_code_periode(code):
+    return libelle_periode(code - 1 + PERIODE_BASE) if code else "Mois illisible"
+
+class AnalyticsEngine:
+    """Registre des paiements en colonnes NumPy pour les tableaux de bord
+
+    Les regroupements (somme/nombre par classe, statut, méthode, mois concerné en
+    période entière ou mois calendaire) se font avec np.bincount sur les codes entiers, sans boucle Python.
+    Les colonnes grandissent par doublement : ajouter() est en O(1) amorti.
+    """
+
+    COLONNES = {
+        "montant": np.int64,
+        "classe": np.int32,
+        "statut": np.int8,
+        "methode": np.int8,
+        "mois": np.int32,
+        "date": np.int32,
+    }
+
+    def __init__(self, paiements=()):
+        self.charger(paiements)
+
+    def charger(self, paiements):
+        paiements = list(paiements)
+        self.taille = len(paiements)
+        capacite = max(16, self.taille)
+        attributs = {
+            "montant": lambda p: p.montant,
+            "classe": lambda p: p.classe_code,
+            "statut": lambda p: p.statut_code,
+            "methode": lambda p: p.methode_code,
+            "mois": code_periode,
+            "date": lambda p: p.date_ordinal,
+        }
+        self.colonnes = {}
+        for nom, dtype in self.COLONNES.items():
+            colonne = np.zeros(capacite, dtype=dtype)
+            colonne[:self.taille] = np.fromiter(map(attributs[nom], paiements), dtype=dtype, count=self.taille)
+            self.colonnes[nom] = colonne
+        self.lignes = {p.id: i for i, p in enumerate(paiements)}
+
+    def _ecrire(self, i, p):
+        c = self.colonnes
+        c["montant"][i] = p.montant
+        c["classe"][i] = p.classe_code
+        c["statut"][i] = p.statut_code
+        c["methode"][i] = p.methode_code
+        c["mois"][i] = code_periode(p)
+        c["date"][i] = p.date_ordinal
+
+    def ajouter(self, p):
+        if self.taille == len(self.colonnes["montant"]):
+            for nom, colonne in self.colonnes.items():
+                self.colonnes[nom] = np.concatenate([colonne, np.zeros_like(colonne)])
+        self._ecrire(self.taille, p)
+        self.lignes[p.id] = self.taille
+        self.taille += 1
+
+    def modifier(self, p):
+        i = self.lignes.get(p.id)
+        if i is None:
+            self.ajouter(p)
+        else:
+            self._ecrire(i, p)
+
+    def _colonne(self, nom):
+        return self.colonnes[nom][:self.taille]
+
+    def regrouper(self, dimension):
+        """Retourne (nombre, montant, montant_paye) indexés par code de la dimension"""
+        codes = self._colonne(dimension)
+        montants = self._colonne("montant")
+        paye = self._colonne("statut") == CODE_PAYE
+        taille = int(codes.max()) + 1 if self.taille else 0
+        nombre = np.bincount(codes, minlength=taille)
+        montant = np.bincount(codes, weights=montants, minlength=taille)
+        montant_paye = np.bincount(codes, weights=np.where(paye, montants, 0), minlength=taille)
+        return nombre, montant, montant_paye
+
+    @staticmethod
+    def _libelles(dimension):
+        return {
+            "classe": CLASSES.valeur,
+            "statut": STATUTS_CODES.valeur,
+            "methode": METHODES_CODES.valeur,
+            "mois": libelle_code_periode,
+        }[dimension]
+
+    def par(self, dimension):
+        """{libellé: {"nombre", "montant", "montant_paye", "taux"}} pour classe/statut/methode/mois"""
+        nombre, montant, montant_paye = self.regrouper(dimension)
+        libelles = self._libelles(dimension)
+        taux = np.divide(montant_paye, montant, out=np.zeros(len(montant)), where=montant > 0)
+        return {
+            libelles(code): {
+                "nombre": int(nombre[code]),
+                "montant": int(montant[code]),
+                "montant_paye": int(montant_paye[code]),
+                "taux": float(taux[code]),
+            }
+            for code in np.flatnonzero(nombre)
+        }
+
+    def top(self, dimension, n=5):
+        """Les n libellés au plus gros montant total, [(libellé, montant, taux de recouvrement)]"""
+        nombre, montant, montant_paye = self.regrouper(dimension)
+        libelles = self._libelles(dimension)
+        ordre = np.argsort(montant)[::-1]
+        ordre = ordre[nombre[ordre] > 0][:n]
+        return [
+            (libelles(code), int(montant[code]), float(montant_paye[code] / montant[code]) if montant[code] else 0.0)
+            for code in ordre
+        ]
+
+    def serie_mensuelle(self):
+        """Montants par mois calendaire de paiement : [((annee, mois), nombre, montant_paye)]"""
+        dates = self._colonne("date")
+        valides = dates > 0
+        if not valides.any():
+            return []
+        mois = (dates[valides] - EPOCH_ORDINAL).astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+        montants = self._colonne("montant")[valides]
+        paye = self._colonne("statut")[valides] == CODE_PAYE
+        periodes, inverse = np.unique(mois, return_inverse=True)
+        nombre = np.bincount(inverse)
+        montant_paye = np.bincount(inverse, weights=np.where(paye, montants, 0))
+        return [
+            ((1970 + int(p) // 12, int(p) % 12 + 1), int(n), int(m))
+            for p, n, m in zip(periodes, nombre, montant_paye)
+        ]
+
+    def taux_recouvrement(self):
+        montants = self._colonne("montant")
+        total = int(montants.sum())
+        if not total:
+            return 0.0
+        return float(montants[self._colonne("statut") == CODE_PAYE].sum() / total)
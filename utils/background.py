@@ -0,0 +1,42 @@
+import logging
+import threading
+from PyQt5.QtCore import QObject, pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+class BackgroundTask(QObject):
+    """Exécute fonction(avancer, annule) dans un thread, résultats signalés à l'interface
+
+    avancer(fraction) émet `avancement` (0 à 1) ; annule() vaut True après annuler().
+    Le résultat est émis avec `termine`, une exception avec `echec`. Pour les traitements
+    en lecture seule (exports, rendus) : les écritures passent par PersistenceWorker.
+    """
+
+    avancement = pyqtSignal(float)
+    termine = pyqtSignal(object)
+    echec = pyqtSignal(str)
+
+    def __init__(self, fonction, parent=None):
+        super().__init__(parent)
+        self.fonction = fonction
+        self._annulation = threading.Event()
+        self.thread = threading.Thread(target=self._executer, daemon=True)
+
+    def demarrer(self):
+        self.thread.start()
+        return self
+
+    def annuler(self):
+        self._annulation.set()
+
+    def annule(self):
+        return self._annulation.is_set()
+
+    def _executer(self):
+        try:
+            resultat = self.fonction(self.avancement.emit, self.annule)
+        except Exception as e:
+            logger.error(f"Échec d'une tâche en arrière-plan : {e}")
+            self.echec.emit(str(e))
+            return
+        self.termine.emit(resultat)
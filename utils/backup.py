@@ -0,0 +1,198 @@
+import glob
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from utils.config import DATABASE, BACKUP
+from models.database import enregistrer_fonctions
+
+logger = logging.getLogger(__name__)
+
+FORMAT_HORODATAGE = "%Y%m%d_%H%M%S_%f"
+
+class BackupManager:
+    """Sauvegardes de la base : instantanés SQLite + journal des modifications
+
+    Chaque instantané (API de sauvegarde en ligne de SQLite) ouvre un nouveau segment
+    de journal JSON Lines où chaque écriture validée est ajoutée. Une restauration à
+    un instant T repart du dernier instantané antérieur à T et rejoue son journal
+    jusqu'à T.
+    """
+
+    def __init__(self, db, backup_dir=None):
+        self.db = db
+        self.backup_dir = backup_dir or DATABASE['backup_dir']
+        self.intervalle = timedelta(seconds=BACKUP['intervalle_snapshot'])
+        self.retention = BACKUP['retention']
+        self._lock = threading.Lock()
+        self._journal = None
+        os.makedirs(self.backup_dir, exist_ok=True)
+
+    def _chemin(self, prefixe, horodatage, extension):
+        return os.path.join(self.backup_dir, f"{prefixe}_{horodatage}.{extension}")
+
+    def lister_snapshots(self):
+        """Retourne [(datetime, chemin)] triés du plus ancien au plus récent"""
+        snapshots = []
+        for chemin in glob.glob(os.path.join(self.backup_dir, "snapshot_*.db")):
+            horodatage = os.path.basename(chemin)[len("snapshot_"):-len(".db")]
+            try:
+                snapshots.append((datetime.strptime(horodatage, FORMAT_HORODATAGE), chemin))
+            except ValueError:
+                continue
+        return sorted(snapshots)
+
+    def verifier_planification(self):
+        """Prend un instantané si le dernier est plus vieux que l'intervalle configuré"""
+        snapshots = self.lister_snapshots()
+        if not snapshots or datetime.now() - snapshots[-1][0] >= self.intervalle:
+            return self.snapshot()
+        if self._journal is None:
+            self._ouvrir_journal(snapshots[-1][0].strftime(FORMAT_HORODATAGE))
+        return None
+
+    def snapshot(self):
+        maintenant = datetime.now()
+        horodatage = maintenant.strftime(FORMAT_HORODATAGE)
+        chemin = self._chemin("snapshot", horodatage, "db")
+        with self._lock:
+            source = sqlite3.connect(self.db.db_path, timeout=DATABASE['timeout'])
+            destination = sqlite3.connect(chemin)
+            try:
+                source.backup(destination)
+            finally:
+                destination.close()
+                source.close()
+            self._ouvrir_journal(horodatage)
+        logger.info(f"Instantané de la base créé : {chemin}")
+        self.compacter()
+        return chemin
+
+    def _ouvrir_journal(self, horodatage):
+        if self._journal:
+            self._journal.close()
+        self._journal = open(self._chemin("journal", horodatage, "jsonl"), "a", encoding="utf-8")
+
+    def journaliser(self, operation, id_paiement, valeurs):
+        # Observateur du dépôt : une ligne par écriture validée
+        entree = {
+            "ts": datetime.now().isoformat(),
+            "op": operation,
+            "id": int(id_paiement),
+            "valeurs": valeurs
+        }
+        with self._lock:
+            if self._journal is None:
+                return
+            self._journal.write(json.dumps(entree, ensure_ascii=False) + "\n")
+            self._journal.flush()
+            if BACKUP['fsync']:
+                os.fsync(self._journal.fileno())
+
+    def compacter(self):
+        """Supprime les instantanés (et leurs journaux) au-delà de la rétention"""
+        snapshots = self.lister_snapshots()
+        for instant, chemin in snapshots[:-self.retention] if self.retention else []:
+            horodatage = instant.strftime(FORMAT_HORODATAGE)
+            for fichier in (chemin, self._chemin("journal", horodatage, "jsonl")):
+                if os.path.exists(fichier):
+                    os.remove(fichier)
+            logger.info(f"Instantané expiré supprimé : {chemin}")
+
+    def restaurer(self, instant, destination):
+        """Reconstruit l'état de la base à `instant` (datetime) dans le fichier `destination`"""
+        candidats = [(t, chemin) for t, chemin in self.lister_snapshots() if t <= instant]
+        if not candidats:
+            raise ValueError(f"Aucun instantané antérieur au {instant:%d/%m/%Y %H:%M}")
+        t_snapshot, chemin = candidats[-1]
+        memoire = sqlite3.connect(":memory:")
+        # Le rejeu écrit dans les index de recherche (collation PLI) et peut recalculer des périodes
+        enregistrer_fonctions(memoire)
+        source = sqlite3.connect(chemin)
+        try:
+            source.backup(memoire)
+        finally:
+            source.close()
+
+        rejouees = 0
+        sans_periode = set()
+        colonnes = {row[1] for row in memoire.execute("PRAGMA table_info(paiements)")}
+        journal = self._chemin("journal", t_snapshot.strftime(FORMAT_HORODATAGE), "jsonl")
+        if os.path.exists(journal):
+            with open(journal, encoding="utf-8") as f:
+                for ligne in f:
+                    try:
+                        entree = json.loads(ligne)
+                    except json.JSONDecodeError:
+                        # Dernière ligne tronquée par un arrêt brutal
+                        break
+                    if datetime.fromisoformat(entree["ts"]) > instant:
+                        break
+                    self._rejouer(memoire, entree, colonnes)
+                    if "periode" not in entree["valeurs"]:
+                        sans_periode.add(entree["id"])
+                    rejouees += 1
+        self._recalculer_periodes(memoire, sans_periode)
+        memoire.commit()
+
+        cible = sqlite3.connect(destination, timeout=DATABASE['timeout'])
+        try:
+            memoire.backup(cible)
+        finally:
+            cible.close()
+            memoire.close()
+        logger.info(f"Base restaurée au {instant.isoformat()} dans {destination} ({rejouees} modifications rejouées)")
+        return rejouees
+
+    @staticmethod
+    def _rejouer(conn, entree, colonnes_table):
+        # Instantané antérieur à une colonne journalisée (periode) : colonne ignorée
+        valeurs = entree["valeurs"]
+        colonnes = [c for c in valeurs if c in colonnes_table]
+        if not colonnes:
+            return
+        if entree["op"] == "insert":
+            # Id déjà dans l'instantané : mis à jour, pas remplacé. OR REPLACE supprimerait la
+            # ligne sans déclencher trg_*_delete et l'insertion la compterait une seconde fois
+            conn.execute(
+                f"INSERT INTO paiements (id, {', '.join(colonnes)}) "
+                f"VALUES (?, {', '.join('?' * len(colonnes))}) "
+                f"ON CONFLICT(id) DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in colonnes)}",
+                [entree["id"]] + [valeurs[c] for c in colonnes]
+            )
+        elif entree["op"] == "update":
+            conn.execute(
+                f"UPDATE paiements SET {', '.join(f'{c} = ?' for c in colonnes)} WHERE id = ?",
+                [valeurs[c] for c in colonnes] + [entree["id"]]
+            )
+
+    @staticmethod
+    def _recalculer_periodes(conn, ids):
+        # Journaux antérieurs à la colonne periode : période des paiements rejoués recalculée.
+        # Instantané antérieur à la colonne : complétée à la première ouverture (Database)
+        if "periode" not in {row[1] for row in conn.execute("PRAGMA table_info(paiements)")}:
+            return
+        # mois = mois : déclenche trg_eleves_update, qui déplace l'échéance vers la nouvelle période
+        conn.executemany(
+            "UPDATE paiements SET periode = periode_mois(mois, date_paiement), mois = mois WHERE id = ?",
+            [(id_paiement,) for id_paiement in ids]
+        )
+
+    def fermer(self):
+        with self._lock:
+            if self._journal:
+                self._journal.close()
+                self._journal = None
+
+if __name__ == "__main__":
+    # Restauration manuelle : python -m utils.backup "2025-07-14 22:00" restaure.db
+    import sys
+    from models.database import Database
+    if len(sys.argv) != 3:
+        print("Usage : python -m utils.backup \"AAAA-MM-JJ HH:MM\" fichier_destination.db")
+        sys.exit(1)
+    manager = BackupManager(Database())
+    n = manager.restaurer(datetime.fromisoformat(sys.argv[1]), sys.argv[2])
+    print(f"Base restaurée dans {sys.argv[2]} ({n} modifications rejouées)")
@@ -0,0 +1,182 @@
+import numpy as np
+
+BITS_BLOC = 16  # blocs de 65 536 lignes
+MASQUE_BLOC = (1 << BITS_BLOC) - 1
+OCTETS_BLOC = (1 << BITS_BLOC) // 8
+
+# Colonnes indexées : dimension -> valeur indexée du paiement (faible cardinalité)
+DIMENSIONS = {
+    "statut": lambda p: p.statut,
+    "methode": lambda p: p.methode_paiement,
+    "classe": lambda p: p.classe.upper(),
+    "mois": lambda p: p.periode,
+}
+
+class Bitmap:
+    """Ensemble de lignes en bitsets par blocs de 65 536 lignes
+
+    {numéro de bloc: entier dont le bit i est la ligne bloc * 65 536 + i}. Chaque bloc
+    présent est un bitset dense, sans compression : seuls les blocs vides sont absents.
+    Une valeur concentrée sur quelques blocs (une classe, un mois) ne coûte que ces blocs. ET, OU et comptage travaillent bloc par bloc sur des entiers
+    Python (opérations en C), sans boucle sur les lignes.
+    """
+
+    __slots__ = ("blocs",)
+
+    def __init__(self, blocs=None):
+        self.blocs = blocs or {}
+
+    @classmethod
+    def depuis_masque(cls, masque):
+        # Tableau booléen NumPy (ligne -> présente) -> Bitmap
+        octets = np.packbits(masque, bitorder="little").tobytes()
+        blocs = {}
+        for bloc, debut in enumerate(range(0, len(octets), OCTETS_BLOC)):
+            bits = int.from_bytes(octets[debut:debut + OCTETS_BLOC], "little")
+            if bits:
+                blocs[bloc] = bits
+        return cls(blocs)
+
+    def ajouter(self, ligne):
+        bloc = ligne >> BITS_BLOC
+        self.blocs[bloc] = self.blocs.get(bloc, 0) | (1 << (ligne & MASQUE_BLOC))
+
+    def retirer(self, ligne):
+        bloc = ligne >> BITS_BLOC
+        bits = self.blocs.get(bloc, 0) & ~(1 << (ligne & MASQUE_BLOC))
+        if bits:
+            self.blocs[bloc] = bits
+        else:
+            self.blocs.pop(bloc, None)
+
+    def __and__(self, autre):
+        petit, grand = sorted((self.blocs, autre.blocs), key=len)
+        blocs = {}
+        for bloc, bits in petit.items():
+            commun = bits & grand.get(bloc, 0)
+            if commun:
+                blocs[bloc] = commun
+        return Bitmap(blocs)
+
+    def __or__(self, autre):
+        blocs = dict(self.blocs)
+        for bloc, bits in autre.blocs.items():
+            blocs[bloc] = blocs.get(bloc, 0) | bits
+        return Bitmap(blocs)
+
+    def __len__(self):
+        return sum(bits.bit_count() for bits in self.blocs.values())
+
+    def __bool__(self):
+        return bool(self.blocs)
+
+    def __iter__(self):
+        # Lignes dans l'ordre croissant
+        for bloc in sorted(self.blocs):
+            base = bloc << BITS_BLOC
+            bits = self.blocs[bloc]
+            while bits:
+                bas = bits & -bits
+                yield base + bas.bit_length() - 1
+                bits ^= bas
+
+class BitmapIndex:
+    """Index bitmap sur statut, méthode, classe et mois (période) des paiements
+
+    Une ligne par paiement, un Bitmap par valeur de chaque dimension. Un critère est
+    une valeur ou une collection de valeurs (OU) ; les critères se combinent en ET :
+    compter(methode="Mobile Money", statut="partiel", classe=["TA", "TC"],
+    mois=range(debut, fin + 1)). Mis à jour à chaque ajout ou modification.
+    """
+
+    def __init__(self, paiements=()):
+        paiements = list(paiements)
+        self.paiements = paiements  # ligne -> paiement
+        self.lignes = {p.id: i for i, p in enumerate(paiements)}
+        colonnes = [list(map(valeur, paiements)) for valeur in DIMENSIONS.values()]
+        self.cles = list(zip(*colonnes)) if paiements else []  # ligne -> valeurs des dimensions
+        self.tous = Bitmap.depuis_masque(np.ones(len(paiements), dtype=bool))
+        # Construction en bloc : un masque NumPy par valeur au lieu d'un bit par paiement
+        self.bitmaps = {}
+        for dimension, colonne in zip(DIMENSIONS, colonnes):
+            valeurs = {valeur: code for code, valeur in enumerate(dict.fromkeys(colonne))}
+            codes = np.fromiter(map(valeurs.__getitem__, colonne), dtype=np.int32, count=len(colonne))
+            self.bitmaps[dimension] = {
+                valeur: Bitmap.depuis_masque(codes == code) for valeur, code in valeurs.items()
+            }
+
+    def ajouter(self, p):
+        if p.id in self.lignes:
+            self.remplacer(p, p)
+            return
+        ligne = len(self.paiements)
+        cle = tuple(valeur(p) for valeur in DIMENSIONS.values())
+        self.paiements.append(p)
+        self.cles.append(cle)
+        self.lignes[p.id] = ligne
+        self.tous.ajouter(ligne)
+        for dimension, valeur in zip(DIMENSIONS, cle):
+            self.bitmaps[dimension].setdefault(valeur, Bitmap()).ajouter(ligne)
+
+    def remplacer(self, ancien, nouveau):
+        ligne = self.lignes.get(ancien.id)
+        if ligne is None:
+            self.ajouter(nouveau)
+            return
+        cle = tuple(valeur(nouveau) for valeur in DIMENSIONS.values())
+        for dimension, avant, apres in zip(DIMENSIONS, self.cles[ligne], cle):
+            if avant == apres:
+                continue
+            bitmaps = self.bitmaps[dimension]
+            bitmaps[avant].retirer(ligne)
+            if not bitmaps[avant]:
+                del bitmaps[avant]
+            bitmaps.setdefault(apres, Bitmap()).ajouter(ligne)
+        self.paiements[ligne] = nouveau
+        self.cles[ligne] = cle
+
+    def valeurs(self, dimension):
+        return list(self.bitmaps[dimension])
+
+    def _critere(self, dimension, critere):
+        bitmaps = self.bitmaps[dimension]
+        if not isinstance(critere, (list, tuple, set, frozenset, range)):
+            return bitmaps.get(critere, Bitmap())
+        resultat = Bitmap()
+        for valeur in critere:
+            if valeur in bitmaps:
+                resultat = resultat | bitmaps[valeur]
+        return resultat
+
+    def selection(self, **criteres):
+        """Bitmap des lignes satisfaisant tous les critères (toutes les lignes sans critère)"""
+        inconnues = set(criteres) - set(DIMENSIONS)
+        if inconnues:
+            raise ValueError(f"Dimension inconnue : {', '.join(sorted(inconnues))}")
+        # Le plus sélectif d'abord : les ET suivants ne portent que sur ses blocs
+        operandes = sorted((self._critere(d, c) for d, c in criteres.items()), key=lambda b: len(b.blocs))
+        if not operandes:
+            return self.tous
+        resultat = operandes[0]
+        for bitmap in operandes[1:]:
+            if not resultat:
+                break
+            resultat = resultat & bitmap
+        return resultat
+
+    def compter(self, **criteres):
+        return len(self.selection(**criteres))
+
+    def ventiler(self, dimension, **criteres):
+        """{valeur de `dimension`: nombre de paiements} parmi ceux satisfaisant les critères"""
+        selection = self.selection(**criteres)
+        ventilation = {}
+        for valeur, bitmap in self.bitmaps[dimension].items():
+            nombre = len(selection & bitmap)
+            if nombre:
+                ventilation[valeur] = nombre
+        return ventilation
+
+    def filtrer(self, **criteres):
+        """Paiements satisfaisant les critères, dans l'ordre du registre"""
+        return [self.paiements[ligne] for ligne in self.selection(**criteres)]
@@ -1,23 +1,78 @@
+import sys
+import time
 from collections import OrderedDict
-from datetime import datetime, timedelta
 from utils.config import CACHE
 
+def taille_octets(valeur):
+    # Estimation : l'objet + ses éléments directs pour les conteneurs courants
+    taille = sys.getsizeof(valeur)
+    if isinstance(valeur, dict):
+        taille += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in valeur.items())
+    elif isinstance(valeur, (list, tuple, set, frozenset)):
+        taille += sum(sys.getsizeof(v) for v in valeur)
+    elif hasattr(valeur, "sizeInBytes"):
+        # QImage : pixels hors de l'objet Python
+        taille += valeur.sizeInBytes()
+    return taille
+
 class Cache:
-    def __init__(self):
+    """Cache LRU avec expiration (horloge monotone) et invalidation par génération
+
+    invalider() incrémente la génération et vide le cache : aucune entrée calculée
+    avant une écriture ne peut être resservie. Il est abonné aux écritures du dépôt de
+    paiements, ce qui évite d'afficher des pages périmées après un ajout ou une modification.
+    """
+
+    def __init__(self, timeout=None, max_size=None, max_bytes=None):
         self.cache = OrderedDict()
-        self.timeout = CACHE['timeout']
-        self.max_size = CACHE['max_size']
-    
-    def get(self, key):
-        if key in self.cache:
-            value, timestamp = self.cache[key]
-            if datetime.now() - timestamp < timedelta(seconds=self.timeout):
+        self.timeout = CACHE['timeout'] if timeout is None else timeout
+        self.max_size = CACHE['max_size'] if max_size is None else max_size
+        self.max_bytes = CACHE['max_bytes'] if max_bytes is None else max_bytes
+        self.generation = 0
+        self.octets = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        entree = self.cache.get(key)
+        if entree is not None:
+            value, expiration, generation, _ = entree
+            if generation == self.generation and time.monotonic() < expiration:
+                self.cache.move_to_end(key)
+                self.hits += 1
                 return value
-            else:
-                del self.cache[key]
-        return None
-    
+            self._supprimer(key)
+        self.misses += 1
+        return default
+
     def set(self, key, value):
-        if len(self.cache) >= self.max_size:
-            self.cache.popitem(last=False)
-        self.cache[key] = (value, datetime.now())
\ No newline at end of file
+        if key in self.cache:
+            self._supprimer(key)
+        taille = taille_octets(value)
+        self.cache[key] = (value, time.monotonic() + self.timeout, self.generation, taille)
+        self.octets += taille
+        while len(self.cache) > self.max_size or (self.octets > self.max_bytes and len(self.cache) > 1):
+            ancienne_cle = next(iter(self.cache))
+            self._supprimer(ancienne_cle)
+            self.evictions += 1
+
+    def _supprimer(self, key):
+        _, _, _, taille = self.cache.pop(key)
+        self.octets -= taille
+
+    def invalider(self, *_):
+        # Signature compatible avec PaiementRepository.abonner(operation, id, valeurs)
+        self.generation += 1
+        self.cache.clear()
+        self.octets = 0
+
+    def stats(self):
+        return {
+            "entrees": len(self.cache),
+            "octets": self.octets,
+            "generation": self.generation,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -1,21 +1,69 @@
-import matplotlib.pyplot as plt
-from io import BytesIO
-from PyQt5.QtGui import QImage, QPixmap
-import numpy as np
+import hashlib
+import threading
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from PyQt5.QtGui import QImage
+from utils.background import BackgroundTask
+from utils.cache import Cache
+from utils.config import GRAPHIQUES
 
 class ChartGenerator:
+    """Graphiques matplotlib rendus en QImage, avec cache par empreinte des données
+
+    Rendu par l'API objet (Figure + canvas Agg), sans l'état global de pyplot : il peut
+    s'exécuter dans un thread. Les pixels RGBA du canvas sont copiés directement dans le
+    QImage, sans passer par un PNG. Les mêmes agrégats redonnent l'image en cache : une
+    écriture change les données, donc la clé, sans invalidation explicite.
+    """
+
+    def __init__(self, taille_cache=None):
+        taille_cache = GRAPHIQUES['cache'] if taille_cache is None else taille_cache
+        # Pas d'expiration : la clé change avec les données
+        self.cache = Cache(timeout=float("inf"), max_size=taille_cache)
+        self._verrou = threading.Lock()
+
+    @staticmethod
+    def cle(*parametres):
+        return hashlib.sha1(repr(parametres).encode("utf-8")).hexdigest()
+
+    def generate_pie_chart(self, data, labels, title, taille=(6, 6)):
+        cle = self.cle("camembert", tuple(data), tuple(labels), title, taille, GRAPHIQUES['dpi'])
+        with self._verrou:
+            image = self.cache.get(cle)
+        if image is None:
+            image = self._camembert(data, labels, title, taille)
+            with self._verrou:
+                self.cache.set(cle, image)
+        return image
+
+    def pie_chart_async(self, data, labels, title, rappel, parent=None, taille=(6, 6), en_echec=None):
+        """rappel(QImage) dans le thread de l'interface : immédiat si l'image est en cache,
+        sinon après un rendu en arrière-plan ; en_echec(message) si le rendu échoue"""
+        cle = self.cle("camembert", tuple(data), tuple(labels), title, taille, GRAPHIQUES['dpi'])
+        with self._verrou:
+            image = self.cache.get(cle)
+        if image is not None:
+            rappel(image)
+            return None
+        tache = BackgroundTask(lambda avancer, annule: self.generate_pie_chart(data, labels, title, taille), parent)
+        tache.termine.connect(rappel)
+        tache.termine.connect(tache.deleteLater)
+        if en_echec is not None:
+            tache.echec.connect(en_echec)
+        tache.echec.connect(tache.deleteLater)
+        return tache.demarrer()
+
     @staticmethod
-    def generate_pie_chart(data, labels, title):
-        plt.figure(figsize=(6, 6))
-        plt.pie(data, labels=labels, autopct='%1.1f%%')
-        plt.title(title)
-        
-        buffer = BytesIO()
-        plt.savefig(buffer, format='png')
-        plt.close()
-        
-        buffer.seek(0)
-        image = QImage()
-        image.loadFromData(buffer.getvalue())
-        
-        return image
\ No newline at end of file
+    def _camembert(data, labels, title, taille):
+        figure = Figure(figsize=taille, dpi=GRAPHIQUES['dpi'])
+        canvas = FigureCanvasAgg(figure)
+        axes = figure.add_subplot()
+        # Parts nulles omises : matplotlib n'accepte pas un total nul
+        parts = [(valeur, libelle) for valeur, libelle in zip(data, labels) if valeur]
+        if parts:
+            axes.pie([v for v, _ in parts], labels=[l for _, l in parts], autopct='%1.1f%%')
+        axes.set_title(title)
+        canvas.draw()
+        largeur, hauteur = canvas.get_width_height()
+        # copy() : le QImage possède ses pixels, le canvas peut être libéré
+        return QImage(canvas.buffer_rgba(), largeur, hauteur, 4 * largeur, QImage.Format_RGBA8888).copy()
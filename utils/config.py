@@ -4,12 +4,59 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 DATABASE = {
     'name': os.path.join(BASE_DIR, 'database.db'),
-    'backup_dir': os.path.join(BASE_DIR, 'backups')
+    'backup_dir': os.path.join(BASE_DIR, 'backups'),
+    'timeout': 10  # secondes d'attente sur un verrou d'écriture
+}
+
+BACKUP = {
+    'intervalle_snapshot': 6 * 3600,  # secondes entre deux instantanés complets
+    'retention': 14,  # nombre d'instantanés (et de journaux) conservés
+    'fsync': False  # forcer l'écriture disque de chaque ligne du journal
+}
+
+PERSISTANCE = {
+    'taille_lot': 200  # écritures validées au plus par transaction du thread d'écriture
+}
+
+IMPORT = {
+    'taille_lot': 1000  # lignes de relevé insérées par transaction
+}
+
+EXPORT = {
+    'taille_lot': 2000  # lignes lues et écrites à la fois
+}
+
+RECUS = {
+    'processus': None,  # processus de rendu des reçus en lot (None : un par cœur)
+    'taille_lot': 100,  # reçus rendus par tâche
+    'entete': "ÉCOLE SECONDAIRE",  # en-tête de tous les reçus
+    'largeur_ticket': 32,  # caractères par ligne de l'imprimante thermique (32 en 58 mm, 48 en 80 mm)
+    'imprimante': None  # périphérique ESC/POS (ex. /dev/usb/lp0), None : pas d'impression de ticket
 }
 
 CACHE = {
     'timeout': 300,  # 5 minutes
-    'max_size': 100  # maximum items in cache
+    'max_size': 100,  # maximum items in cache
+    'max_bytes': 20 * 1024 * 1024  # taille estimée maximale du cache
+}
+
+GRAPHIQUES = {
+    'cache': 32,  # images de graphiques conservées (clé : empreinte des données)
+    'dpi': 100
+}
+
+RETARDS = {
+    'delai_jours': 30,  # jours sans paiement au-delà desquels un élève est en retard
+    'intervalle': 15 * 60  # secondes entre deux vérifications
+}
+
+RECHERCHE = {
+    'seuil': 0.5,  # part minimale des trigrammes retrouvés par mot (tolérance aux fautes)
+    'limite': 100  # nombre maximal de résultats classés
+}
+
+PAGINATION = {
+    'page_size': 50  # lignes par page dans le tableau de résultats
 }
 
 LOGGING = {
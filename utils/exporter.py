@@ -0,0 +1,123 @@
+import csv
+import gzip
+import json
+import logging
+import os
+from models.paiement import CHAMPS
+from utils.config import EXPORT
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ["csv", "xlsx", "jsonl", "parquet"]
+
+def valeurs_typees(p):
+    # id et montant en entiers, date en objet date ; le reste en texte
+    return [p.id, p.nom, p.prenom, p.classe, p.montant, p.mois, p.methode_paiement,
+            p.statut, p.date, p.heure_paiement, p.notes]
+
+class StreamingExporter:
+    """Export des paiements en flux : CSV, XLSX, JSON Lines, Parquet
+
+    Le dépôt est lu par lots (PaiementRepository.iterer, pagination par clé) et chaque
+    lot est écrit aussitôt : la mémoire reste constante quelle que soit la taille du
+    registre. Filtres : critères de recherche du dépôt (classe, mois, statut...) et
+    période (date_debut, date_fin). Compression : gzip pour CSV/JSONL, zstd pour
+    Parquet (XLSX est déjà compressé).
+    """
+
+    def __init__(self, repository, taille_lot=None):
+        self.repository = repository
+        self.taille_lot = EXPORT['taille_lot'] if taille_lot is None else taille_lot
+
+    def exporter(self, chemin, format="csv", compression=False, progression=None, annule=None, **criteres):
+        """Écrit les paiements filtrés dans `chemin` et retourne le nombre de lignes exportées
+
+        progression(fraction) est appelée après chaque lot ; si annule() devient vrai,
+        l'export s'arrête et le fichier partiel est supprimé (retourne None).
+        """
+        if format not in FORMATS:
+            raise ValueError(f"Format d'export inconnu : {format}")
+        total = self.repository.compter(**criteres) or 1
+        tri = "date" if "date_debut" in criteres or "date_fin" in criteres else "id"
+        lots = self.repository.iterer(self.taille_lot, tri, False, **criteres)
+        ecriture = getattr(self, f"_ecrire_{format}")(chemin, lots, compression)
+        exportes, interrompu = 0, False
+        try:
+            for n in ecriture:
+                exportes += n
+                if progression:
+                    progression(min(exportes / total, 1.0))
+                if annule and annule():
+                    interrompu = True
+                    break
+        except Exception:
+            ecriture.close()
+            self._supprimer(chemin)
+            raise
+        # Ferme le fichier même si l'écrivain a été interrompu entre deux lots
+        ecriture.close()
+        if interrompu:
+            self._supprimer(chemin)
+            logger.info(f"Export vers {chemin} annulé")
+            return None
+        logger.info(f"{exportes} paiements exportés vers {chemin} ({format})")
+        return exportes
+
+    @staticmethod
+    def _supprimer(chemin):
+        if os.path.exists(chemin):
+            os.remove(chemin)
+
+    # Chaque écrivain est un générateur : il écrit un lot puis rend la main (nombre de lignes)
+    def _ouvrir_texte(self, chemin, compression):
+        if compression:
+            return gzip.open(chemin, "wt", newline="", encoding="utf-8")
+        return open(chemin, "w", newline="", encoding="utf-8")
+
+    def _ecrire_csv(self, chemin, lots, compression):
+        with self._ouvrir_texte(chemin, compression) as f:
+            writer = csv.writer(f)
+            writer.writerow(CHAMPS)
+            for lot in lots:
+                writer.writerows(p.values() for p in lot)
+                yield len(lot)
+
+    def _ecrire_jsonl(self, chemin, lots, compression):
+        with self._ouvrir_texte(chemin, compression) as f:
+            for lot in lots:
+                f.writelines(
+                    json.dumps({**p.to_dict(), "id": p.id, "montant": p.montant}, ensure_ascii=False) + "\n"
+                    for p in lot
+                )
+                yield len(lot)
+
+    def _ecrire_xlsx(self, chemin, lots, compression):
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            raise ValueError("L'export Excel nécessite le paquet openpyxl (pip install openpyxl)")
+        # Mode écriture seule : les lignes partent dans un fichier temporaire, pas en mémoire
+        classeur = Workbook(write_only=True)
+        feuille = classeur.create_sheet("Paiements")
+        feuille.append(CHAMPS)
+        for lot in lots:
+            for p in lot:
+                feuille.append(valeurs_typees(p))
+            yield len(lot)
+        classeur.save(chemin)
+
+    def _ecrire_parquet(self, chemin, lots, compression):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("L'export Parquet nécessite le paquet pyarrow (pip install pyarrow)")
+        schema = pa.schema([
+            (champ, pa.int64() if champ in ("id", "montant") else pa.date32() if champ == "date_paiement" else pa.string())
+            for champ in CHAMPS
+        ])
+        with pq.ParquetWriter(chemin, schema, compression="zstd" if compression else "snappy") as writer:
+            for lot in lots:
+                colonnes = list(zip(*(valeurs_typees(p) for p in lot)))
+                writer.write_table(pa.table([pa.array(c, type=t) for c, t in zip(colonnes, schema.types)], schema=schema))
+                yield len(lot)
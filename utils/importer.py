@@ -0,0 +1,222 @@
+import csv
+import logging
+import os
+from datetime import date, datetime, time
+from models.database import DATE_TRI
+from models.paiement import STATUTS, METHODES_PAIEMENT, montant_fcfa, date_ordinal
+from models.repository import date_tri
+from utils.config import IMPORT
+from utils.search_index import replier
+
+logger = logging.getLogger(__name__)
+
+# En-têtes reconnus (repliés : minuscules, sans accents) -> champ du paiement
+ALIAS_COLONNES = {
+    "nom": "nom", "nom eleve": "nom", "last name": "nom",
+    "prenom": "prenom", "prenom eleve": "prenom", "first name": "prenom",
+    "classe": "classe", "niveau": "classe",
+    "montant": "montant", "montant fcfa": "montant", "amount": "montant", "credit": "montant",
+    "mois": "mois", "mois concerne": "mois", "periode": "mois",
+    "methode": "methode_paiement", "methode paiement": "methode_paiement",
+    "methode de paiement": "methode_paiement", "mode de paiement": "methode_paiement",
+    "statut": "statut", "etat": "statut",
+    "date": "date_paiement", "date paiement": "date_paiement", "date operation": "date_paiement",
+    "heure": "heure_paiement", "heure paiement": "heure_paiement",
+    "notes": "notes", "libelle": "notes", "reference": "notes", "description": "notes",
+}
+OBLIGATOIRES = ["nom", "prenom", "classe", "montant", "mois"]
+_STATUTS = {replier(s): s for s in STATUTS}
+_METHODES = {replier(m): m for m in METHODES_PAIEMENT}
+
+def cle_doublon(nom, prenom, classe, montant, mois, date_paiement):
+    # Même élève, même montant, même mois et même jour : considéré comme déjà saisi
+    return (replier(nom), replier(prenom), replier(classe), int(montant), replier(mois), date_paiement)
+
+def _texte_date(valeur):
+    if isinstance(valeur, datetime):
+        valeur = valeur.date()
+    if isinstance(valeur, date):
+        return valeur.strftime("%d/%m/%Y")
+    texte = str(valeur or "").strip().split(" ")[0]
+    if date_ordinal(texte):
+        return texte
+    try:
+        return date.fromisoformat(texte).strftime("%d/%m/%Y")
+    except ValueError:
+        return None
+
+def _texte_heure(valeur):
+    if isinstance(valeur, datetime):
+        valeur = valeur.time()
+    if isinstance(valeur, time):
+        return valeur.strftime("%H:%M:%S")
+    # "10:05:30" ou "14/07/2025 10:05:30" ; sans heure lisible : minuit
+    morceaux = [m for m in str(valeur or "").split() if ":" in m]
+    return morceaux[0] if morceaux else "00:00:00"
+
+class BulkImporter:
+    """Import en masse de relevés CSV/XLSX (banque, Mobile Money)
+
+    Le fichier est lu en flux, par lots de IMPORT['taille_lot'] lignes. Chaque ligne est
+    validée (champs obligatoires, montant, STATUTS, METHODES_PAIEMENT, date requise). Les doublons
+    sont écartés : déjà en base ou répétés dans le fichier. Chaque lot valide est inséré en
+    une transaction via PaiementRepository.appliquer. En simulation (dry-run), rien n'est
+    écrit mais le rapport est le même.
+    """
+
+    def __init__(self, repository, taille_lot=None):
+        self.repository = repository
+        self.taille_lot = IMPORT['taille_lot'] if taille_lot is None else taille_lot
+
+    def importer(self, chemin, simulation=False, methode_defaut=None, statut_defaut="payé",
+                 correspondance=None, progression=None, annule=None):
+        """Importe `chemin` et retourne le rapport
+
+        correspondance : {en-tête du fichier: champ} en complément de ALIAS_COLONNES.
+        progression(rapport, fraction) est appelée après chaque lot (fraction entre 0 et 1).
+        annule() -> True interrompt l'import entre deux lots (les lots écrits restent).
+        """
+        rapport = {"fichier": chemin, "simulation": simulation, "lus": 0, "importes": 0,
+                   "doublons": 0, "rejets": [], "annule": False}
+        # Clés du fichier seulement : le registre est interrogé lot par lot (_cles_en_base)
+        vus = set()
+        lot = []
+        for numero, ligne, fraction in self._lire(chemin, correspondance):
+            rapport["lus"] += 1
+            try:
+                paiement = self._valider(ligne, methode_defaut, statut_defaut)
+            except ValueError as e:
+                rapport["rejets"].append((numero, str(e)))
+                continue
+            cle = cle_doublon(*(paiement[c] for c in ("nom", "prenom", "classe", "montant", "mois", "date_paiement")))
+            if cle in vus:
+                rapport["doublons"] += 1
+                continue
+            vus.add(cle)
+            lot.append((cle, paiement))
+            if len(lot) >= self.taille_lot:
+                self._ecrire(lot, rapport)
+                lot = []
+                if progression:
+                    progression(rapport, fraction)
+                if annule and annule():
+                    rapport["annule"] = True
+                    break
+        if lot and not rapport["annule"]:
+            self._ecrire(lot, rapport)
+        if progression:
+            progression(rapport, 1.0)
+        logger.info(
+            f"Import {'simulé ' if simulation else ''}de {chemin} : {rapport['lus']} lignes lues, "
+            f"{rapport['importes']} importées, {rapport['doublons']} doublons, {len(rapport['rejets'])} rejets"
+        )
+        return rapport
+
+    def _cles_en_base(self, lot):
+        """Clés du lot déjà présentes dans le registre
+
+        Recherche sur idx_paiements_date, limitée aux jours du lot : seuls les paiements de ces
+        jours sont lus, puis comparés sur la clé complète (noms repliés, sans accents ni casse).
+        La liste IN est faite de constantes : l'index d'expression n'est pas utilisé en jointure.
+        """
+        jours = sorted({date_tri(paiement["date_paiement"]) for _, paiement in lot})
+        rows = self.repository.conn.execute(
+            "SELECT nom, prenom, classe, montant, mois, date_paiement FROM paiements "
+            f"WHERE {DATE_TRI} IN ({', '.join('?' * len(jours))})",
+            jours
+        )
+        return {cle_doublon(*row) for row in rows}
+
+    def _ecrire(self, lot, rapport):
+        connus = self._cles_en_base(lot)
+        nouveaux = [paiement for cle, paiement in lot if cle not in connus]
+        rapport["doublons"] += len(lot) - len(nouveaux)
+        if nouveaux and not rapport["simulation"]:
+            self.repository.appliquer([("insert", paiement) for paiement in nouveaux])
+        rapport["importes"] += len(nouveaux)
+
+    def _valider(self, ligne, methode_defaut, statut_defaut):
+        paiement = {champ: str(ligne.get(champ) or "").strip() for champ in OBLIGATOIRES + ["notes"]}
+        manquants = [champ for champ in OBLIGATOIRES if not paiement[champ]]
+        if manquants:
+            raise ValueError(f"champ(s) manquant(s) : {', '.join(manquants)}")
+        try:
+            montant = montant_fcfa(paiement["montant"])
+        except ValueError:
+            montant = 0
+        if montant <= 0:
+            raise ValueError(f"montant invalide : {paiement['montant']}")
+        paiement["montant"] = montant
+        paiement["nom"] = paiement["nom"].upper()
+        paiement["prenom"] = paiement["prenom"].capitalize()
+        paiement["classe"] = paiement["classe"].upper()
+
+        statut = str(ligne.get("statut") or "").strip() or statut_defaut
+        if replier(statut) not in _STATUTS:
+            raise ValueError(f"statut inconnu : {statut}")
+        paiement["statut"] = _STATUTS[replier(statut)]
+        methode = str(ligne.get("methode_paiement") or "").strip() or methode_defaut
+        if not methode or replier(methode) not in _METHODES:
+            raise ValueError(f"méthode de paiement inconnue : {methode or '(vide)'}")
+        paiement["methode_paiement"] = _METHODES[replier(methode)]
+
+        # Pas de date du jour par défaut : elle entre dans cle_doublon, et le même relevé
+        # réimporté un autre jour ne serait plus reconnu comme déjà saisi
+        date_paiement = ligne.get("date_paiement")
+        if date_paiement in (None, ""):
+            raise ValueError("date de paiement manquante")
+        paiement["date_paiement"] = _texte_date(date_paiement)
+        if paiement["date_paiement"] is None:
+            raise ValueError(f"date illisible : {date_paiement}")
+        paiement["heure_paiement"] = _texte_heure(ligne.get("heure_paiement") or date_paiement)
+        return paiement
+
+    # Lecture en flux : (numéro de ligne, {champ: valeur}, fraction du fichier lue)
+    def _lire(self, chemin, correspondance):
+        extension = os.path.splitext(chemin)[1].lower()
+        lignes = self._lire_xlsx(chemin) if extension in (".xlsx", ".xlsm") else self._lire_csv(chemin)
+        entetes = None
+        for numero, valeurs, fraction in lignes:
+            if entetes is None:
+                entetes = self._champs(valeurs, correspondance)
+                continue
+            if not any(v not in (None, "") for v in valeurs):
+                continue
+            yield numero, {champ: v for champ, v in zip(entetes, valeurs) if champ}, fraction
+
+    def _champs(self, entetes, correspondance):
+        correspondance = {replier(k): v for k, v in (correspondance or {}).items()}
+        champs = []
+        for entete in entetes:
+            cle = replier(str(entete or ""))
+            champs.append(correspondance.get(cle) or ALIAS_COLONNES.get(cle))
+        if not set(OBLIGATOIRES) <= set(champs):
+            manquants = sorted(set(OBLIGATOIRES) - set(champs))
+            raise ValueError(f"Colonnes introuvables dans le fichier : {', '.join(manquants)}")
+        return champs
+
+    def _lire_csv(self, chemin):
+        taille = os.path.getsize(chemin) or 1
+        with open(chemin, newline="", encoding="utf-8-sig") as f:
+            # Les relevés exportés en français utilisent souvent « ; »
+            try:
+                dialecte = csv.Sniffer().sniff(f.read(4096), delimiters=",;\t")
+            except csv.Error:
+                dialecte = csv.excel
+            f.seek(0)
+            for numero, valeurs in enumerate(csv.reader(f, dialecte), 1):
+                yield numero, valeurs, min(f.buffer.tell() / taille, 1.0)
+
+    def _lire_xlsx(self, chemin):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ValueError("L'import Excel nécessite le paquet openpyxl (pip install openpyxl)")
+        classeur = load_workbook(chemin, read_only=True, data_only=True)
+        try:
+            feuille = classeur.active
+            total = feuille.max_row or 1
+            for numero, valeurs in enumerate(feuille.iter_rows(values_only=True), 1):
+                yield numero, list(valeurs), min(numero / total, 1.0)
+        finally:
+            classeur.close()
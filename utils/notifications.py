@@ -1,4 +1,3 @@
-from datetime import datetime
 from PyQt5.QtWidgets import QSystemTrayIcon, QMenu
 from PyQt5.QtGui import QIcon
 
@@ -11,12 +10,15 @@ class NotificationManager:
     def notify(self, title, message):
         self.tray.showMessage(title, message, QSystemTrayIcon.Information)
     
-    def check_paiements_retard(self, paiements):
-        aujourd_hui = datetime.now()
-        for p in paiements:
-            date_paiement = datetime.strptime(p['date_paiement'], "%d/%m/%Y")
-            if (aujourd_hui - date_paiement).days > 30:
-                self.notify(
-                    "Paiement en retard",
-                    f"L'élève {p['prenom']} {p['nom']} est en retard de paiement"
-                )
\ No newline at end of file
+    def notifier_retards(self, nouveaux, total, apercu=5):
+        # Un seul message récapitulatif par passage, quel que soit le nombre de nouveaux retards
+        if not nouveaux:
+            return
+        noms = ", ".join(f"{prenom} {nom} ({classe})" for (nom, prenom, classe), _ in nouveaux[:apercu])
+        if len(nouveaux) > apercu:
+            noms += f" et {len(nouveaux) - apercu} autre(s)"
+        self.notify(
+            "Paiements en retard",
+            f"{len(nouveaux)} nouvel(s) élève(s) en retard ({total} au total) : {noms}.\n"
+            "Cliquez pour voir la liste."
+        )
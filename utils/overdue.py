@@ -0,0 +1,121 @@
+from bisect import bisect_left, insort
+from datetime import date
+from utils.config import RETARDS
+
+def cle_retard(p):
+    # Un élève : nom, prénom et classe (en majuscules)
+    return (p.nom, p.prenom, p.classe.upper())
+
+class OverdueIndex:
+    """Élèves en retard de paiement : dernier paiement plus ancien que RETARDS['delai_jours']
+
+    Les élèves sont gardés triés par date de leur dernier paiement. La date limite
+    (aujourd'hui - délai) ne fait qu'avancer : verifier() ne parcourt que la plage
+    entre la limite précédente et la nouvelle, donc seulement les nouveaux retards.
+    Un paiement plus récent retire l'élève des retards.
+    """
+
+    def __init__(self, paiements=(), delai=None):
+        self.delai = RETARDS['delai_jours'] if delai is None else delai
+        self.dates_eleve = {}  # élève -> dates (ordinaux) de ses paiements, triées
+        self.par_date = []  # (date du dernier paiement, élève), trié
+        self.limite = None  # date limite du dernier passage de verifier()
+        self.en_retard = {}  # élève -> date du dernier paiement
+        self._a_signaler = set()  # élèves passés en retard hors de la plage (paiement modifié)
+        # Construction en bloc : un seul tri au lieu d'une insertion par paiement
+        for p in paiements:
+            if p.date_ordinal:
+                self.dates_eleve.setdefault(cle_retard(p), []).append(p.date_ordinal)
+        for eleve, dates in self.dates_eleve.items():
+            dates.sort()
+            self.par_date.append((dates[-1], eleve))
+        self.par_date.sort()
+
+    def ajouter(self, p):
+        if p.date_ordinal:
+            self._deplacer(cle_retard(p), p.date_ordinal, None)
+
+    def retirer(self, p):
+        if p.date_ordinal:
+            self._deplacer(cle_retard(p), None, p.date_ordinal)
+
+    def remplacer(self, ancien, nouveau):
+        self.retirer(ancien)
+        self.ajouter(nouveau)
+
+    def _deplacer(self, eleve, ajout, retrait):
+        dates = self.dates_eleve.setdefault(eleve, [])
+        dernier = dates[-1] if dates else None
+        if ajout is not None:
+            insort(dates, ajout)
+        if retrait is not None:
+            i = bisect_left(dates, retrait)
+            if i < len(dates) and dates[i] == retrait:
+                del dates[i]
+        nouveau = dates[-1] if dates else None
+        if nouveau == dernier:
+            return
+        if dernier is not None:
+            del self.par_date[bisect_left(self.par_date, (dernier, eleve))]
+        if nouveau is None:
+            del self.dates_eleve[eleve]
+            self.en_retard.pop(eleve, None)
+            self._a_signaler.discard(eleve)
+            return
+        insort(self.par_date, (nouveau, eleve))
+        if self.limite is None:
+            return
+        if nouveau >= self.limite:
+            # Régularisé (ou pas encore en retard)
+            self.en_retard.pop(eleve, None)
+            self._a_signaler.discard(eleve)
+        elif eleve in self.en_retard:
+            self.en_retard[eleve] = nouveau
+        else:
+            self._a_signaler.add(eleve)
+
+    def reprendre(self, ancien):
+        """Reprend la date limite et les retards déjà signalés d'un index précédent
+
+        Après un rechargement du registre (import d'un relevé), seuls les élèves passés en
+        retard depuis sont signalés au prochain verifier(), pas tous les retards connus.
+        """
+        self.limite = ancien.limite
+        if self.limite is None:
+            return
+        for d, eleve in self.par_date[:bisect_left(self.par_date, (self.limite,))]:
+            if eleve in ancien.en_retard:
+                self.en_retard[eleve] = d
+            else:
+                # Paiements antidatés de l'import : en retard sous la limite, pas encore signalé
+                self._a_signaler.add(eleve)
+
+    def verifier(self, aujourd_hui=None):
+        """Retourne les élèves passés en retard depuis le dernier passage : [(élève, date)]
+
+        Coût proportionnel au nombre de nouveaux retards (plage trouvée par bisection).
+        """
+        aujourd_hui = aujourd_hui or date.today().toordinal()
+        limite = aujourd_hui - self.delai
+        debut = 0 if self.limite is None else bisect_left(self.par_date, (self.limite,))
+        fin = bisect_left(self.par_date, (limite,))
+        nouveaux = [(eleve, d) for d, eleve in self.par_date[debut:fin]]
+        for eleve in self._a_signaler:
+            dates = self.dates_eleve.get(eleve)
+            if dates and dates[-1] < limite and eleve not in self.en_retard:
+                nouveaux.append((eleve, dates[-1]))
+        self._a_signaler.clear()
+        if self.limite is None or limite > self.limite:
+            self.limite = limite
+        for eleve, d in nouveaux:
+            self.en_retard[eleve] = d
+        return sorted(nouveaux, key=lambda e: e[1])
+
+    def liste(self, aujourd_hui=None):
+        """Tous les élèves en retard, du plus ancien dernier paiement au plus récent :
+        [(nom, prénom, classe, date, jours de retard)]"""
+        aujourd_hui = aujourd_hui or date.today().toordinal()
+        return [
+            (*eleve, date.fromordinal(d), aujourd_hui - d)
+            for eleve, d in sorted(self.en_retard.items(), key=lambda e: e[1])
+        ]
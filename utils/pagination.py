@@ -7,4 +7,67 @@ class Paginator:
     def get_page(self, page_number):
         start = (page_number - 1) * self.page_size
         end = start + self.page_size
-        return self.items[start:end]
\ No newline at end of file
+        return self.items[start:end]
+
+class KeysetPaginator:
+    """Pagination par clé sur le dépôt : seule la page demandée est lue en base
+
+    On se déplace d'une page à la fois : Suivant part du curseur de fin de la page
+    courante, Précédent reprend le curseur de départ mémorisé de la page d'avant.
+    Aucune lecture par OFFSET : chaque page coûte O(taille de page). Le nombre total
+    vient des agrégats (sans filtre) ou d'un COUNT indexé, mémorisé jusqu'à la
+    prochaine écriture.
+    """
+
+    def __init__(self, repository, page_size=50, tri="date", descendant=True, **criteres):
+        self.repository = repository
+        self.page_size = page_size
+        self.tri = tri
+        self.descendant = descendant
+        self.criteres = criteres
+        self.curseurs = [None]  # curseurs de départ des pages visitées, le dernier est la page courante
+        self.suivant = None  # curseur de départ de la page suivante (None : dernière page)
+        self._total = None
+
+    def invalider(self, *_):
+        # Signature compatible avec PaiementRepository.abonner(operation, id, valeurs).
+        # Les curseurs sont des clés : ils restent valables après une écriture, seul le total change
+        self._total = None
+
+    @property
+    def total(self):
+        if self._total is None:
+            self._total = self.repository.compter(**self.criteres)
+        return self._total
+
+    @property
+    def total_pages(self):
+        return max(1, (self.total + self.page_size - 1) // self.page_size)
+
+    @property
+    def numero(self):
+        return len(self.curseurs)
+
+    @property
+    def depart(self):
+        return self.curseurs[-1]
+
+    def lire(self):
+        """Page courante, lue en base ; mémorise le curseur de la page suivante"""
+        paiements, self.suivant = self.repository.page(
+            self.depart, self.page_size, self.tri, self.descendant, **self.criteres
+        )
+        return paiements
+
+    def avancer(self):
+        # Vers la page suivante (à lire ensuite) ; False en fin de liste
+        if self.suivant is None:
+            return False
+        self.curseurs.append(self.suivant)
+        return True
+
+    def reculer(self):
+        if len(self.curseurs) == 1:
+            return False
+        self.curseurs.pop()
+        return True
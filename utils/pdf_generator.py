@@ -1,32 +1,110 @@
-from reportlab.lib import colors
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
-from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import SimpleDocTemplate, PageBreak
+from utils.config import RECUS
+from utils.receipts import RENDU, nom_recu
+
+def _rendre_lot(paiements, destination, fusionner):
+    """Exécuté dans un processus du pool : un PDF multi-pages (fusion) ou un PDF par reçu"""
+    if fusionner:
+        PDFGenerator.generate_receipts(paiements, destination)
+        return [destination]
+    chemins = []
+    for paiement in paiements:
+        chemin = os.path.join(destination, nom_recu(paiement))
+        PDFGenerator.generate_receipt(paiement, chemin)
+        chemins.append(chemin)
+    return chemins
 
 class PDFGenerator:
+    @staticmethod
+    def receipt_elements(paiement):
+        return RENDU.elements_pdf(paiement)
+
     @staticmethod
     def generate_receipt(paiement, output_path):
-        doc = SimpleDocTemplate(output_path, pagesize=letter)
-        styles = getSampleStyleSheet()
+        RENDU.pdf(paiement, output_path)
+
+    @staticmethod
+    def generate_receipts(paiements, output_path):
+        # Un reçu par page dans un seul document
         elements = []
-        
-        # En-tête
-        elements.append(Paragraph("Reçu de Paiement", styles['Title']))
-        
-        # Données
-        data = [
-            ["Nom:", paiement['nom']],
-            ["Prénom:", paiement['prenom']],
-            ["Classe:", paiement['classe']],
-            ["Montant:", f"{paiement['montant']} FCFA"],
-            ["Date:", paiement['date_paiement']]
-        ]
-        
-        t = Table(data)
-        t.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        
-        elements.append(t)
-        doc.build(elements)
\ No newline at end of file
+        for paiement in paiements:
+            if elements:
+                elements.append(PageBreak())
+            elements.extend(PDFGenerator.receipt_elements(paiement))
+        SimpleDocTemplate(output_path, pagesize=letter).build(elements)
+
+    @staticmethod
+    def generate_batch(repository, output_dir, merge=False, workers=None, progression=None, annule=None, **criteres):
+        """Reçus de tous les paiements correspondant à `criteres` (ex. statut="payé", mois=...)
+
+        Les paiements sont lus par lots (pagination par clé) et rendus en parallèle dans un
+        ProcessPoolExecutor, un lot par tâche. Avec merge=True, chaque lot produit un PDF
+        multi-pages et les parties sont fusionnées dans l'ordre en un seul fichier (pypdf).
+        Retourne la liste des fichiers créés ; progression(fraction) après chaque lot,
+        annule() -> True abandonne les lots pas encore commencés. Les reçus sont rendus dans
+        un dossier de travail et déplacés dans output_dir seulement en cas de succès : une
+        annulation ou une erreur n'y laisse aucun fichier partiel.
+        """
+        if merge:
+            try:
+                from pypdf import PdfWriter
+            except ImportError:
+                raise ValueError("La fusion des reçus nécessite le paquet pypdf (pip install pypdf)")
+        os.makedirs(output_dir, exist_ok=True)
+        total = repository.compter(**criteres) or 1
+        workers = workers or RECUS['processus'] or os.cpu_count()
+        # Dans output_dir : même système de fichiers, os.replace déplace sans copier
+        travail = tempfile.mkdtemp(prefix="recus_", dir=output_dir)
+        taches, resultats = {}, {}
+        try:
+            # spawn : pas de fork d'un processus Qt multi-thread
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                # Les Paiement sont envoyés en dictionnaires : leurs codes internés sont propres au processus
+                for numero, lot in enumerate(repository.iterer(RECUS['taille_lot'], **criteres)):
+                    destination = os.path.join(travail, f"partie_{numero:06d}.pdf") if merge else travail
+                    tache = pool.submit(_rendre_lot, [p.to_dict() for p in lot], destination, merge)
+                    taches[tache] = (numero, len(lot))
+                    # File d'attente bornée : la lecture ne prend pas trop d'avance sur le rendu
+                    while len(taches) - len(resultats) >= 2 * workers:
+                        PDFGenerator._recolter(taches, resultats, total, progression)
+                    if annule and annule():
+                        break
+                while len(resultats) < len(taches) and not (annule and annule()):
+                    PDFGenerator._recolter(taches, resultats, total, progression)
+                if annule and annule():
+                    pool.shutdown(cancel_futures=True)
+                    return []
+            chemins = [chemin for numero in sorted(resultats) for chemin in resultats[numero]]
+            if merge:
+                fusion = os.path.join(travail, "recus.pdf")
+                writer = PdfWriter()
+                for chemin in chemins:
+                    writer.append(chemin)
+                with open(fusion, "wb") as f:
+                    writer.write(f)
+                chemins = [fusion]
+            crees = []
+            for chemin in chemins:
+                crees.append(os.path.join(output_dir, os.path.basename(chemin)))
+                os.replace(chemin, crees[-1])
+            return crees
+        finally:
+            # Parties fusionnées, ou reçus d'un lot annulé ou en échec
+            shutil.rmtree(travail, ignore_errors=True)
+
+    @staticmethod
+    def _recolter(taches, resultats, total, progression):
+        """Attend la fin d'au moins un lot et range ses fichiers par numéro de lot"""
+        en_cours = [tache for tache, (numero, _) in taches.items() if numero not in resultats]
+        faites, _ = wait(en_cours, return_when=FIRST_COMPLETED)
+        for tache in faites:
+            resultats[taches[tache][0]] = tache.result()
+        if progression:
+            rendus = sum(taille for numero, taille in taches.values() if numero in resultats)
+            progression(min(rendus / total, 1.0))
@@ -0,0 +1,125 @@
+import logging
+import queue
+import threading
+from PyQt5.QtCore import QObject, pyqtSignal
+from models.repository import PaiementRepository
+from utils.config import PERSISTANCE
+
+logger = logging.getLogger(__name__)
+
+_ARRET = object()
+
+class PersistenceWorker(QObject):
+    """Écritures différées (write-behind) traitées par un thread dédié
+
+    L'interface dépose les ajouts/modifications dans une file et reprend la main
+    immédiatement. Le thread vide la file par lots validés en une seule transaction,
+    dans l'ordre de dépôt, puis émet `ecrit` pour chaque écriture validée (ou `echec`).
+    Les signaux arrivent dans le thread de l'interface. Si un lot échoue, ses
+    écritures sont rejouées une à une : une saisie invalide ne fait pas perdre les autres.
+    Les tâches (instantanés de sauvegarde, imports de relevés) passent par la même file,
+    après les écritures déposées avant elles.
+    """
+
+    # operation ("insert"/"update"), id du paiement, valeurs écrites, jeton de l'appelant
+    ecrit = pyqtSignal(str, str, object, object)
+    # operation ("insert"/"update"/"tache"), jeton de l'appelant, message d'erreur
+    echec = pyqtSignal(str, object, str)
+    # jeton, résultat d'une fonction passée à executer()
+    termine = pyqtSignal(object, object)
+    # jeton, fraction accomplie (0 à 1) d'une fonction passée à executer()
+    avancement = pyqtSignal(object, float)
+
+    def __init__(self, db, observateurs=(), taille_lot=None, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.observateurs = list(observateurs)
+        self.taille_lot = PERSISTANCE['taille_lot'] if taille_lot is None else taille_lot
+        self.file = queue.Queue()
+        self.thread = threading.Thread(target=self._executer, name="persistance", daemon=True)
+        self.thread.start()
+
+    # Dépôt (thread de l'interface)
+    def ajouter(self, paiement, jeton=None):
+        self.file.put((("insert", dict(paiement)), jeton))
+
+    def modifier(self, id_paiement, valeurs, jeton=None):
+        self.file.put((("update", id_paiement, dict(valeurs)), jeton))
+
+    def planifier(self, tache):
+        """Exécute tache() dans le thread d'écriture, après les écritures déjà déposées"""
+        self.file.put((("tache", lambda repository, avancer: tache()), None))
+
+    def executer(self, fonction, jeton=None):
+        """Exécute fonction(repository, avancer) dans le thread d'écriture, dans l'ordre de la file
+
+        Sert aux traitements longs qui écrivent (import de relevés) : `repository` est celui
+        du thread, avancer(fraction) émet `avancement`. Le résultat est émis avec `termine`,
+        une exception avec `echec`.
+        """
+        self.file.put((("tache", fonction), jeton))
+
+    def vider(self):
+        """Bloque jusqu'à ce que toutes les écritures déposées soient traitées"""
+        self.file.join()
+
+    def arreter(self):
+        # Les écritures en attente sont validées avant l'arrêt
+        if self.thread.is_alive():
+            self.file.put(_ARRET)
+            self.thread.join()
+
+    # Thread d'écriture
+    def _executer(self):
+        # Connexion propre au thread : sqlite3 interdit le partage entre threads
+        repository = PaiementRepository(self.db)
+        for callback in self.observateurs:
+            repository.abonner(callback)
+        while True:
+            lot = [self.file.get()]
+            while len(lot) < self.taille_lot and lot[-1] is not _ARRET and lot[-1][0][0] != "tache":
+                try:
+                    lot.append(self.file.get_nowait())
+                except queue.Empty:
+                    break
+            arret = lot[-1] is _ARRET
+            ecritures = [e for e in lot if e is not _ARRET and e[0][0] != "tache"]
+            if ecritures:
+                self._ecrire(repository, ecritures)
+            if not arret and lot[-1][0][0] == "tache":
+                self._tache(repository, lot[-1][0][1], lot[-1][1])
+            for _ in lot:
+                self.file.task_done()
+            if arret:
+                repository.conn.close()
+                return
+
+    def _ecrire(self, repository, ecritures):
+        try:
+            resultats = repository.appliquer([operation for operation, _ in ecritures])
+        except Exception as e:
+            if len(ecritures) == 1:
+                operation, jeton = ecritures[0]
+                logger.error(f"Écriture refusée ({operation[0]}) : {e}")
+                self.echec.emit(operation[0], jeton, str(e))
+                return
+            logger.warning(f"Lot de {len(ecritures)} écritures annulé ({e}), reprise une à une")
+            for ecriture in ecritures:
+                self._ecrire(repository, [ecriture])
+            return
+        for (operation, jeton), (_, id_paiement, valeurs) in zip(ecritures, resultats):
+            if id_paiement is None:
+                self.echec.emit(operation[0], jeton, f"Paiement {operation[1]} introuvable")
+            else:
+                self.ecrit.emit(operation[0], id_paiement, valeurs, jeton)
+
+    def _tache(self, repository, fonction, jeton):
+        try:
+            resultat = fonction(repository, lambda fraction: self.avancement.emit(jeton, fraction))
+        except Exception as e:
+            logger.error(f"Échec d'une tâche de persistance : {e}")
+            if jeton is not None:
+                self.echec.emit("tache", jeton, str(e))
+            return
+        if jeton is not None:
+            self.termine.emit(jeton, resultat)
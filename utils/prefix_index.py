@@ -0,0 +1,67 @@
+from bisect import bisect_left, insort
+
+def cle_eleve(p):
+    return (p.nom, p.prenom, p.id)
+
+def cle_liste(p):
+    # Ordre des résultats de rechercher() : sert de clé à PaiementTableModel.synchroniser
+    return (p.classe.upper(), p.nom, p.prenom, p.id)
+
+class ClassePrefixIndex:
+    """Index trié des classes pour le filtre par préfixe de l'onglet « Liste par Classe »
+
+    Les noms de classe (en majuscules) sont gardés triés ; les paiements de chaque classe
+    sont gardés triés par (nom, prénom, id). Un préfixe correspond donc à une plage
+    contiguë de classes trouvée par bisection, et le résultat est déjà dans l'ordre
+    (classe, nom, prénom) : plus de filtrage ni de tri de tout le registre à chaque frappe.
+    """
+
+    def __init__(self, paiements=()):
+        self.classes = []
+        self.par_classe = {}
+        self._derniere_plage = ("", 0, 0)
+        for p in sorted(paiements, key=cle_liste):
+            self.par_classe.setdefault(p.classe.upper(), []).append(p)
+        self.classes = sorted(self.par_classe)
+        self._derniere_plage = ("", 0, len(self.classes))
+
+    def ajouter(self, p):
+        classe = p.classe.upper()
+        if classe not in self.par_classe:
+            insort(self.classes, classe)
+            self.par_classe[classe] = []
+            self._derniere_plage = ("", 0, len(self.classes))
+        insort(self.par_classe[classe], p, key=cle_eleve)
+
+    def retirer(self, p):
+        classe = p.classe.upper()
+        eleves = self.par_classe.get(classe, [])
+        i = bisect_left(eleves, cle_eleve(p), key=cle_eleve)
+        if i < len(eleves) and eleves[i].id == p.id:
+            del eleves[i]
+        if not eleves and classe in self.par_classe:
+            del self.par_classe[classe]
+            self.classes.remove(classe)
+            self._derniere_plage = ("", 0, len(self.classes))
+
+    def remplacer(self, ancien, nouveau):
+        self.retirer(ancien)
+        self.ajouter(nouveau)
+
+    def classes_prefixe(self, prefixe):
+        """Classes commençant par `prefixe` ; restreint la plage précédente si le préfixe s'allonge"""
+        prefixe = prefixe.upper()
+        precedent, lo, hi = self._derniere_plage
+        if not prefixe.startswith(precedent) or hi > len(self.classes):
+            lo, hi = 0, len(self.classes)
+        debut = bisect_left(self.classes, prefixe, lo, hi)
+        fin = bisect_left(self.classes, prefixe + "\uffff", debut, hi)
+        self._derniere_plage = (prefixe, debut, fin)
+        return self.classes[debut:fin]
+
+    def rechercher(self, prefixe=""):
+        """Paiements des classes commençant par `prefixe`, triés par (classe, nom, prénom)"""
+        resultats = []
+        for classe in self.classes_prefixe(prefixe):
+            resultats.extend(self.par_classe[classe])
+        return resultats
@@ -0,0 +1,188 @@
+import html
+import io
+import os
+import re
+from functools import lru_cache
+from string import Formatter
+from models.paiement import CHAMPS
+from utils.config import RECUS
+
+# Lignes du reçu : (libellé, modèle, facultative). Une ligne facultative est omise
+# quand tous ses champs sont vides (reçu d'un paiement pas encore enregistré, sans notes...)
+LIGNES_RECU = [
+    ("ID", "{id}", True),
+    ("Élève", "{prenom} {nom}", False),
+    ("Classe", "{classe}", False),
+    ("Montant", "{montant} FCFA", False),
+    ("Mois", "{mois}", False),
+    ("Statut", "{statut}", True),
+    ("Méthode", "{methode_paiement}", False),
+    ("Date", "{date_paiement} à {heure_paiement}", False),
+    ("Notes", "{notes}", True),
+]
+TITRE_RECU = "REÇU DE PAIEMENT"
+MERCI = "Merci pour votre confiance!"
+
+# Sorties enregistrées : format -> (méthode de rendu, extension)
+SORTIES = {}
+
+def sortie(format, extension):
+    """Enregistre une méthode de ReceiptRenderer comme sortie `format` (pluggable)"""
+    def enregistrer(methode):
+        SORTIES[format] = (methode, extension)
+        return methode
+    return enregistrer
+
+def nom_recu(paiement, extension=".pdf"):
+    # recu_<id>_<nom>_<prenom>.<ext>, sans caractères interdits dans un nom de fichier
+    base = "_".join(str(paiement.get(c) or "") for c in ("id", "nom", "prenom")).strip("_")
+    return re.sub(r'[\\/:*?"<>|\s]+', "_", f"recu_{base}") + extension
+
+def valeurs_recu(paiement):
+    # Paiement ou dictionnaire (formulaire) -> {champ: texte}, champs absents vides
+    return {champ: str(paiement.get(champ) or "") for champ in CHAMPS}
+
+class Gabarit:
+    """Lignes du reçu précompilées : champs de chaque modèle extraits une fois"""
+
+    def __init__(self, lignes):
+        self.lignes = [
+            (libelle, modele.format_map, facultative,
+             tuple(champ for _, champ, _, _ in Formatter().parse(modele) if champ))
+            for libelle, modele, facultative in lignes
+        ]
+
+    def remplir(self, valeurs):
+        return [
+            (libelle, formater(valeurs))
+            for libelle, formater, facultative, champs in self.lignes
+            if not facultative or any(valeurs[champ] for champ in champs)
+        ]
+
+# Feuille de styles et style du tableau construits une fois par processus (import différé de reportlab)
+@lru_cache(maxsize=None)
+def styles_pdf():
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import TableStyle
+    return getSampleStyleSheet(), TableStyle([
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+
+class ReceiptRenderer:
+    """Rendu unique des reçus : texte, HTML, PDF et ticket ESC/POS
+
+    Le gabarit est compilé une fois ; chaque sortie ne fait que remplir les lignes.
+    rendre() retourne le contenu (str ou bytes), enregistrer() l'écrit dans un fichier
+    dont l'extension choisit le format. D'autres sorties s'ajoutent avec @sortie.
+    """
+
+    def __init__(self, lignes=LIGNES_RECU, entete=None, largeur_ticket=None):
+        self.gabarit = Gabarit(lignes)
+        self.entete = RECUS['entete'] if entete is None else entete
+        self.largeur_ticket = largeur_ticket or RECUS['largeur_ticket']
+
+    def rendre(self, paiement, format="txt"):
+        if format not in SORTIES:
+            raise ValueError(f"Format de reçu inconnu : {format}")
+        return SORTIES[format][0](self, self.gabarit.remplir(valeurs_recu(paiement)))
+
+    def enregistrer(self, paiement, chemin, format=None):
+        format = format or self.format_fichier(chemin)
+        if format == "pdf":
+            # Construit directement dans le fichier, sans tampon intermédiaire
+            self.pdf(paiement, chemin)
+            return chemin
+        contenu = self.rendre(paiement, format)
+        if isinstance(contenu, bytes):
+            with open(chemin, "wb") as f:
+                f.write(contenu)
+        else:
+            with open(chemin, "w", encoding="utf-8") as f:
+                f.write(contenu)
+        return chemin
+
+    def imprimer(self, paiement, imprimante=None):
+        """Envoie le ticket ESC/POS à l'imprimante thermique (ex. /dev/usb/lp0)"""
+        imprimante = imprimante or RECUS['imprimante']
+        if not imprimante:
+            raise ValueError("Aucune imprimante de tickets configurée (RECUS['imprimante'])")
+        with open(imprimante, "wb") as f:
+            f.write(self.rendre(paiement, "escpos"))
+
+    @staticmethod
+    def format_fichier(chemin):
+        extension = os.path.splitext(chemin)[1].lower()
+        for format, (_, ext) in SORTIES.items():
+            if ext == extension:
+                return format
+        raise ValueError(f"Extension de reçu inconnue : {extension or '(aucune)'}")
+
+    # PDF : éléments réutilisables pour les documents multi-pages (reçus en lot)
+    def elements_pdf(self, paiement):
+        return self._elements_pdf(self.gabarit.remplir(valeurs_recu(paiement)))
+
+    def pdf(self, paiement, destination):
+        from reportlab.lib.pagesizes import letter
+        from reportlab.platypus import SimpleDocTemplate
+        SimpleDocTemplate(destination, pagesize=letter).build(self.elements_pdf(paiement))
+
+    def _elements_pdf(self, lignes):
+        from reportlab.platypus import Paragraph, Table
+        feuille, style_tableau = styles_pdf()
+        tableau = Table([[f"{libelle}:", valeur] for libelle, valeur in lignes])
+        tableau.setStyle(style_tableau)
+        return [Paragraph(self.entete, feuille['Heading3']), Paragraph("Reçu de Paiement", feuille['Title']), tableau]
+
+    # Sorties
+    @sortie("txt", ".txt")
+    def _texte(self, lignes):
+        cadre = "=" * 40
+        corps = [f"{libelle}: {valeur}" for libelle, valeur in lignes]
+        return "\n".join([f"{self.entete} - {TITRE_RECU}", cadre, *corps, "", MERCI, cadre, ""])
+
+    @sortie("html", ".html")
+    def _html(self, lignes):
+        corps = "".join(
+            f"<tr><th>{html.escape(libelle)}</th><td>{html.escape(valeur)}</td></tr>" for libelle, valeur in lignes
+        )
+        return (
+            '<!DOCTYPE html>\n<html lang="fr"><head><meta charset="utf-8">'
+            f"<title>{TITRE_RECU}</title></head><body>"
+            f"<h3>{html.escape(self.entete)}</h3><h1>{TITRE_RECU}</h1>"
+            f'<table border="1" cellspacing="0" cellpadding="4">{corps}</table>'
+            f"<p>{MERCI}</p></body></html>\n"
+        )
+
+    @sortie("escpos", ".prn")
+    def _escpos(self, lignes):
+        largeur = self.largeur_ticket
+        texte = []
+        for libelle, valeur in lignes:
+            # Libellé à gauche, valeur à droite ; sur deux lignes si trop long
+            if len(libelle) + len(valeur) + 2 <= largeur:
+                texte.append(f"{libelle}:".ljust(largeur - len(valeur)) + valeur)
+            else:
+                texte.append(f"{libelle}:")
+                texte.extend(valeur[i:i + largeur].rjust(largeur) for i in range(0, len(valeur), largeur))
+        corps = "\n".join(texte).encode("cp858", "replace")
+        return b"".join([
+            b"\x1b@", b"\x1bt\x13",  # initialisation, page de code PC858 (accents)
+            b"\x1ba\x01\x1bE\x01", self.entete.encode("cp858", "replace"), b"\n",
+            TITRE_RECU.encode("cp858", "replace"), b"\n\x1bE\x00\x1ba\x00",
+            b"-" * largeur, b"\n", corps, b"\n", b"-" * largeur, b"\n",
+            b"\x1ba\x01", MERCI.encode("cp858", "replace"), b"\n\x1ba\x00",
+            b"\x1bd\x04", b"\x1dV\x01",  # avance de 4 lignes, coupe partielle
+        ])
+
+    @sortie("pdf", ".pdf")
+    def _pdf(self, lignes):
+        # rendre(p, "pdf") : octets du document ; enregistrer() écrit directement le fichier
+        from reportlab.lib.pagesizes import letter
+        from reportlab.platypus import SimpleDocTemplate
+        tampon = io.BytesIO()
+        SimpleDocTemplate(tampon, pagesize=letter).build(self._elements_pdf(lignes))
+        return tampon.getvalue()
+
+RENDU = ReceiptRenderer()
@@ -0,0 +1,109 @@
+from collections import Counter
+from models.paiement import periode, annee_mois, NOMS_MOIS, MOIS_RENTREE
+
+PERIODE_BASE = periode(2000, 1)  # bit 0 : janvier 2000 ; périodes antérieures ignorées
+
+def masque_periodes(debut, fin):
+    """Bits des périodes de debut à fin incluses"""
+    debut = max(debut, PERIODE_BASE)
+    if fin < debut:
+        return 0
+    return ((1 << (fin - debut + 1)) - 1) << (debut - PERIODE_BASE)
+
+def periodes_masque(masque):
+    """Périodes dont le bit est levé, dans l'ordre"""
+    periodes = []
+    while masque:
+        bas = masque & -masque
+        periodes.append(PERIODE_BASE + bas.bit_length() - 1)
+        masque ^= bas
+    return periodes
+
+def libelle_periode(periode_):
+    annee, mois = annee_mois(periode_)
+    return f"{NOMS_MOIS[mois - 1].capitalize()} {annee}"
+
+def annee_scolaire(periode_):
+    # Périodes de septembre à août de l'année scolaire contenant `periode_`
+    annee, mois = annee_mois(periode_)
+    rentree = periode(annee if mois >= MOIS_RENTREE else annee - 1, MOIS_RENTREE)
+    return rentree, rentree + 11
+
+class RosterMatrix:
+    """Matrice élèves x mois par classe : un entier-bitset par élève, un bit par mois payé
+
+    Le mois saisi (texte libre) est converti en période (mois depuis l'an 0) ; le bit
+    correspondant est levé tant qu'au moins un paiement « payé » couvre ce mois. Qui n'a
+    pas payé d'octobre à décembre : masque de la plage, puis un ET binaire par élève des
+    classes demandées, sans relire les paiements.
+    """
+
+    STATUT_PAYE = "payé"
+
+    def __init__(self, paiements=()):
+        self.classes = {}  # classe -> {(nom, prénom): bits des mois payés}
+        self._paiements = Counter()  # (classe, élève) -> nombre de paiements (tous statuts)
+        self._payes = Counter()  # (classe, élève, période) -> paiements « payé » du mois
+        for p in paiements:
+            self.ajouter(p)
+
+    def _cles(self, p):
+        classe = p.classe.upper()
+        eleve = (p.nom, p.prenom)
+        periode_ = p.periode if p.statut == self.STATUT_PAYE else None
+        if periode_ is not None and periode_ < PERIODE_BASE:
+            periode_ = None
+        return classe, eleve, periode_
+
+    def ajouter(self, p):
+        classe, eleve, periode_ = self._cles(p)
+        eleves = self.classes.setdefault(classe, {})
+        eleves.setdefault(eleve, 0)
+        self._paiements[classe, eleve] += 1
+        if periode_ is not None:
+            self._payes[classe, eleve, periode_] += 1
+            eleves[eleve] |= 1 << (periode_ - PERIODE_BASE)
+
+    def retirer(self, p):
+        classe, eleve, periode_ = self._cles(p)
+        if not self._paiements[classe, eleve]:
+            return
+        if periode_ is not None:
+            self._payes[classe, eleve, periode_] -= 1
+            if self._payes[classe, eleve, periode_] <= 0:
+                del self._payes[classe, eleve, periode_]
+                self.classes[classe][eleve] &= ~(1 << (periode_ - PERIODE_BASE))
+        self._paiements[classe, eleve] -= 1
+        if self._paiements[classe, eleve] <= 0:
+            del self._paiements[classe, eleve]
+            del self.classes[classe][eleve]
+            if not self.classes[classe]:
+                del self.classes[classe]
+
+    def remplacer(self, ancien, nouveau):
+        self.retirer(ancien)
+        self.ajouter(nouveau)
+
+    def impayes(self, debut, fin, classes=None):
+        """Élèves des `classes` (toutes par défaut) sans paiement pour au moins un mois de debut à fin
+
+        Retourne [(classe, nom, prénom, [périodes non payées])], trié par classe puis élève.
+        """
+        masque = masque_periodes(debut, fin)
+        resultats = []
+        for classe in sorted(self.classes if classes is None else classes):
+            for (nom, prenom), bits in sorted(self.classes.get(classe, {}).items()):
+                manquants = masque & ~bits
+                if manquants:
+                    resultats.append((classe, nom, prenom, periodes_masque(manquants)))
+        return resultats
+
+    def payes(self, debut, fin, classes=None):
+        """Élèves à jour pour tous les mois de debut à fin : [(classe, nom, prénom)]"""
+        masque = masque_periodes(debut, fin)
+        return [
+            (classe, nom, prenom)
+            for classe in sorted(self.classes if classes is None else classes)
+            for (nom, prenom), bits in sorted(self.classes.get(classe, {}).items())
+            if bits & masque == masque
+        ]
@@ -0,0 +1,116 @@
+import heapq
+import re
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+from operator import itemgetter
+from utils.config import RECHERCHE
+
+_SEPARATEURS = re.compile(r"[^0-9a-z]+")
+
+@lru_cache(maxsize=65536)
+def replier(texte):
+    """Minuscules sans accents ni apostrophes : "N'Diaye Sénè" -> "ndiaye sene" """
+    texte = unicodedata.normalize("NFKD", texte or "")
+    texte = "".join(c for c in texte if not unicodedata.combining(c))
+    texte = texte.casefold().replace("'", "").replace("’", "")
+    return _SEPARATEURS.sub(" ", texte).strip()
+
+def mots(texte):
+    return replier(texte).split()
+
+def trigrammes(mot):
+    # Bordures marquées pour favoriser les débuts de mot : "ba" -> {"  b", " ba", "ba "}
+    mot = f"  {mot} "
+    return {mot[i:i + 3] for i in range(len(mot) - 2)}
+
+class SearchIndex:
+    """Index de recherche approchée (trigrammes) sur nom, prénom, classe et notes
+
+    Le texte est replié (sans accents, minuscules) et découpé en mots. Les trigrammes
+    indexent le vocabulaire (quelques milliers de mots distincts, les noms se répètent
+    beaucoup), et chaque mot pointe vers les paiements qui le contiennent. Une requête
+    cherche d'abord les mots proches de chacun de ses termes, ce qui tolère fautes de
+    frappe et saisies partielles, puis ne garde que les paiements où chaque terme a un
+    mot proche. Classement par similarité, les mots exacts d'abord.
+    Mis à jour à chaque ajout ou modification, sans reconstruction.
+    """
+
+    def __init__(self, paiements=()):
+        self.vocabulaire = {}  # trigramme -> mots
+        self.mots = {}  # mot -> ids des paiements
+        self.documents = {}  # id -> (paiement, mots)
+        for p in paiements:
+            self.ajouter(p)
+
+    def ajouter(self, p):
+        if p.id in self.documents:
+            self.retirer(p)
+        termes = frozenset(mots(f"{p.nom} {p.prenom} {p.classe} {p.notes}"))
+        for mot in termes:
+            ids = self.mots.get(mot)
+            if ids is None:
+                ids = self.mots[mot] = set()
+                for g in trigrammes(mot):
+                    self.vocabulaire.setdefault(g, set()).add(mot)
+            ids.add(p.id)
+        self.documents[p.id] = (p, termes)
+
+    def retirer(self, p):
+        document = self.documents.pop(p.id, None)
+        if document is None:
+            return
+        for mot in document[1]:
+            ids = self.mots[mot]
+            ids.discard(p.id)
+            if not ids:
+                del self.mots[mot]
+                for g in trigrammes(mot):
+                    self.vocabulaire[g].discard(mot)
+                    if not self.vocabulaire[g]:
+                        del self.vocabulaire[g]
+
+    def remplacer(self, ancien, nouveau):
+        self.retirer(ancien)
+        self.ajouter(nouveau)
+
+    def mots_proches(self, terme, seuil):
+        """{mot: similarité} des mots du vocabulaire partageant au moins `seuil` des trigrammes du terme"""
+        grammes = trigrammes(terme)
+        communs = Counter()
+        for g in grammes:
+            communs.update(self.vocabulaire.get(g, ()))
+        proches = {}
+        for mot, n in communs.items():
+            if n >= seuil * len(grammes):
+                # Dice : pénalise les mots beaucoup plus longs que le terme ; bonus au mot exact
+                proches[mot] = 2 * n / (len(grammes) + len(mot) + 1) + (mot == terme)
+        return proches
+
+    def rechercher(self, requete, limite=None, seuil=None):
+        """Paiements correspondant à `requete`, du plus pertinent au moins pertinent
+
+        `seuil` est la part des trigrammes d'un terme qu'un mot doit partager pour être
+        considéré comme proche (1.0 = tous).
+        """
+        limite = RECHERCHE['limite'] if limite is None else limite
+        seuil = RECHERCHE['seuil'] if seuil is None else seuil
+        termes = list(dict.fromkeys(mots(requete)))
+        if not termes:
+            return []
+        scores = None
+        for terme in termes:
+            meilleurs = {}
+            # Du moins proche au plus proche : chaque paiement garde sa meilleure similarité
+            for mot, similarite in sorted(self.mots_proches(terme, seuil).items(), key=itemgetter(1)):
+                meilleurs.update(dict.fromkeys(self.mots[mot], similarite))
+            if scores is None:
+                scores = meilleurs
+            else:
+                scores = {i: scores[i] + meilleurs[i] for i in scores.keys() & meilleurs.keys()}
+            if not scores:
+                return []
+        meilleurs = heapq.nlargest(limite, scores.items(), key=itemgetter(1))
+        resultats = [self.documents[i][0] for i, _ in meilleurs]
+        resultats.sort(key=lambda p: (-scores[p.id], p.nom, p.prenom, p.id))
+        return resultats
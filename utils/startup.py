@@ -0,0 +1,39 @@
+import logging
+import sys
+import time
+
+logger = logging.getLogger(__name__)
+
+# Modules lourds chargés à la première utilisation (graphiques, PDF, statistiques)
+MODULES_DIFFERES = ["matplotlib", "reportlab", "numpy", "openpyxl", "pyarrow", "pypdf"]
+
+class StartupProfiler:
+    """Chronométrage des étapes du démarrage (option --profile-startup)
+
+    marquer(etape) note le temps écoulé depuis la création du profileur ; rapport()
+    l'écrit sur la sortie d'erreur et dans le journal, avec les modules lourds déjà
+    chargés à ce moment. Inactif, marquer() ne fait rien.
+    """
+
+    def __init__(self, actif=False):
+        self.actif = actif
+        self.debut = time.perf_counter()
+        self.etapes = []
+
+    def marquer(self, etape):
+        if self.actif:
+            self.etapes.append((etape, time.perf_counter() - self.debut, len(sys.modules)))
+
+    def rapport(self):
+        if not self.actif:
+            return
+        lignes = ["Profil de démarrage :"]
+        precedent = 0.0
+        for etape, ecoule, modules in self.etapes:
+            lignes.append(f"  {etape:<28} {ecoule * 1000:8.1f} ms  (+{(ecoule - precedent) * 1000:7.1f} ms, {modules} modules)")
+            precedent = ecoule
+        charges = [m for m in MODULES_DIFFERES if m in sys.modules]
+        lignes.append(f"  modules lourds chargés : {', '.join(charges) or 'aucun'}")
+        texte = "\n".join(lignes)
+        print(texte, file=sys.stderr)
+        logger.info(texte)
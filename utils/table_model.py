@@ -0,0 +1,160 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+# Colonne affichée -> clé de tri du dépôt (voir models.repository.TRIS)
+TRIS_COLONNES = {
+    "id": "id",
+    "nom": "nom",
+    "prenom": "nom",
+    "classe": "classe",
+    "montant": "montant",
+    "mois": "mois",
+    "statut": "statut",
+    "date_paiement": "date",
+}
+
+# Clés de tri en mémoire sur les attributs typés (pas de re-parsing du texte)
+CLES_TRI = {
+    "id": lambda p: p.id,
+    "nom": lambda p: (p.nom, p.prenom, p.id),
+    "prenom": lambda p: (p.prenom, p.nom, p.id),
+    "classe": lambda p: (p.classe, p.nom, p.prenom),
+    "montant": lambda p: (p.montant, p.id),
+    "mois": lambda p: (p.periode is None, p.periode or 0, p.id),  # chronologique, illisibles en dernier
+    "statut": lambda p: (p.statut, p.id),
+    "methode_paiement": lambda p: (p.methode_paiement, p.id),
+    "date_paiement": lambda p: (p.date_ordinal, p.heure, p.id),
+}
+
+class PaiementTableModel(QAbstractTableModel):
+    """Modèle de tableau virtualisé pour les paiements
+
+    Deux sources possibles :
+    - set_paiements(liste) : une liste déjà en mémoire, triée dans le modèle ;
+    - set_requete(repository, **criteres) : lecture paresseuse par lots via la
+      pagination par clé du dépôt (canFetchMore/fetchMore), tri fait par SQLite.
+    La vue ne demande que les cellules visibles : aucun objet n'est créé par cellule.
+    """
+
+    def __init__(self, colonnes, entetes, taille_lot=200, parent=None):
+        super().__init__(parent)
+        self.colonnes = colonnes
+        self.entetes = entetes
+        self.taille_lot = taille_lot
+        self.paiements = []
+        self.repository = None
+        self.criteres = {}
+        self.tri = "date"
+        self.descendant = True
+        self.curseur = None
+        self.cle_synchro = None
+
+    # Sources de données
+    def set_paiements(self, paiements):
+        self.beginResetModel()
+        self.repository = None
+        self.paiements = list(paiements)
+        self.curseur = None
+        self.cle_synchro = None
+        self.endResetModel()
+
+    def synchroniser(self, paiements, cle):
+        """Remplace le contenu par `paiements` en n'émettant que les lignes retirées/ajoutées
+
+        Les deux listes doivent être triées selon `cle` (cas du filtre par classe :
+        chaque frappe retire ou rajoute des blocs contigus). Si le modèle a été trié
+        autrement entre-temps, on revient à une réinitialisation complète.
+        """
+        if self.repository is not None or self.cle_synchro is not cle:
+            self.set_paiements(paiements)
+            self.cle_synchro = cle
+            return
+        anciens, nouveaux = self.paiements, list(paiements)
+        self.paiements = list(anciens)
+        i = j = pos = 0
+        while i < len(anciens) or j < len(nouveaux):
+            if j == len(nouveaux) or (i < len(anciens) and cle(anciens[i]) < cle(nouveaux[j])):
+                debut = i
+                while i < len(anciens) and (j == len(nouveaux) or cle(anciens[i]) < cle(nouveaux[j])):
+                    i += 1
+                self.beginRemoveRows(QModelIndex(), pos, pos + i - debut - 1)
+                del self.paiements[pos:pos + i - debut]
+                self.endRemoveRows()
+            elif i == len(anciens) or cle(nouveaux[j]) < cle(anciens[i]):
+                debut = j
+                while j < len(nouveaux) and (i == len(anciens) or cle(nouveaux[j]) < cle(anciens[i])):
+                    j += 1
+                self.beginInsertRows(QModelIndex(), pos, pos + j - debut - 1)
+                self.paiements[pos:pos] = nouveaux[debut:j]
+                self.endInsertRows()
+                pos += j - debut
+            else:
+                if anciens[i] is not nouveaux[j]:
+                    self.paiements[pos] = nouveaux[j]
+                    self.dataChanged.emit(self.index(pos, 0), self.index(pos, len(self.colonnes) - 1))
+                i += 1
+                j += 1
+                pos += 1
+
+    def set_requete(self, repository, tri="date", descendant=True, **criteres):
+        self.beginResetModel()
+        self.repository = repository
+        self.criteres = criteres
+        self.tri = tri
+        self.descendant = descendant
+        self.paiements, self.curseur = repository.page(None, self.taille_lot, tri, descendant, **criteres)
+        self.endResetModel()
+
+    def paiement(self, row):
+        return self.paiements[row] if 0 <= row < len(self.paiements) else None
+
+    # Lecture paresseuse
+    def canFetchMore(self, parent=QModelIndex()):
+        return self.repository is not None and self.curseur is not None
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        lot, curseur = self.repository.page(
+            self.curseur, self.taille_lot, self.tri, self.descendant, **self.criteres
+        )
+        if lot:
+            debut = len(self.paiements)
+            self.beginInsertRows(QModelIndex(), debut, debut + len(lot) - 1)
+            self.paiements.extend(lot)
+            self.endInsertRows()
+        self.curseur = curseur
+
+    # Interface QAbstractTableModel
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.paiements)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.colonnes)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        champ = self.colonnes[index.column()]
+        if role == Qt.DisplayRole:
+            return self.paiements[index.row()][champ]
+        if role == Qt.TextAlignmentRole and champ == "montant":
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.entetes[section]
+        return str(section + 1)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        champ = self.colonnes[column]
+        descendant = order == Qt.DescendingOrder
+        if self.repository is not None and champ in TRIS_COLONNES:
+            self.set_requete(self.repository, TRIS_COLONNES[champ], descendant, **self.criteres)
+            return
+        self.layoutAboutToBeChanged.emit()
+        self.cle_synchro = None
+        self.paiements.sort(key=CLES_TRI[champ], reverse=descendant)
+        self.layoutChanged.emit()